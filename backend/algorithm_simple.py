@@ -1,15 +1,87 @@
-# backend/algorithm_simple.py - ALGORITHME SIMPLE DE PLANIFICATION
-import random
-from datetime import datetime, timedelta
-from .database import get_connection, create_session
+# backend/algorithm_simple.py - PLANIFICATION DES SESSIONS D'EXAMENS
+import os
+import time
+from datetime import datetime
+from psycopg2.extras import execute_values
+from .database import get_connection, bulk_insert_examens, RowCursor
+from .conflict_graph import build_conflict_graph, invalidate_conflict_graph
+from .conflicts import detect_conflicts, exam_interval
+from .invigilation import safe_assign_surveillances
+from .multistart import solve_multistart
+from .scheduler import ExamRequest, ExamScheduler, Room, build_slots, DEFAULT_DUREE
+from .snapshots import SESSIONS_PUBLIEES, safe_publish_snapshots
+from .stats import refresh_stats
 
-def create_session_and_generate_exams(nom_session, date_debut, date_fin, formation_ids):
+# Budget (secondes) accordé à la recherche locale du planificateur
+TIME_BUDGET = 2.0
+
+# Exécutions indépendantes (graines différentes) par planification ; > 1 : processus parallèles
+PLANNING_RUNS = int(os.getenv("PLANNING_RUNS", "1"))
+
+# Examens acceptés par les chefs de département : jamais déplacés par une replanification
+STATUTS_FIXES = ('CONFIRME', 'VALIDE')
+
+def load_planning_data(cursor, formation_ids):
     """
-    Créer une session et générer des examens automatiquement
-    Version simplifiée pour le développement
+    Charger en trois requêtes les modules, groupes et salles nécessaires à la planification.
+    Retourne (examens à planifier, salles).
     """
+    cursor.execute("""
+        SELECT id, formation_id FROM modules
+        WHERE formation_id = ANY(%s)
+        ORDER BY formation_id, id
+    """, (list(formation_ids),))
+    modules = cursor.fetchall()
+
+    cursor.execute("""
+        SELECT id, formation_id, COALESCE(effectif, 0) FROM groupes
+        WHERE formation_id = ANY(%s)
+        ORDER BY formation_id, id
+    """, (list(formation_ids),))
+    groupes_par_formation = {}
+    for groupe_id, formation_id, effectif in cursor.fetchall():
+        groupes_par_formation.setdefault(formation_id, []).append((groupe_id, effectif))
+
+    cursor.execute("SELECT id, nom, capacite, type FROM salles ORDER BY capacite")
+    salles = [Room(id, nom, capacite or 0, type or "SALLE") for id, nom, capacite, type in cursor.fetchall()]
+
+    # Un examen par module et par groupe de la formation
+    exams = []
+    for module_id, formation_id in modules:
+        for groupe_id, effectif in groupes_par_formation.get(formation_id, []):
+            exams.append(ExamRequest(len(exams), module_id, formation_id, groupe_id, effectif, DEFAULT_DUREE))
+
+    return exams, salles
+
+def solve_schedule(exams, salles, slots, adjacency, runs=None, time_budget=TIME_BUDGET,
+                   progress=None, stop_event=None, **context):
+    """Une exécution du planificateur, ou la meilleure de `runs` exécutions en parallèle"""
+    runs = runs or PLANNING_RUNS
+    if runs > 1:
+        return solve_multistart(exams, salles, slots, adjacency, runs=runs, time_budget=time_budget,
+                                progress=progress, stop_event=stop_event, **context)
+    return ExamScheduler(exams, salles, slots, adjacency, **context).solve(
+        time_budget=time_budget, progress=progress, stop_event=stop_event
+    )
+
+def _report(progress, phase, **state):
+    """Publier l'avancement d'une planification lancée en tâche de fond (voir backend.jobs)"""
+    if progress:
+        progress({"phase": phase, **state})
+
+def create_session_and_generate_exams(nom_session, date_debut, date_fin, formation_ids, runs=None,
+                                      time_budget=TIME_BUDGET, progress=None, stop_event=None):
+    """
+    Créer une session et planifier tous les modules de toutes les formations
+    (un examen par module et par groupe) entre date_debut et date_fin.
+    runs : nombre d'exécutions indépendantes du planificateur (PLANNING_RUNS par défaut)
+    progress / stop_event : avancement publié pendant le calcul ; un arrêt demandé
+    termine la recherche et enregistre la meilleure planification trouvée
+    """
+    start = time.perf_counter()
+    conn = None
     try:
-        # Créer la session
+        _report(progress, "chargement")
         conn = get_connection()
         if not conn:
             return {"success": False, "message": "Erreur de connexion à la base de données"}
@@ -24,62 +96,52 @@ def create_session_and_generate_exams(nom_session, date_debut, date_fin, formati
         
         session_id = cursor.fetchone()[0]
         
-        # Pour chaque formation, créer quelques examens fictifs
-        examens_crees = 0
-        for formation_id in formation_ids:
-            # Récupérer les modules de cette formation
-            cursor.execute("SELECT id, nom FROM modules WHERE formation_id = %s", (formation_id,))
-            modules = cursor.fetchall()
-            
-            if not modules:
-                continue
-            
-            # Récupérer les salles disponibles
-            cursor.execute("SELECT id, nom, capacite FROM salles ORDER BY RANDOM() LIMIT 5")
-            salles = cursor.fetchall()
-            
-            if not salles:
-                continue
-            
-            # Récupérer les groupes de cette formation
-            cursor.execute("SELECT id, nom FROM groupes WHERE formation_id = %s", (formation_id,))
-            groupes = cursor.fetchall()
-            
-            # Créer quelques examens pour cette formation
-            for i in range(min(3, len(modules))):  # Max 3 examens par formation
-                module_id, module_nom = modules[i]
-                salle_id, salle_nom, capacite = salles[i % len(salles)]
-                
-                # Sélectionner un groupe aléatoire
-                if groupes:
-                    groupe_id, groupe_nom = random.choice(groupes)
-                else:
-                    groupe_id, groupe_nom = None, "N/A"
-                
-                # Générer une date aléatoire dans la période de la session
-                jours_session = (date_fin - date_debut).days
-                if jours_session > 0:
-                    jours_offset = random.randint(0, jours_session - 1)
-                    date_examen = date_debut + timedelta(days=jours_offset)
-                else:
-                    date_examen = date_debut
-                
-                # Générer une heure aléatoire (entre 8h et 18h)
-                heure_debut = f"{random.randint(8, 17):02d}:00"
-                heure_fin = f"{int(heure_debut.split(':')[0]) + 2:02d}:00"
-                
-                # Insérer l'examen
-                cursor.execute("""
-                    INSERT INTO examens (
-                        module_id, session_id, date_examen, heure_debut, 
-                        heure_fin, salle_id, statut, formation_id, groupe_id
-                    ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
-                """, (
-                    module_id, session_id, date_examen, heure_debut,
-                    heure_fin, salle_id, 'EN_ATTENTE', formation_id, groupe_id
-                ))
-                
-                examens_crees += 1
+        exams, salles = load_planning_data(cursor, formation_ids)
+        slots = build_slots(date_debut, date_fin)
+        
+        if not salles:
+            conn.rollback()
+            return {"success": False, "message": "Aucune salle disponible pour planifier la session"}
+        if not slots:
+            conn.rollback()
+            return {"success": False, "message": "Aucun créneau disponible dans la période choisie"}
+        
+        # Planification (coloration + recherche locale, puis salles par créneau)
+        graph = build_conflict_graph(
+            [exam.key for exam in exams],
+            [exam.groupe_id for exam in exams],
+            {exam.groupe_id: exam.effectif for exam in exams},
+        )
+        _report(progress, "planification", total_exams=len(exams))
+        schedule = solve_schedule(exams, salles, slots, graph.adjacency(), runs=runs,
+                                  time_budget=time_budget, progress=progress, stop_event=stop_event)
+        
+        assignments = list(schedule.assignments(exams, slots))
+        rows = [
+            (exam.module_id, session_id, slot.date, slot.heure_debut, slot.heure_fin,
+             exam.duree_minutes, placement.room.id if placement else None, 'EN_ATTENTE',
+             exam.formation_id, exam.groupe_id, placement.places if placement else None)
+            for exam, slot, placement in assignments
+        ]
+        
+        # Vérification indépendante du résultat (chevauchements salle / groupe)
+        schedule.statistics['conflicts_remaining'] = len(detect_conflicts(
+            {'id': exam.key, 'module_id': exam.module_id, 'groupe_id': exam.groupe_id,
+             'salle_id': placement.room.id if placement else None, 'date_examen': slot.date,
+             'heure_debut': slot.heure_debut, 'duree_minutes': exam.duree_minutes}
+            for exam, slot, placement in assignments
+        ))
+        
+        _report(progress, "enregistrement", cost=schedule.cost,
+                unscheduled_exams=schedule.statistics['unscheduled_exams'],
+                conflicts_remaining=schedule.statistics['conflicts_remaining'])
+        
+        # Écriture par lots : quelques requêtes au lieu d'une par examen
+        bulk_insert_examens(cursor, rows)
+        
+        # Surveillants : une fois les examens datés et placés en salle
+        _report(progress, "surveillants")
+        surveillances = safe_assign_surveillances(cursor, session_id)
         
         # Mettre à jour le statut de la session
         cursor.execute("""
@@ -89,70 +151,301 @@ def create_session_and_generate_exams(nom_session, date_debut, date_fin, formati
         """, (session_id,))
         
         conn.commit()
+        refresh_stats()
+        
+        statistics = schedule.statistics
+        message = f"Planification terminée : {statistics['planned_exams']}/{statistics['total_exams']} examens placés"
+        if statistics['unscheduled_exams']:
+            message += f", {statistics['unscheduled_exams']} sans créneau (période ou salles insuffisantes)"
+        if statistics['exams_without_room']:
+            message += f", {statistics['exams_without_room']} sans salle"
+        if statistics['split_exams']:
+            message += f", {statistics['split_exams']} groupe(s) répartis sur plusieurs salles"
+        if statistics['capacity_overflows']:
+            message += f", {statistics['capacity_overflows']} examen(s) sans assez de places"
+        if surveillances:
+            statistics['invigilation'] = surveillances
+            message += f", {surveillances['assigned_duties']}/{surveillances['total_duties']} surveillances affectées"
+        if statistics.get('stopped_early'):
+            message += " (arrêtée avant la fin du budget : meilleure solution trouvée conservée)"
+        
+        _report(progress, "terminé", cost=schedule.cost,
+                unscheduled_exams=statistics['unscheduled_exams'],
+                conflicts_remaining=statistics['conflicts_remaining'])
         
         return {
             "success": True,
-            "message": f"Session créée avec {examens_crees} examens générés",
+            "message": f"Session créée avec {len(rows)} examens générés",
             "session_id": session_id,
             "planning_results": {
-                "execution_time": 1.5,
-                "message": "Planification simplifiée terminée",
-                "statistics": {
-                    "total_exams": examens_crees,
-                    "planned_exams": examens_crees,
-                    "conflicts_resolved": 0
-                }
+                "execution_time": round(time.perf_counter() - start, 2),
+                "message": message,
+                "statistics": statistics
             }
         }
         
     except Exception as e:
+        if conn:
+            conn.rollback()
         return {"success": False, "message": f"Erreur: {str(e)}"}
+    finally:
+        if conn:
+            conn.close()
 
-def planify_session_exams(session_id):
+def _overlapping_slots(slots_by_date, date_examen, heure_debut, duree_minutes, heure_fin):
+    """Créneaux de la grille qui chevauchent un examen déjà placé"""
+    interval = exam_interval(date_examen, heure_debut, duree_minutes, heure_fin)
+    if interval is None:
+        return []
+    debut, fin = interval
+    return [
+        slot for slot in slots_by_date.get(date_examen, ())
+        if datetime.combine(slot.date, slot.heure_debut) < fin
+        and debut < datetime.combine(slot.date, slot.heure_fin)
+    ]
+
+def _load_epreuves(cursor, session_id):
     """
-    Replanifier les examens d'une session existante
-    Version simplifiée
+    Examens d'une session regroupés par épreuve (module, groupe) :
+    un groupe réparti sur plusieurs salles a une ligne par salle.
     """
+    cursor.execute("""
+        SELECT e.id, e.module_id, COALESCE(e.formation_id, m.formation_id) AS formation_id,
+               e.groupe_id, COALESCE(g.effectif, 0) AS effectif,
+               e.date_examen, e.heure_debut, e.heure_fin,
+               COALESCE(e.duree_minutes, %s) AS duree_minutes, e.salle_id, e.statut
+        FROM examens e
+        JOIN modules m ON e.module_id = m.id
+        LEFT JOIN groupes g ON e.groupe_id = g.id
+        WHERE e.session_id = %s
+        ORDER BY e.module_id, e.groupe_id, e.id
+    """, (DEFAULT_DUREE, session_id))
+    epreuves = {}
+    for row in cursor.fetchall():
+        epreuves.setdefault((row.module_id, row.groupe_id), []).append(row)
+    return list(epreuves.values())
+
+def planify_session_exams(session_id, time_budget=TIME_BUDGET, runs=None):
+    """
+    Replanifier une session après la validation des chefs de département.
+    Les examens acceptés (CONFIRME / VALIDE) ne bougent pas ; seuls les examens
+    refusés et les examens non acceptés qui sont en conflit avec eux sont
+    replacés (jamais sur le créneau refusé). Seules les lignes dont l'horaire
+    ou la salle change sont écrites ; elles repassent EN_ATTENTE.
+    """
+    start = time.perf_counter()
+    conn = None
     try:
         conn = get_connection()
         if not conn:
             return {"success": False, "message": "Erreur de connexion"}
         
-        cursor = conn.cursor(dictionary=True)
+        cursor = conn.cursor(cursor_factory=RowCursor)
         
-        # Vérifier que la session existe
-        cursor.execute("SELECT id, nom FROM sessions WHERE id = %s", (session_id,))
+        # Vérifier que la session existe (et la verrouiller pendant la replanification)
+        cursor.execute("""
+            SELECT id, nom, date_debut, date_fin, statut FROM sessions
+            WHERE id = %s FOR UPDATE
+        """, (session_id,))
         session = cursor.fetchone()
         
         if not session:
             return {"success": False, "message": "Session non trouvée"}
         
-        # Simuler une replanification
+        epreuves = _load_epreuves(cursor, session_id)
+        refusees = {i for i, rows in enumerate(epreuves) if any(r.statut == 'REFUSE' for r in rows)}
+        if not refusees:
+            conn.rollback()
+            return {"success": True, "message": "Aucun examen refusé : rien à replanifier", "exams_updated": 0}
+        
+        # Voisinage : épreuves non acceptées en conflit avec une épreuve refusée
+        adjacency = build_conflict_graph(
+            range(len(epreuves)),
+            [rows[0].groupe_id for rows in epreuves],
+            {rows[0].groupe_id: rows[0].effectif for rows in epreuves},
+        ).adjacency()
+        fixes = {i for i, rows in enumerate(epreuves) if all(r.statut in STATUTS_FIXES for r in rows)}
+        mobiles = sorted(refusees | {n for i in refusees for n in adjacency[i] if n not in fixes})
+        position = {i: j for j, i in enumerate(mobiles)}
+        
+        slots = build_slots(session.date_debut, session.date_fin)
+        if not slots:
+            conn.rollback()
+            return {"success": False, "message": "Aucun créneau disponible dans la période de la session"}
+        slots_by_date = {}
+        for slot in slots:
+            slots_by_date.setdefault(slot.date, []).append(slot)
+        
+        # Ce qui ne bouge pas : créneaux et salles occupés, examens du jour par groupe
+        slots_of = {}
+        occupied = {}
+        group_day = {}
+        for i, rows in enumerate(epreuves):
+            first = rows[0]
+            slots_of[i] = _overlapping_slots(slots_by_date, first.date_examen, first.heure_debut,
+                                             first.duree_minutes, first.heure_fin)
+            if i in position:
+                continue
+            for slot in slots_of[i]:
+                occupied.setdefault(slot.index, set()).update(r.salle_id for r in rows if r.salle_id)
+            for day in {slot.day for slot in slots_of[i]}:
+                group_day[(first.groupe_id, day)] = group_day.get((first.groupe_id, day), 0) + 1
+        
+        requests = []
+        blocked = {}
+        preferred = {}
+        for j, i in enumerate(mobiles):
+            first = epreuves[i][0]
+            requests.append(ExamRequest(j, first.module_id, first.formation_id, first.groupe_id,
+                                        first.effectif, first.duree_minutes))
+            interdits = {slot.index for n in adjacency[i] if n not in position for slot in slots_of[n]}
+            if i in refusees:
+                interdits.update(slot.index for slot in slots_of[i])
+            elif slots_of[i]:
+                # Un examen en attente garde son créneau tant que c'est possible
+                preferred[j] = slots_of[i][0].index
+            blocked[j] = interdits
+        sub_adjacency = [{position[n] for n in adjacency[i] if n in position} for i in mobiles]
+        
+        cursor.execute("SELECT id, nom, capacite, type FROM salles ORDER BY capacite")
+        salles = [Room(r.id, r.nom, r.capacite or 0, r.type or "SALLE") for r in cursor.fetchall()]
+        
+        schedule = solve_schedule(requests, salles, slots, sub_adjacency, runs=runs, time_budget=time_budget,
+                                  blocked=blocked, occupied=occupied, group_day=group_day,
+                                  preferred=preferred)
+        
+        # Différence minimale avec l'existant
+        updates, inserts, deletes = [], [], []
+        moved = unplaced = 0
+        for exam in requests:
+            rows = epreuves[mobiles[exam.key]]
+            slot_index = schedule.slot_of[exam.key]
+            if slot_index < 0:
+                unplaced += 1
+                continue
+            slot = slots[slot_index]
+            # (salle, places) par ligne ; (None, None) : examen sans salle
+            salles = [(p.room.id, p.places) for p in schedule.rooms_of[exam.key]] or [(None, None)]
+            unchanged = (
+                all(r.date_examen == slot.date and r.heure_debut == slot.heure_debut
+                    and r.statut != 'REFUSE' for r in rows)
+                and sorted(r.salle_id or 0 for r in rows) == sorted(s or 0 for s, _ in salles)
+            )
+            if unchanged:
+                continue
+            moved += 1
+            for row, (salle_id, nb_places) in zip(rows, salles):
+                updates.append((row.id, slot.date, slot.heure_debut, slot.heure_fin, salle_id, nb_places))
+            for salle_id, nb_places in salles[len(rows):]:
+                inserts.append((exam.module_id, session_id, slot.date, slot.heure_debut, slot.heure_fin,
+                                exam.duree_minutes, salle_id, 'EN_ATTENTE', exam.formation_id, exam.groupe_id,
+                                nb_places))
+            deletes.extend(row.id for row in rows[len(salles):])
+        
+        if updates:
+            execute_values(cursor, """
+                UPDATE examens AS e
+                SET date_examen = v.date_examen, heure_debut = v.heure_debut, heure_fin = v.heure_fin,
+                    salle_id = v.salle_id, nb_places = v.nb_places, statut = 'EN_ATTENTE', last_modified = NOW()
+                FROM (VALUES %s) AS v(id, date_examen, heure_debut, heure_fin, salle_id, nb_places)
+                WHERE e.id = v.id
+            """, updates, template="(%s, %s::date, %s::time, %s::time, %s::int, %s::int)", page_size=1000)
+        if deletes:
+            cursor.execute("DELETE FROM examens WHERE id = ANY(%s)", (deletes,))
+        new_ids = bulk_insert_examens(cursor, inserts, returning=True)
+        
+        # Surveillants des seules lignes modifiées
+        changed = [u[0] for u in updates] + new_ids
+        surveillances = safe_assign_surveillances(cursor, session_id, examen_ids=changed) if changed else None
+        
+        if changed and session.statut in SESSIONS_PUBLIEES:
+            safe_publish_snapshots(cursor, session_id)
+        
+        conn.commit()
+        if changed or deletes:
+            refresh_stats()
+            invalidate_conflict_graph(session_id)
+        
+        statistics = schedule.statistics
+        statistics.update({
+            "refused_exams": len(refusees),
+            "replanned_exams": len(mobiles),
+            "moved_exams": moved,
+            "rows_updated": len(updates),
+            "rows_inserted": len(inserts),
+            "rows_deleted": len(deletes),
+            "execution_time": round(time.perf_counter() - start, 3),
+        })
+        if surveillances:
+            statistics['invigilation'] = surveillances
+        
+        message = (f"Replanification terminée : {moved} épreuve(s) déplacée(s) sur {len(mobiles)} "
+                   f"à replanifier ({len(refusees)} refusée(s)), les examens acceptés n'ont pas bougé")
+        if unplaced:
+            message += f", {unplaced} sans créneau libre"
+        
+        return {
+            "success": True,
+            "message": message,
+            "exams_updated": len(updates) + len(inserts) + len(deletes),
+            "statistics": statistics
+        }
+        
+    except Exception as e:
+        if conn:
+            conn.rollback()
+        return {"success": False, "message": f"Erreur: {str(e)}"}
+    finally:
+        if conn:
+            conn.close()
+
+def confirm_and_publish_session(session_id):
+    """
+    Confirmer les examens en attente d'une session et la publier (PUBLIEE).
+    Ancienne action du bouton « Replanifier », séparée de la replanification
+    des examens refusés ; les emplois du temps publiés sont calculés dans la transaction.
+    """
+    conn = None
+    try:
+        conn = get_connection()
+        if not conn:
+            return {"success": False, "message": "Erreur de connexion"}
+        
+        cursor = conn.cursor()
+        cursor.execute("SELECT id FROM sessions WHERE id = %s FOR UPDATE", (session_id,))
+        if cursor.fetchone() is None:
+            return {"success": False, "message": "Session non trouvée"}
+        
         cursor.execute("""
             UPDATE examens 
             SET statut = 'CONFIRME' 
             WHERE session_id = %s AND statut = 'EN_ATTENTE'
         """, (session_id,))
-        
         exams_updated = cursor.rowcount
         
-        # Mettre à jour le statut de la session
         cursor.execute("""
             UPDATE sessions 
             SET statut = 'PUBLIEE' 
             WHERE id = %s
         """, (session_id,))
+        safe_publish_snapshots(cursor, session_id)
         
         conn.commit()
+        refresh_stats()
         
         return {
             "success": True,
-            "message": f"Replanification terminée: {exams_updated} examens confirmés",
+            "message": f"Session publiée : {exams_updated} examens confirmés",
             "exams_updated": exams_updated
         }
         
     except Exception as e:
+        if conn:
+            conn.rollback()
         return {"success": False, "message": f"Erreur: {str(e)}"}
+    finally:
+        if conn:
+            conn.close()
 
 class SimplePlanningGenerator:
     """
@@ -0,0 +1,86 @@
+# backend/cache.py - CACHE EN MÉMOIRE DES DONNÉES DE RÉFÉRENCE
+"""
+Cache partagé par toutes les sessions Streamlit du processus.
+
+Chaque entrée appartient à un espace de noms ("formations", "salles", ...)
+et expire après un TTL. invalidate(namespace) incrémente la version de
+l'espace de noms : toutes ses entrées deviennent obsolètes immédiatement,
+sans attendre le TTL. Les formulaires d'ajout de l'administrateur appellent
+invalidate() juste après leur COMMIT.
+"""
+import functools
+import threading
+import time
+
+# Durée de vie par défaut d'une entrée (secondes)
+DEFAULT_TTL = 600
+
+_entries = {}    # (namespace, clé) -> (version, expiration, valeur)
+_versions = {}   # namespace -> version courante
+_lock = threading.Lock()
+
+
+def version(namespace):
+    """Version courante d'un espace de noms (change à chaque invalidation)"""
+    with _lock:
+        return _versions.get(namespace, 0)
+
+
+def invalidate(*namespaces):
+    """Rendre obsolètes toutes les entrées des espaces de noms donnés"""
+    with _lock:
+        for namespace in namespaces:
+            _versions[namespace] = _versions.get(namespace, 0) + 1
+            for key in [k for k in _entries if k[0] == namespace]:
+                del _entries[key]
+
+
+def clear():
+    """Vider entièrement le cache"""
+    with _lock:
+        _entries.clear()
+        for namespace in _versions:
+            _versions[namespace] += 1
+
+
+def get_or_load(namespace, key, loader, ttl=DEFAULT_TTL):
+    """
+    Retourner la valeur en cache ou l'obtenir via loader().
+    Une valeur vide (liste vide, None) n'est pas mise en cache : une erreur de
+    connexion ne doit pas masquer les données pendant tout le TTL.
+    """
+    cache_key = (namespace, key)
+    now = time.monotonic()
+    with _lock:
+        current = _versions.get(namespace, 0)
+        entry = _entries.get(cache_key)
+        if entry and entry[0] == current and entry[1] > now:
+            return entry[2]
+
+    value = loader()
+
+    if value:
+        with _lock:
+            # Ne pas enregistrer une valeur chargée avant une invalidation concurrente
+            if _versions.get(namespace, 0) == current:
+                _entries[cache_key] = (current, now + ttl, value)
+    return value
+
+
+def cached(namespace, ttl=DEFAULT_TTL):
+    """
+    Décorateur : met en cache le résultat d'une fonction de lecture selon ses arguments.
+    Les listes sont retournées en copie pour que l'appelant puisse les modifier.
+
+        @cached("formations")
+        def fetch_formations(): ...
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            key = (func.__name__, args, tuple(sorted(kwargs.items())))
+            value = get_or_load(namespace, key, lambda: func(*args, **kwargs), ttl)
+            return list(value) if isinstance(value, list) else value
+        wrapper.uncached = func
+        return wrapper
+    return decorator
@@ -0,0 +1,179 @@
+# backend/conflict_graph.py - GRAPHE DE CONFLITS ENTRE EXAMENS
+"""
+Graphe examen × examen construit par produits de matrices d'incidence creuses.
+
+- Étudiants : A_g (examens × groupes) · diag(étudiants par groupe) · A_gᵀ
+  donne le nombre d'étudiants partagés par deux examens sans charger les étudiants.
+- Surveillants : A_p (examens × professeurs) · A_pᵀ donne le nombre de
+  surveillants partagés.
+
+Le graphe d'une session est chargé une fois puis gardé en mémoire ;
+neighbors() et conflicts() répondent ensuite sans requête SQL.
+"""
+import threading
+import time
+
+import numpy as np
+from scipy import sparse
+
+from .database import get_connection
+
+# Durée de vie (secondes) d'un graphe de session en mémoire
+CACHE_TTL = 300
+
+_cache = {}
+_cache_lock = threading.Lock()
+
+
+class ConflictGraph:
+    """Graphe de conflits entre examens (lignes dans l'ordre de exam_ids)"""
+
+    def __init__(self, exam_ids, students, invigilators=None):
+        self.exam_ids = list(exam_ids)
+        self.index = {exam_id: row for row, exam_id in enumerate(self.exam_ids)}
+        self.students = students.tocsr()
+        self.invigilators = invigilators.tocsr() if invigilators is not None else None
+
+        combined = self.students if self.invigilators is None else self.students + self.invigilators
+        # Retirer la diagonale (un examen n'est pas en conflit avec lui-même)
+        combined = (combined - sparse.diags(combined.diagonal(), dtype=combined.dtype)).tocsr()
+        combined.eliminate_zeros()
+        # Matrice d'adjacence CSR : voisins de la ligne r = indices[indptr[r]:indptr[r + 1]]
+        self.matrix = combined
+        self._adjacency = [
+            frozenset(combined.indices[combined.indptr[row]:combined.indptr[row + 1]].tolist())
+            for row in range(len(self.exam_ids))
+        ]
+
+    def __len__(self):
+        return len(self.exam_ids)
+
+    @property
+    def edge_count(self):
+        return sum(len(n) for n in self._adjacency) // 2
+
+    def adjacency(self):
+        """Liste d'ensembles d'indices de lignes voisines (format attendu par ExamScheduler)"""
+        return [set(n) for n in self._adjacency]
+
+    def neighbors(self, exam_id):
+        """Identifiants des examens en conflit avec exam_id"""
+        row = self.index.get(exam_id)
+        if row is None:
+            return set()
+        return {self.exam_ids[other] for other in self._adjacency[row]}
+
+    def conflicts(self, exam_a, exam_b):
+        """Vrai si les deux examens partagent des étudiants ou des surveillants"""
+        row_a = self.index.get(exam_a)
+        row_b = self.index.get(exam_b)
+        if row_a is None or row_b is None or row_a == row_b:
+            return False
+        return row_b in self._adjacency[row_a]
+
+    def shared_students(self, exam_a, exam_b):
+        """Nombre d'étudiants communs aux deux examens"""
+        return int(self.students[self.index[exam_a], self.index[exam_b]])
+
+    def shared_invigilators(self, exam_a, exam_b):
+        """Nombre de surveillants communs aux deux examens"""
+        if self.invigilators is None:
+            return 0
+        return int(self.invigilators[self.index[exam_a], self.index[exam_b]])
+
+
+def _incidence(rows, values, n_rows):
+    """Matrice d'incidence creuse n_rows × (valeurs distinctes) à partir de couples (ligne, valeur)"""
+    rows = np.asarray(rows, dtype=np.int64)
+    values = np.asarray(values)
+    if rows.size == 0:
+        return sparse.csr_matrix((n_rows, 0), dtype=np.int64), np.array([])
+    uniques, columns = np.unique(values, return_inverse=True)
+    data = np.ones(rows.size, dtype=np.int64)
+    matrix = sparse.csr_matrix((data, (rows, columns)), shape=(n_rows, uniques.size))
+    # Un couple dupliqué ne doit compter qu'une fois
+    matrix.data[:] = 1
+    return matrix, uniques
+
+
+def build_conflict_graph(exam_ids, exam_groupes, group_sizes=None, surveillances=()):
+    """
+    Construire le graphe de conflits.
+    exam_ids      : identifiants des examens (lignes de la matrice)
+    exam_groupes  : groupe de chaque examen (même ordre que exam_ids)
+    group_sizes   : {groupe_id: nombre d'étudiants} ; un groupe sans étudiant compte pour 1
+    surveillances : couples (examen_id, prof_id)
+    """
+    exam_ids = list(exam_ids)
+    n = len(exam_ids)
+    group_sizes = group_sizes or {}
+
+    rows = [row for row, groupe_id in enumerate(exam_groupes) if groupe_id is not None]
+    groupes = [exam_groupes[row] for row in rows]
+    a_groupes, uniques = _incidence(rows, groupes, n)
+    weights = np.array([max(int(group_sizes.get(g, 0)), 1) for g in uniques.tolist()], dtype=np.int64)
+    students = a_groupes @ sparse.diags(weights, dtype=np.int64) @ a_groupes.T
+
+    invigilators = None
+    if surveillances:
+        index = {exam_id: row for row, exam_id in enumerate(exam_ids)}
+        pairs = [(index[e], p) for e, p in surveillances if e in index]
+        if pairs:
+            a_profs, _ = _incidence([r for r, _ in pairs], [p for _, p in pairs], n)
+            invigilators = a_profs @ a_profs.T
+
+    return ConflictGraph(exam_ids, students, invigilators)
+
+
+def load_session_conflict_graph(session_id, refresh=False):
+    """Graphe de conflits d'une session, chargé en trois requêtes puis gardé en mémoire"""
+    now = time.monotonic()
+    if not refresh:
+        with _cache_lock:
+            cached = _cache.get(session_id)
+        if cached and now - cached[1] < CACHE_TTL:
+            return cached[0]
+
+    conn = get_connection()
+    if conn is None:
+        return None
+    try:
+        cursor = conn.cursor()
+        cursor.execute("SELECT id, groupe_id FROM examens WHERE session_id = %s ORDER BY id", (session_id,))
+        examens = cursor.fetchall()
+
+        cursor.execute("""
+            SELECT g.id, COALESCE(NULLIF(COUNT(et.id), 0), g.effectif, 0)
+            FROM groupes g
+            LEFT JOIN etudiants et ON et.groupe_id = g.id
+            WHERE g.id IN (SELECT DISTINCT groupe_id FROM examens WHERE session_id = %s)
+            GROUP BY g.id, g.effectif
+        """, (session_id,))
+        group_sizes = dict(cursor.fetchall())
+
+        cursor.execute("""
+            SELECT sv.examen_id, sv.prof_id
+            FROM surveillances sv
+            JOIN examens e ON sv.examen_id = e.id
+            WHERE e.session_id = %s
+        """, (session_id,))
+        surveillances = cursor.fetchall()
+        cursor.close()
+    finally:
+        conn.close()
+
+    graph = build_conflict_graph(
+        [e[0] for e in examens], [e[1] for e in examens], group_sizes, surveillances
+    )
+    with _cache_lock:
+        _cache[session_id] = (graph, now)
+    return graph
+
+
+def invalidate_conflict_graph(session_id=None):
+    """Oublier le graphe d'une session (ou de toutes) après une modification des examens"""
+    with _cache_lock:
+        if session_id is None:
+            _cache.clear()
+        else:
+            _cache.pop(session_id, None)
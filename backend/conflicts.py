@@ -0,0 +1,276 @@
+# backend/conflicts.py - DÉTECTION DES CONFLITS D'EXAMENS
+"""
+Détection des chevauchements par balayage d'intervalles triés.
+
+Pour chaque ressource (salle, groupe, surveillant) les examens sont triés par
+heure de début ; un tas des heures de fin actives donne, à chaque nouvel
+examen, tous ceux qui sont encore en cours. Coût : O(n log n + k) pour k conflits.
+
+Pour les examens enregistrés (load_conflicts), les conflits d'étudiants et de
+surveillants viennent du graphe de conflits de la session, gardé en mémoire
+(backend.conflict_graph) : seuls les couples voisins dans le graphe sont
+comparés, en O(arêtes) au lieu de tous les couples d'un même créneau.
+
+Utilisable depuis le planificateur, le tableau de bord du chef de département
+ou en ligne de commande :
+
+    python -m backend.conflicts --session 3
+"""
+import argparse
+import heapq
+import sys
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+
+from .conflict_graph import load_session_conflict_graph
+from .database import get_connection
+
+DUREE_PAR_DEFAUT = 120
+
+SALLE = "SALLE"
+GROUPE = "GROUPE"
+PROF = "PROF"
+
+LIBELLES = {
+    SALLE: "Salle double utilisation",
+    GROUPE: "Étudiants dans deux examens simultanés",
+    PROF: "Surveillant dans deux examens simultanés",
+}
+
+
+@dataclass(frozen=True)
+class Conflict:
+    """Deux examens qui utilisent la même ressource sur des horaires qui se chevauchent"""
+    kind: str
+    resource: object
+    exam_a: int
+    exam_b: int
+    start: datetime
+    end: datetime
+    shared: int = 0   # étudiants / surveillants communs (conflits issus du graphe)
+
+
+def exam_interval(date_examen, heure_debut, duree_minutes=None, heure_fin=None):
+    """Intervalle [début, fin[ d'un examen ; None si l'examen n'est pas daté"""
+    if date_examen is None or heure_debut is None:
+        return None
+    if isinstance(heure_debut, str):
+        heure_debut = datetime.strptime(heure_debut[:5], "%H:%M").time()
+    start = datetime.combine(date_examen, heure_debut)
+    if duree_minutes:
+        return start, start + timedelta(minutes=duree_minutes)
+    if heure_fin is not None:
+        if isinstance(heure_fin, str):
+            heure_fin = datetime.strptime(heure_fin[:5], "%H:%M").time()
+        end = datetime.combine(date_examen, heure_fin)
+        if end > start:
+            return start, end
+    return start, start + timedelta(minutes=DUREE_PAR_DEFAUT)
+
+
+def find_overlaps(intervals):
+    """
+    Tous les couples qui se chevauchent sur une même ressource.
+    intervals : itérable de (ressource, examen_id, début, fin)
+    Retourne une liste de (ressource, examen_a, examen_b, début du chevauchement, fin du chevauchement).
+    """
+    overlaps = []
+    current = object()
+    active = []  # tas (fin, examen_id)
+
+    for resource, exam_id, start, end in sorted(intervals, key=lambda i: (i[0], i[2], i[3])):
+        if resource != current:
+            current = resource
+            active = []
+        while active and active[0][0] <= start:
+            heapq.heappop(active)
+        for other_end, other_id in active:
+            overlaps.append((resource, other_id, exam_id, start, min(end, other_end)))
+        heapq.heappush(active, (end, exam_id))
+
+    return overlaps
+
+
+def detect_conflicts(examens, surveillances=(), kinds=(SALLE, GROUPE, PROF)):
+    """
+    Détecter les conflits de salle, de groupe (étudiants) et de surveillant.
+    examens : dicts/lignes avec id, date_examen, heure_debut, duree_minutes, heure_fin,
+              salle_id, groupe_id, module_id
+    surveillances : couples (examen_id, prof_id)
+    kinds : types de conflits à balayer
+    """
+    intervals = {}
+    salles, groupes = [], []
+    modules = {}
+
+    for examen in examens:
+        interval = exam_interval(
+            examen['date_examen'], examen['heure_debut'],
+            examen.get('duree_minutes'), examen.get('heure_fin')
+        )
+        if interval is None:
+            continue
+        exam_id = examen['id']
+        intervals[exam_id] = interval
+        modules[exam_id] = examen.get('module_id')
+        if examen.get('salle_id') is not None:
+            salles.append((examen['salle_id'], exam_id) + interval)
+        if examen.get('groupe_id') is not None:
+            groupes.append((examen['groupe_id'], exam_id) + interval)
+
+    profs = [(prof_id, exam_id) + intervals[exam_id]
+             for exam_id, prof_id in surveillances if exam_id in intervals]
+
+    conflicts = []
+    for kind, items in ((SALLE, salles), (GROUPE, groupes), (PROF, profs)):
+        if kind not in kinds:
+            continue
+        for resource, exam_a, exam_b, start, end in find_overlaps(items):
+            # Un même module pour un même groupe réparti sur plusieurs salles n'est pas un conflit
+            if kind == GROUPE and modules[exam_a] is not None and modules[exam_a] == modules[exam_b]:
+                continue
+            if kind == PROF and exam_a == exam_b:
+                continue
+            conflicts.append(Conflict(kind, resource, exam_a, exam_b, start, end))
+    return conflicts
+
+
+def detect_graph_conflicts(examens, graphs):
+    """
+    Conflits d'étudiants et de surveillants entre examens enregistrés.
+    Pour chaque examen, seuls ses voisins dans le graphe de conflits de sa session
+    (lignes CSR indptr / indices) sont testés : coût O(arêtes) et non O(k²) par créneau.
+    graphs : {session_id: ConflictGraph}
+    """
+    by_session = {}
+    for examen in examens:
+        interval = exam_interval(
+            examen['date_examen'], examen['heure_debut'],
+            examen.get('duree_minutes'), examen.get('heure_fin')
+        )
+        if interval is None or graphs.get(examen['session_id']) is None:
+            continue
+        by_session.setdefault(examen['session_id'], {})[examen['id']] = (examen, interval)
+
+    conflicts = []
+    for session_id, actifs in by_session.items():
+        graph = graphs[session_id]
+        indptr, indices = graph.matrix.indptr, graph.matrix.indices
+        for exam_a, (a, (start_a, end_a)) in actifs.items():
+            row = graph.index.get(exam_a)
+            if row is None:
+                continue
+            for other in indices[indptr[row]:indptr[row + 1]].tolist():
+                exam_b = graph.exam_ids[other]
+                # Chaque couple une seule fois ; examens non actifs ignorés
+                if exam_b <= exam_a or exam_b not in actifs:
+                    continue
+                b, (start_b, end_b) = actifs[exam_b]
+                start, end = max(start_a, start_b), min(end_a, end_b)
+                if start >= end:
+                    continue
+                etudiants = graph.shared_students(exam_a, exam_b)
+                # Un même module pour un même groupe réparti sur plusieurs salles n'est pas un conflit
+                if etudiants and not (a.get('module_id') is not None and a.get('module_id') == b.get('module_id')):
+                    conflicts.append(Conflict(GROUPE, a.get('groupe_id'), exam_a, exam_b, start, end, etudiants))
+                surveillants = graph.shared_invigilators(exam_a, exam_b)
+                if surveillants:
+                    conflicts.append(Conflict(PROF, None, exam_a, exam_b, start, end, surveillants))
+    return conflicts
+
+
+def detect_capacity_issues(examens):
+    """
+    Épreuves dont l'effectif dépasse les places réellement attribuées.
+    Les lignes d'un même module/groupe/horaire (groupe réparti sur plusieurs salles) sont cumulées ;
+    chaque ligne compte min(nb_places, capacité de sa salle), ou la capacité si nb_places est NULL.
+    """
+    epreuves = {}
+    for examen in examens:
+        if examen.get('salle_id') is None or examen.get('capacite') is None:
+            continue
+        cle = (examen.get('module_id'), examen.get('groupe_id'), examen['date_examen'], examen['heure_debut'])
+        epreuve = epreuves.setdefault(cle, {"examen": examen, "capacite": 0, "places": 0, "salles": []})
+        epreuve["capacite"] += examen['capacite']
+        nb_places = examen.get('nb_places')
+        epreuve["places"] += examen['capacite'] if nb_places is None else min(nb_places, examen['capacite'])
+        epreuve["salles"].append(examen.get('salle_nom') or str(examen['salle_id']))
+
+    issues = []
+    for epreuve in epreuves.values():
+        effectif = epreuve["examen"].get('effectif') or 0
+        if effectif > epreuve["places"]:
+            issues.append({**epreuve, "effectif": effectif, "deficit": effectif - epreuve["places"]})
+    issues.sort(key=lambda i: i["deficit"], reverse=True)
+    return issues
+
+
+def load_conflicts(session_id=None, statuts=('EN_ATTENTE', 'CONFIRME')):
+    """
+    Charger les examens actifs (d'une session ou de toutes) et détecter les conflits :
+    salles par balayage, étudiants et surveillants par le graphe de conflits de chaque session.
+    Retourne (conflits, problèmes de capacité, {examen_id: ligne d'examen}).
+    """
+    conn = get_connection()
+    if conn is None:
+        return None
+
+    try:
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT e.id, e.session_id, e.module_id, e.groupe_id, e.salle_id, e.nb_places,
+                   e.date_examen, e.heure_debut, e.heure_fin, e.duree_minutes,
+                   m.nom, g.nom, g.effectif, s.nom, s.capacite
+            FROM examens e
+            JOIN modules m ON e.module_id = m.id
+            LEFT JOIN groupes g ON e.groupe_id = g.id
+            LEFT JOIN salles s ON e.salle_id = s.id
+            WHERE e.statut = ANY(%s)
+            AND (%s IS NULL OR e.session_id = %s)
+        """, (list(statuts), session_id, session_id))
+        columns = ('id', 'session_id', 'module_id', 'groupe_id', 'salle_id', 'nb_places',
+                   'date_examen', 'heure_debut', 'heure_fin', 'duree_minutes',
+                   'module_nom', 'groupe_nom', 'effectif', 'salle_nom', 'capacite')
+        examens = [dict(zip(columns, row)) for row in cursor.fetchall()]
+        cursor.close()
+    finally:
+        conn.close()
+
+    graphs = {sid: load_session_conflict_graph(sid) for sid in {examen['session_id'] for examen in examens}}
+    conflicts = detect_conflicts(examens, kinds=(SALLE,))
+    conflicts += detect_graph_conflicts(examens, graphs)
+    return (
+        conflicts,
+        detect_capacity_issues(examens),
+        {examen['id']: examen for examen in examens},
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Détecter les conflits d'examens")
+    parser.add_argument("--session", type=int, default=None, help="ID de la session (toutes par défaut)")
+    args = parser.parse_args(argv)
+
+    result = load_conflicts(args.session)
+    if result is None:
+        print("❌ Impossible de se connecter à la base de données")
+        return 2
+
+    conflicts, capacity_issues, examens = result
+    for conflict in conflicts:
+        a, b = examens[conflict.exam_a], examens[conflict.exam_b]
+        ressource = conflict.resource if conflict.kind != PROF else f"{conflict.shared} en commun"
+        print(f"⚠️ {LIBELLES[conflict.kind]} ({conflict.kind} {ressource}) "
+              f"{conflict.start:%d/%m/%Y %H:%M}-{conflict.end:%H:%M}: "
+              f"{a['module_nom']} [#{a['id']}] / {b['module_nom']} [#{b['id']}]")
+    for issue in capacity_issues:
+        examen = issue["examen"]
+        print(f"👥 Capacité insuffisante: {examen['module_nom']} - {examen['groupe_nom']} "
+              f"({issue['effectif']} étudiants pour {issue['places']} places)")
+
+    print(f"\n📊 {len(conflicts)} conflit(s), {len(capacity_issues)} problème(s) de capacité")
+    return 1 if conflicts or capacity_issues else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,36 +1,72 @@
 # backend/database.py - VERSION CORRIGÉE
-import psycopg2
 from psycopg2 import Error
+from psycopg2.extensions import cursor as _BaseCursor
+from psycopg2.extras import execute_values
 import hashlib
+import hmac
+import io
+import logging
 import os
+import threading
+from collections import namedtuple
+from contextlib import contextmanager
 from datetime import datetime
 from dotenv import load_dotenv
 
+from .cache import cached
+from .pool import ConnectionPool
+
 # Charger les variables d'environnement
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
+# Pool unique pour tout le processus (partagé par les reruns Streamlit et db.py)
+_pool = None
+_pool_lock = threading.Lock()
+
+def get_pool():
+    """Retourner le pool de connexions du processus (créé au premier appel)"""
+    global _pool
+    if _pool is not None:
+        return _pool
+
+    with _pool_lock:
+        if _pool is None:
+            # Récupérer l'URL depuis .env
+            database_url = os.getenv("DATABASE_URL")
+
+            if not database_url:
+                print("❌ DATABASE_URL non trouvé dans .env")
+                print("Créez un fichier .env avec: DATABASE_URL=votre_url_neon")
+                return None
+
+            # Nettoyer l'URL
+            database_url = database_url.strip()
+            print("🔗 Initialisation du pool de connexions Neon PostgreSQL...")
+            print(f"URL utilisée: {database_url[:50]}...")
+
+            _pool = ConnectionPool(
+                database_url,
+                minconn=int(os.getenv("DB_POOL_MIN", "1")),
+                maxconn=int(os.getenv("DB_POOL_MAX", "10")),
+                max_idle=int(os.getenv("DB_POOL_MAX_IDLE", "300")),
+                health_check_after=int(os.getenv("DB_POOL_HEALTH_CHECK", "30")),
+                sslmode="require",
+            )
+    return _pool
+
 def get_connection():
-    """Établir la connexion à Neon PostgreSQL"""
+    """
+    Emprunter une connexion au pool Neon PostgreSQL.
+    conn.close() rend la connexion au pool au lieu de la fermer.
+    """
     try:
-        print("🔗 Tentative de connexion à Neon PostgreSQL...")
-        
-        # Récupérer l'URL depuis .env
-        database_url = os.getenv("DATABASE_URL")
-        
-        if not database_url:
-            print("❌ DATABASE_URL non trouvé dans .env")
-            print("Créez un fichier .env avec: DATABASE_URL=votre_url_neon")
+        pool = get_pool()
+        if pool is None:
             return None
-        
-        # Nettoyer l'URL
-        database_url = database_url.strip()
-        print(f"URL utilisée: {database_url[:50]}...")
-        
-        # Établir la connexion
-        conn = psycopg2.connect(database_url, sslmode="require")
-        print("✅ Connexion à Neon PostgreSQL réussie!")
-        return conn
-        
+        return pool.getconn()
+
     except Error as e:
         print(f"❌ ERREUR de connexion PostgreSQL: {e}")
         print("\n🔧 Dépannage:")
@@ -42,115 +78,585 @@ def get_connection():
         print(f"❌ Erreur inattendue: {e}")
         return None
 
+@contextmanager
+def connection():
+    """
+    Connexion empruntée au pool, toujours rendue en sortie de bloc.
+    Valide la transaction si le bloc se termine normalement, l'annule sinon.
+
+        with connection() as conn:
+            cursor = conn.cursor()
+            ...
+    """
+    conn = get_connection()
+    if conn is None:
+        raise Error("Impossible de se connecter à la base de données")
+    try:
+        yield conn
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+# ============================================================
+# LIGNES DE RÉSULTAT
+# ============================================================
+
+class _RowMixin:
+    """Accès par nom de colonne (row['nom']) en plus de l'accès par attribut et par position"""
+    __slots__ = ()
+    _index = {}
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            try:
+                return tuple.__getitem__(self, self._index[key])
+            except KeyError:
+                raise KeyError(key) from None
+        return tuple.__getitem__(self, key)
+
+    def get(self, key, default=None):
+        index = self._index.get(key)
+        return default if index is None else tuple.__getitem__(self, index)
+
+    def keys(self):
+        return list(self._index)
+
+_row_classes = {}
+
+def _row_class(columns):
+    """Classe de ligne (namedtuple) pour une liste de colonnes, créée une seule fois"""
+    cls = _row_classes.get(columns)
+    if cls is None:
+        base = namedtuple("Row", columns, rename=True)
+        index = {}
+        for position, column in enumerate(columns):
+            index.setdefault(column, position)
+        cls = type("Row", (_RowMixin, base), {"__slots__": (), "_index": index})
+        _row_classes[columns] = cls
+    return cls
+
+class RowCursor(_BaseCursor):
+    """
+    Curseur psycopg2 produisant des lignes légères (namedtuple) :
+    row['nom'], row.nom et row[0] fonctionnent, pd.DataFrame(rows) garde les noms de colonnes.
+
+        cursor = conn.cursor(cursor_factory=RowCursor)
+    """
+
+    def _row_type(self):
+        return _row_class(tuple(column.name for column in self.description))
+
+    def fetchone(self):
+        row = super().fetchone()
+        return None if row is None else self._row_type()._make(row)
+
+    def fetchmany(self, size=None):
+        rows = super().fetchmany(self.arraysize if size is None else size)
+        if not rows:
+            return rows
+        make = self._row_type()._make
+        return [make(row) for row in rows]
+
+    def fetchall(self):
+        rows = super().fetchall()
+        if not rows:
+            return rows
+        make = self._row_type()._make
+        return [make(row) for row in rows]
+
+    def __iter__(self):
+        rows = super().__iter__()
+        try:
+            first = next(rows)
+        except StopIteration:
+            return
+        make = self._row_type()._make
+        yield make(first)
+        for row in rows:
+            yield make(row)
+
+# Colonnes écrites par les générateurs de planning (ordre des tuples passés à bulk_insert_examens)
+EXAMEN_COLUMNS = (
+    "module_id", "session_id", "date_examen", "heure_debut", "heure_fin",
+    "duree_minutes", "salle_id", "statut", "formation_id", "groupe_id", "nb_places"
+)
+
+# Au-delà de ce nombre de lignes, COPY est préféré à INSERT ... VALUES
+COPY_THRESHOLD = 10000
+
+def _copy_value(value):
+    """Formater une valeur pour COPY ... FROM STDIN (format texte)"""
+    if value is None:
+        return "\\N"
+    text = value.isoformat() if hasattr(value, "isoformat") else str(value)
+    return (text.replace("\\", "\\\\").replace("\t", "\\t")
+                .replace("\n", "\\n").replace("\r", "\\r"))
+
+def bulk_insert_examens(cursor, rows, method=None, page_size=1000, returning=False):
+    """
+    Insérer des examens par lots sur le curseur fourni (la transaction reste à l'appelant).
+    rows      : tuples dans l'ordre de EXAMEN_COLUMNS
+    method    : "values" (INSERT multi-lignes, page_size lignes par requête),
+                "copy" (un seul COPY FROM STDIN) ou None pour choisir selon le volume
+    returning : retourner les id créés, dans l'ordre des lignes (impose "values")
+    """
+    if not rows:
+        return []
+
+    columns = ", ".join(EXAMEN_COLUMNS)
+    if method is None:
+        method = "copy" if len(rows) >= COPY_THRESHOLD and not returning else "values"
+
+    if method == "copy":
+        if returning:
+            raise ValueError("COPY ne peut pas retourner les id créés")
+        buffer = io.StringIO()
+        for row in rows:
+            buffer.write("\t".join(_copy_value(v) for v in row))
+            buffer.write("\n")
+        buffer.seek(0)
+        cursor.copy_expert(f"COPY examens ({columns}) FROM STDIN", buffer)
+        return []
+
+    query = f"INSERT INTO examens ({columns}) VALUES %s"
+    if returning:
+        query += " RETURNING id"
+    result = execute_values(cursor, query, rows, page_size=page_size, fetch=returning)
+    return [r[0] for r in result] if returning else []
+
 def hash_password(password):
     """Hacher un mot de passe avec SHA-256"""
     return hashlib.sha256(password.encode()).hexdigest()
 
+# Compte et profil (étudiant / professeur) en une requête ; relu par migrations.check
+_LOGIN_SQL = """
+    SELECT u.id, u.email, u.password, u.role, u.is_active, u.created_at,
+           et.id AS etudiant_id, et.groupe_id,
+           p.id AS professeur_id,
+           CASE u.role
+               WHEN 'PROF' THEN p.departement_id
+               WHEN 'CHEF_DEPT' THEN u.departement_id
+           END AS departement_id
+    FROM users u
+    LEFT JOIN etudiants et ON u.role = 'ETUDIANT' AND et.user_id = u.id
+    LEFT JOIN professeurs p ON u.role = 'PROF' AND p.user_id = u.id
+    WHERE u.email = %s
+"""
+
 def verify_user(email, password):
-    """Vérifier les identifiants de l'utilisateur avec mot de passe haché"""
-    print(f"🔐 Vérification de l'utilisateur: {email}")
-    
+    """
+    Vérifier les identifiants de l'utilisateur avec mot de passe haché.
+    L'utilisateur et son profil (étudiant, professeur, chef de département)
+    sont résolus en une seule requête.
+    """
+    logger.debug("Vérification de l'utilisateur %s", email)
+
     conn = get_connection()
     if conn is None:
-        print("❌ Impossible de se connecter à la base de données")
+        logger.error("Impossible de se connecter à la base de données")
         return None
-    
+
     try:
-        cursor = conn.cursor()
-        
-        # Récupérer l'utilisateur par email
-        query = "SELECT id, email, password, role, is_active, created_at FROM users WHERE email = %s"
-        cursor.execute(query, (email,))
-        user_data = cursor.fetchone()
-        
-        if not user_data:
-            print(f"❌ Utilisateur {email} non trouvé")
-            cursor.close()
-            conn.close()
-            return None
-        
-        # Créer le dictionnaire utilisateur
-        user_dict = {
-            'id': user_data[0],
-            'email': user_data[1],
-            'password': user_data[2],
-            'role': user_data[3],
-            'is_active': user_data[4],
-            'created_at': user_data[5]
-        }
-        
-        print(f"✅ Utilisateur trouvé: {user_dict['email']} (Rôle: {user_dict['role']})")
-        
-        # Vérifier le mot de passe
-        stored_password = user_dict['password']
-        hashed_password = hash_password(password)
-        
-        print(f"🔐 Comparaison mot de passe:")
-        print(f"  - Stocké: {stored_password[:20]}...")
-        print(f"  - Fourni: {hashed_password[:20]}...")
-        
-        if stored_password != hashed_password:
-            print("❌ Mot de passe incorrect")
-            cursor.close()
-            conn.close()
-            return None
-        
-        print("✅ Mot de passe correct")
-        
-        # Récupérer les infos complètes selon le rôle
-        if user_dict['role'] == 'ETUDIANT':
-            cursor.execute("""
-                SELECT e.id, e.groupe_id
-                FROM etudiants e
-                WHERE e.user_id = %s
-            """, (user_dict['id'],))
-            result = cursor.fetchone()
-            if result:
-                user_dict['profile_id'] = result[0]
-                user_dict['groupe_id'] = result[1]
-                print(f"👨‍🎓 Étudiant: groupe_id={result[1]}")
-        
-        elif user_dict['role'] == 'PROF':
-            cursor.execute("""
-                SELECT p.id, p.departement_id
-                FROM professeurs p
-                WHERE p.user_id = %s
-            """, (user_dict['id'],))
-            result = cursor.fetchone()
-            if result:
-                user_dict['profile_id'] = result[0]
-                user_dict['departement_id'] = result[1]
-                print(f"👨‍🏫 Professeur: département_id={result[1]}")
-        
-        elif user_dict['role'] == 'CHEF_DEPT':
-            # Pour chef de département, on peut avoir un département associé
-            cursor.execute("""
-                SELECT u.departement_id 
-                FROM users u 
-                WHERE u.id = %s
-            """, (user_dict['id'],))
-            result = cursor.fetchone()
-            if result and result[0]:
-                user_dict['departement_id'] = result[0]
-        
+        cursor = conn.cursor(cursor_factory=RowCursor)
+        cursor.execute(_LOGIN_SQL, (email,))
+        row = cursor.fetchone()
         cursor.close()
-        conn.close()
-        
-        print(f"🎉 Authentification réussie pour {email}")
-        return user_dict
-        
     except Error as e:
-        print(f"❌ Erreur lors de la vérification: {e}")
+        logger.error("Erreur lors de la vérification de %s: %s", email, e)
         return None
     finally:
-        if conn:
-            conn.close()
+        conn.close()
+
+    if row is None:
+        logger.info("Connexion refusée: utilisateur %s inconnu", email)
+        return None
+
+    if not hmac.compare_digest(row['password'] or "", hash_password(password)):
+        logger.info("Connexion refusée: mot de passe incorrect pour %s", email)
+        return None
+
+    user_dict = {
+        'id': row['id'],
+        'email': row['email'],
+        'role': row['role'],
+        'is_active': row['is_active'],
+        'created_at': row['created_at'],
+    }
+
+    if row['role'] == 'ETUDIANT' and row['etudiant_id'] is not None:
+        user_dict['profile_id'] = row['etudiant_id']
+        user_dict['groupe_id'] = row['groupe_id']
+    elif row['role'] == 'PROF' and row['professeur_id'] is not None:
+        user_dict['profile_id'] = row['professeur_id']
+        user_dict['departement_id'] = row['departement_id']
+    if row['role'] == 'CHEF_DEPT' and row['departement_id']:
+        user_dict['departement_id'] = row['departement_id']
+
+    logger.info("Authentification réussie pour %s (rôle: %s)", email, row['role'])
+    return user_dict
 
 def authenticate_user(email, password):
     """Alias pour verify_user pour compatibilité"""
     return verify_user(email, password)
 
-# ... (gardez le reste de vos fonctions existantes) ...
+# ============================================================
+# COUCHE D'ACCÈS AUX DONNÉES
+# Une requête ensembliste par vue ; les lignes sont des RowCursor (row['nom'] / row.nom)
+# ============================================================
+
+def _fetch_all(query, params=None):
+    """Exécuter une requête de lecture sur une connexion du pool et retourner toutes les lignes"""
+    conn = get_connection()
+    if conn is None:
+        return []
+    try:
+        cursor = conn.cursor(cursor_factory=RowCursor)
+        cursor.execute(query, params)
+        rows = cursor.fetchall()
+        cursor.close()
+        return rows
+    except Error as e:
+        print(f"❌ Erreur de lecture: {e}")
+        return []
+    finally:
+        conn.close()
+
+def _fetch_one(query, params=None):
+    """Comme _fetch_all mais pour une seule ligne (None si absente)"""
+    rows = _fetch_all(query, params)
+    return rows[0] if rows else None
+
+@cached("formations")
+def fetch_formations():
+    """Formations avec le nom de leur département"""
+    return _fetch_all("""
+        SELECT f.id, f.nom, d.nom AS departement, f.departement_id
+        FROM formations f
+        LEFT JOIN departements d ON f.departement_id = d.id
+        ORDER BY f.nom
+    """)
+
+@cached("salles")
+def fetch_salles():
+    """Salles d'examen"""
+    return _fetch_all("""
+        SELECT id, nom, capacite, type
+        FROM salles
+        ORDER BY nom
+    """)
+
+@cached("departements")
+def fetch_departements():
+    """Départements"""
+    return _fetch_all("SELECT id, nom FROM departements ORDER BY nom")
+
+@cached("groupes")
+def fetch_groupes():
+    """Groupes avec le nom de leur formation"""
+    return _fetch_all("""
+        SELECT g.id, g.nom, g.effectif, g.formation_id, f.nom AS formation_nom
+        FROM groupes g
+        JOIN formations f ON g.formation_id = f.id
+        ORDER BY f.nom, g.nom
+    """)
+
+def fetch_groupe_options(formation_id=None):
+    """
+    Options des listes de sélection de groupe : {"G1 (Licence Info)": groupe_id}
+    Construites à partir de fetch_groupes() (une seule requête, en cache).
+    """
+    return {
+        f"{g['nom']} ({g['formation_nom']})": g['id']
+        for g in fetch_groupes()
+        if formation_id is None or g['formation_id'] == formation_id
+    }
+
+@cached("modules")
+def fetch_modules():
+    """Modules avec le nom de leur formation"""
+    return _fetch_all("""
+        SELECT m.id, m.nom, m.formation_id, f.nom AS formation_nom
+        FROM modules m
+        JOIN formations f ON m.formation_id = f.id
+        ORDER BY f.nom, m.nom
+    """)
+
+def fetch_professeurs():
+    """Professeurs avec email, état du compte et département"""
+    return _fetch_all("""
+        SELECT p.id, u.email, p.specialite, d.nom AS departement,
+               p.departement_id, u.is_active
+        FROM professeurs p
+        JOIN users u ON p.user_id = u.id
+        LEFT JOIN departements d ON p.departement_id = d.id
+        ORDER BY u.email
+    """)
+
+def fetch_etudiants():
+    """Étudiants avec email et groupe"""
+    return _fetch_all("""
+        SELECT e.id, u.email, e.nom, e.prenom, e.matricule, e.groupe_id
+        FROM etudiants e
+        JOIN users u ON e.user_id = u.id
+        ORDER BY e.nom, e.prenom
+    """)
+
+def fetch_all_users():
+    """Tous les comptes utilisateurs (sans mot de passe)"""
+    return _fetch_all("""
+        SELECT id, email, role, is_active, created_at
+        FROM users
+        ORDER BY email
+    """)
+
+def fetch_examens():
+    """Tous les examens avec module, formation, groupe et salle"""
+    return _fetch_all("""
+        SELECT e.id, e.session_id, e.module_id, m.nom AS module_nom,
+               e.formation_id, f.nom AS formation_nom,
+               e.groupe_id, g.nom AS groupe_nom,
+               e.salle_id, s.nom AS salle_nom,
+               e.date_examen, e.heure_debut, e.heure_fin, e.duree_minutes, e.statut
+        FROM examens e
+        JOIN modules m ON e.module_id = m.id
+        JOIN formations f ON e.formation_id = f.id
+        LEFT JOIN groupes g ON e.groupe_id = g.id
+        LEFT JOIN salles s ON e.salle_id = s.id
+        ORDER BY e.date_examen, e.heure_debut
+    """)
+
+def fetch_sessions():
+    """Sessions d'examens avec leur nombre d'examens (une seule requête agrégée)"""
+    return _fetch_all("""
+        SELECT s.id, s.nom, s.date_debut, s.date_fin, s.statut, s.date_creation,
+               COUNT(e.id) AS nb_examens
+        FROM sessions s
+        LEFT JOIN examens e ON e.session_id = s.id
+        GROUP BY s.id
+        ORDER BY s.date_debut DESC
+    """)
+
+def fetch_overview_stats():
+    """
+    Compteurs de la page d'accueil administrateur en une seule requête.
+    Les examens sont comptés dans la vue matérialisée mv_examens_stats (quelques
+    lignes par session et formation) ; les autres COUNT(*) parcourent leur table
+    et restent proportionnels à sa taille.
+    """
+    # Import local : backend.stats importe ce module
+    from .stats import VIEW_NAME, ensure_ready
+    if not ensure_ready():
+        return None
+    stats = _fetch_one(f"""
+        SELECT
+            (SELECT COUNT(*) FROM sessions) AS nb_sessions,
+            (SELECT COUNT(*) FROM formations) AS nb_formations,
+            (SELECT COUNT(*) FROM professeurs) AS nb_professeurs,
+            (SELECT COUNT(*) FROM etudiants) AS nb_etudiants,
+            s.nb_salles, s.nb_amphis, s.nb_salles_cours,
+            e.nb_examens, e.nb_confirmes, e.nb_en_attente, e.nb_refuses
+        FROM (
+            SELECT COUNT(*) AS nb_salles,
+                   COUNT(*) FILTER (WHERE type = 'AMPHI') AS nb_amphis,
+                   COUNT(*) FILTER (WHERE type = 'SALLE') AS nb_salles_cours
+            FROM salles
+        ) s, (
+            SELECT COALESCE(SUM(nb_examens), 0)::bigint AS nb_examens,
+                   COALESCE(SUM(nb_examens) FILTER (WHERE statut = 'CONFIRME'), 0)::bigint AS nb_confirmes,
+                   COALESCE(SUM(nb_examens) FILTER (WHERE statut = 'EN_ATTENTE'), 0)::bigint AS nb_en_attente,
+                   COALESCE(SUM(nb_examens) FILTER (WHERE statut = 'REFUSE'), 0)::bigint AS nb_refuses
+            FROM {VIEW_NAME}
+        ) e
+    """)
+    return stats._asdict() if stats else None
+
+# ============================================================
+# PAGINATION PAR CLÉ ET LECTURE EN FLUX
+# Les listes longues (étudiants, professeurs...) sont lues page par page :
+# WHERE id > dernier id affiché ORDER BY id LIMIT n, servi par la clé primaire,
+# quel que soit le numéro de page (pas d'OFFSET qui relit les pages précédentes).
+# ============================================================
+
+PAGE_SIZE = 50
+
+def _fetch_page(query, after_id, limit, params=()):
+    """
+    Une page de la requête (qui se termine par "id > %s ORDER BY id LIMIT %s").
+    Retourne (lignes, after_id de la page suivante ou None s'il n'y en a pas).
+    """
+    rows = _fetch_all(query, (*params, after_id or 0, limit + 1))
+    if len(rows) > limit:
+        rows = rows[:limit]
+        return rows, rows[-1]['id']
+    return rows, None
+
+def fetch_salles_page(after_id=0, limit=PAGE_SIZE):
+    """Page de salles triées par id"""
+    return _fetch_page("""
+        SELECT id, nom, capacite, type
+        FROM salles
+        WHERE id > %s ORDER BY id LIMIT %s
+    """, after_id, limit)
+
+def fetch_professeurs_page(after_id=0, limit=PAGE_SIZE):
+    """Page de professeurs (email, spécialité, département, état du compte)"""
+    return _fetch_page("""
+        SELECT p.id, u.email, p.specialite, d.nom AS departement,
+               p.departement_id, u.is_active
+        FROM professeurs p
+        JOIN users u ON p.user_id = u.id
+        LEFT JOIN departements d ON p.departement_id = d.id
+        WHERE p.id > %s ORDER BY p.id LIMIT %s
+    """, after_id, limit)
+
+def fetch_etudiants_page(after_id=0, limit=PAGE_SIZE):
+    """Page d'étudiants avec email et groupe"""
+    return _fetch_page("""
+        SELECT e.id, u.email, e.nom, e.prenom, e.matricule, e.groupe_id, g.nom AS groupe_nom
+        FROM etudiants e
+        JOIN users u ON e.user_id = u.id
+        LEFT JOIN groupes g ON e.groupe_id = g.id
+        WHERE e.id > %s ORDER BY e.id LIMIT %s
+    """, after_id, limit)
+
+def fetch_groupes_page(after_id=0, limit=PAGE_SIZE):
+    """Page de groupes avec le nom de leur formation"""
+    return _fetch_page("""
+        SELECT g.id, g.nom, g.effectif, g.formation_id, f.nom AS formation_nom
+        FROM groupes g
+        JOIN formations f ON g.formation_id = f.id
+        WHERE g.id > %s ORDER BY g.id LIMIT %s
+    """, after_id, limit)
+
+def fetch_list_totals():
+    """Totaux affichés sous les listes paginées (une requête, aucune ligne transférée)"""
+    totals = _fetch_one("""
+        SELECT
+            (SELECT COUNT(*) FROM professeurs) AS nb_professeurs,
+            (SELECT COUNT(*) FROM etudiants) AS nb_etudiants,
+            s.nb_salles, s.capacite_totale, s.nb_amphis, s.nb_salles_cours,
+            g.nb_groupes, g.effectif_total
+        FROM (
+            SELECT COUNT(*) AS nb_salles,
+                   COALESCE(SUM(capacite), 0)::bigint AS capacite_totale,
+                   COUNT(*) FILTER (WHERE type = 'AMPHI') AS nb_amphis,
+                   COUNT(*) FILTER (WHERE type = 'SALLE') AS nb_salles_cours
+            FROM salles
+        ) s, (
+            SELECT COUNT(*) AS nb_groupes,
+                   COALESCE(SUM(effectif), 0)::bigint AS effectif_total
+            FROM groupes
+        ) g
+    """)
+    return totals._asdict() if totals else None
+
+def iter_rows(query, params=None, name="stream", chunk_size=2000):
+    """
+    Parcourir le résultat d'une requête par paquets de chunk_size lignes via un
+    curseur serveur (curseur nommé) : seul le paquet courant est en mémoire.
+    La connexion reste empruntée au pool jusqu'à la fin du parcours.
+    """
+    conn = get_connection()
+    if conn is None:
+        raise ConnectionError("Erreur de connexion")
+    try:
+        cursor = conn.cursor(name=name)
+        cursor.itersize = chunk_size
+        cursor.execute(query, params)
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                break
+            yield rows
+        cursor.close()
+    finally:
+        conn.close()
+
+def fetch_examens_by_session(session_id):
+    """Examens d'une session"""
+    return _fetch_all("""
+        SELECT e.id, e.module_id, m.nom AS module_nom, e.groupe_id, e.formation_id,
+               e.salle_id, e.date_examen, e.heure_debut, e.heure_fin,
+               e.duree_minutes, e.statut
+        FROM examens e
+        JOIN modules m ON e.module_id = m.id
+        WHERE e.session_id = %s
+        ORDER BY e.date_examen, e.heure_debut
+    """, (session_id,))
+
+def fetch_examens_by_session_grouped(session_id):
+    """Examens d'une session triés par formation, groupe puis horaire (pour l'affichage groupé)"""
+    return _fetch_all("""
+        SELECT e.id, f.nom AS formation_nom, g.nom AS groupe_nom, m.nom AS module_nom,
+               e.date_examen, e.heure_debut, e.heure_fin, e.duree_minutes,
+               s.nom AS salle_nom, e.statut
+        FROM examens e
+        JOIN modules m ON e.module_id = m.id
+        JOIN formations f ON e.formation_id = f.id
+        LEFT JOIN groupes g ON e.groupe_id = g.id
+        LEFT JOIN salles s ON e.salle_id = s.id
+        WHERE e.session_id = %s
+        ORDER BY f.nom, g.nom, e.date_examen, e.heure_debut
+    """, (session_id,))
+
+def create_session(nom, date_debut, date_fin, statut='CREATION'):
+    """Créer une session d'examens et retourner son id (None en cas d'erreur)"""
+    try:
+        with connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                INSERT INTO sessions (nom, date_debut, date_fin, statut, date_creation)
+                VALUES (%s, %s, %s, %s, %s) RETURNING id
+            """, (nom, date_debut, date_fin, statut, datetime.now()))
+            return cursor.fetchone()[0]
+    except Error as e:
+        print(f"❌ Erreur lors de la création de la session: {e}")
+        return None
+
+def verify_password_strength(password):
+    """Vérifier la robustesse d'un mot de passe ; retourne (valide, message)"""
+    if not password or len(password) < 8:
+        return False, "Le mot de passe doit contenir au moins 8 caractères"
+    if not any(c.isdigit() for c in password):
+        return False, "Le mot de passe doit contenir au moins un chiffre"
+    if not any(c.isalpha() for c in password):
+        return False, "Le mot de passe doit contenir au moins une lettre"
+    return True, "Mot de passe valide"
+
+def create_user(email, password, role, departement_id=None):
+    """Créer un compte utilisateur et retourner son id (None si l'email existe déjà ou en cas d'erreur)"""
+    try:
+        with connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                INSERT INTO users (email, password, role, created_at, departement_id)
+                SELECT %s, %s, %s, %s, %s
+                WHERE NOT EXISTS (SELECT 1 FROM users WHERE email = %s)
+                RETURNING id
+            """, (email, hash_password(password), role, datetime.now(), departement_id, email))
+            result = cursor.fetchone()
+            return result[0] if result else None
+    except Error as e:
+        print(f"❌ Erreur lors de la création de l'utilisateur: {e}")
+        return None
+
+def update_user_password(user_id, new_password):
+    """Changer le mot de passe d'un utilisateur ; retourne True si le compte a été mis à jour"""
+    try:
+        with connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                "UPDATE users SET password = %s WHERE id = %s",
+                (hash_password(new_password), user_id)
+            )
+            return cursor.rowcount == 1
+    except Error as e:
+        print(f"❌ Erreur lors du changement de mot de passe: {e}")
+        return False
+
 
 # Test de connexion au démarrage
 if __name__ == "__main__":
@@ -0,0 +1,198 @@
+# backend/export.py - EXPORT DES SESSIONS (CSV / PARQUET / XLSX)
+"""
+Export des examens d'une session sans DataFrame ni chaîne en mémoire :
+les lignes sont lues par paquets depuis un curseur serveur (curseur nommé)
+et écrites directement dans un fichier.
+
+Le fichier n'est produit que sur demande, puis gardé sur disque sous
+session_<id>_v<version>.<format> : tant que les examens de la session ne
+changent pas (sessions.version, migration 0007), il est resservi tel quel.
+
+Parquet et XLSX sont optionnels (pyarrow / openpyxl) ; CSV est toujours disponible.
+"""
+import csv
+import os
+import tempfile
+import threading
+
+from psycopg2 import Error
+
+from .database import get_connection, iter_rows
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PARQUET_AVAILABLE = True
+except ImportError:
+    PARQUET_AVAILABLE = False
+
+try:
+    from openpyxl import Workbook
+    XLSX_AVAILABLE = True
+except ImportError:
+    XLSX_AVAILABLE = False
+
+# Lignes lues par aller-retour sur le curseur serveur
+CHUNK_SIZE = 2000
+
+EXPORT_DIR = os.environ.get("EXPORT_DIR") or os.path.join(tempfile.gettempdir(), "edt_exports")
+
+COLUMNS = ("id", "formation_nom", "groupe_nom", "module_nom", "date_examen",
+           "heure_debut", "heure_fin", "duree_minutes", "salle_nom", "statut")
+
+MIME_TYPES = {
+    "csv": "text/csv",
+    "parquet": "application/vnd.apache.parquet",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+
+_EXPORT_SQL = """
+    SELECT e.id, f.nom, g.nom, m.nom, e.date_examen, e.heure_debut, e.heure_fin,
+           e.duree_minutes, s.nom, e.statut
+    FROM examens e
+    JOIN modules m ON e.module_id = m.id
+    JOIN formations f ON f.id = COALESCE(e.formation_id, m.formation_id)
+    LEFT JOIN groupes g ON e.groupe_id = g.id
+    LEFT JOIN salles s ON e.salle_id = s.id
+    WHERE e.session_id = %s
+    ORDER BY f.nom, g.nom, e.date_examen, e.heure_debut
+"""
+
+_locks = {}
+_locks_guard = threading.Lock()
+
+
+def available_formats():
+    """Formats utilisables avec les dépendances installées"""
+    formats = ["csv"]
+    if PARQUET_AVAILABLE:
+        formats.append("parquet")
+    if XLSX_AVAILABLE:
+        formats.append("xlsx")
+    return formats
+
+
+def session_version(session_id):
+    """Version courante des examens d'une session (None si la session n'existe pas)"""
+    conn = get_connection()
+    if conn is None:
+        return None
+    try:
+        cursor = conn.cursor()
+        cursor.execute("SELECT version FROM sessions WHERE id = %s", (session_id,))
+        row = cursor.fetchone()
+        cursor.close()
+        return row[0] if row else None
+    except Error as e:
+        print(f"❌ Erreur de lecture de la version de session: {e}")
+        return None
+    finally:
+        conn.close()
+
+
+def iter_session_chunks(session_id, chunk_size=CHUNK_SIZE):
+    """Paquets de lignes (tuples dans l'ordre de COLUMNS) lus via un curseur serveur"""
+    return iter_rows(_EXPORT_SQL, (session_id,), name=f"export_session_{session_id}",
+                     chunk_size=chunk_size)
+
+
+def _write_csv(chunks, path):
+    with open(path, "w", newline="", encoding="utf-8-sig") as f:
+        writer = csv.writer(f)
+        writer.writerow(COLUMNS)
+        for rows in chunks:
+            writer.writerows(rows)
+
+
+def _parquet_schema():
+    return pa.schema([
+        ("id", pa.int64()), ("formation_nom", pa.string()), ("groupe_nom", pa.string()),
+        ("module_nom", pa.string()), ("date_examen", pa.date32()),
+        ("heure_debut", pa.time64("us")), ("heure_fin", pa.time64("us")),
+        ("duree_minutes", pa.int32()), ("salle_nom", pa.string()), ("statut", pa.string()),
+    ])
+
+
+def _write_parquet(chunks, path):
+    schema = _parquet_schema()
+    with pq.ParquetWriter(path, schema) as writer:
+        for rows in chunks:
+            columns = list(zip(*rows))
+            arrays = [pa.array(column, type=field.type) for column, field in zip(columns, schema)]
+            writer.write_batch(pa.RecordBatch.from_arrays(arrays, schema=schema))
+
+
+def _write_xlsx(chunks, path):
+    # write_only : les lignes sont écrites au fil de l'eau, sans garder la feuille en mémoire
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet("Examens")
+    sheet.append(COLUMNS)
+    for rows in chunks:
+        for row in rows:
+            sheet.append(row)
+    workbook.save(path)
+
+
+_WRITERS = {"csv": _write_csv, "parquet": _write_parquet, "xlsx": _write_xlsx}
+
+
+def export_path(session_id, version, fmt):
+    return os.path.join(EXPORT_DIR, f"session_{session_id}_v{version}.{fmt}")
+
+
+def _lock_for(key):
+    with _locks_guard:
+        return _locks.setdefault(key, threading.Lock())
+
+
+def _remove_old_versions(session_id, fmt, keep):
+    prefix = f"session_{session_id}_v"
+    for name in os.listdir(EXPORT_DIR):
+        if name.startswith(prefix) and name.endswith(f".{fmt}") and name != os.path.basename(keep):
+            try:
+                os.remove(os.path.join(EXPORT_DIR, name))
+            except OSError:
+                pass
+
+
+def _remove_tmp(tmp_path):
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+
+
+def export_session(session_id, fmt="csv"):
+    """
+    Chemin du fichier d'export de la session, généré si nécessaire.
+    Retourne {"success", "message", "path", "version", "mime"}.
+    """
+    if fmt not in available_formats():
+        return {"success": False, "message": f"Format non disponible: {fmt}"}
+
+    version = session_version(session_id)
+    if version is None:
+        return {"success": False, "message": "Session non trouvée"}
+
+    path = export_path(session_id, version, fmt)
+    result = {"success": True, "message": "Export prêt", "path": path,
+              "version": version, "mime": MIME_TYPES[fmt]}
+
+    with _lock_for((session_id, fmt)):
+        if os.path.exists(path):
+            return result
+        os.makedirs(EXPORT_DIR, exist_ok=True)
+        # Écriture dans un fichier temporaire puis renommage atomique
+        fd, tmp_path = tempfile.mkstemp(dir=EXPORT_DIR, suffix=f".{fmt}.tmp")
+        os.close(fd)
+        try:
+            _WRITERS[fmt](iter_session_chunks(session_id), tmp_path)
+            os.replace(tmp_path, path)
+        except (Error, ConnectionError, OSError) as e:
+            _remove_tmp(tmp_path)
+            return {"success": False, "message": f"Erreur d'export: {e}"}
+        except BaseException:
+            # Toute autre erreur (ou interruption) : ne pas laisser de fichier partiel
+            _remove_tmp(tmp_path)
+            raise
+        _remove_old_versions(session_id, fmt, path)
+
+    return result
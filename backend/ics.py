@@ -0,0 +1,134 @@
+# backend/ics.py - EXPORT ICALENDAR (RFC 5545)
+"""
+Conversion des emplois du temps publiés (backend.snapshots) en fichiers .ics
+importables dans Google Agenda, Outlook ou le calendrier du téléphone.
+Les heures sont « flottantes » (heure locale de l'établissement).
+"""
+from datetime import datetime, timedelta, timezone
+
+PRODID = "-//EDT Exam//Planning des examens//FR"
+DUREE_PAR_DEFAUT = 120
+
+
+def _escape(text):
+    return (str(text).replace("\\", "\\\\").replace(";", "\\;")
+            .replace(",", "\\,").replace("\n", "\\n"))
+
+
+def _fold(line):
+    """Couper les lignes à 75 octets (continuation : CRLF + espace)"""
+    data = line.encode("utf-8")
+    if len(data) <= 75:
+        return line
+    parts = []
+    while data:
+        limit = 75 if not parts else 74
+        cut = min(limit, len(data))
+        # Ne pas couper au milieu d'un caractère UTF-8
+        while cut < len(data) and (data[cut] & 0xC0) == 0x80:
+            cut -= 1
+        parts.append(data[:cut].decode("utf-8"))
+        data = data[cut:]
+    return "\r\n ".join(parts)
+
+
+def _stamp(value):
+    return value.strftime("%Y%m%dT%H%M%S")
+
+
+def render_calendar(name, events, stamp=None):
+    """
+    events : dicts avec uid, start (datetime), end (datetime), summary,
+             et optionnellement location, description
+    """
+    stamp = stamp or datetime.now(timezone.utc)
+    lines = [
+        "BEGIN:VCALENDAR",
+        "VERSION:2.0",
+        f"PRODID:{PRODID}",
+        "CALSCALE:GREGORIAN",
+        "METHOD:PUBLISH",
+        f"X-WR-CALNAME:{_escape(name)}",
+    ]
+    for event in events:
+        lines += [
+            "BEGIN:VEVENT",
+            f"UID:{event['uid']}",
+            f"DTSTAMP:{_stamp(stamp)}Z",
+            f"DTSTART:{_stamp(event['start'])}",
+            f"DTEND:{_stamp(event['end'])}",
+            f"SUMMARY:{_escape(event['summary'])}",
+        ]
+        if event.get("location"):
+            lines.append(f"LOCATION:{_escape(event['location'])}")
+        if event.get("description"):
+            lines.append(f"DESCRIPTION:{_escape(event['description'])}")
+        lines.append("END:VEVENT")
+    lines.append("END:VCALENDAR")
+    return "\r\n".join(_fold(line) for line in lines) + "\r\n"
+
+
+def _event(uid, jour, heure, duree, summary, location, description):
+    if jour is None or heure is None:
+        return None
+    start = datetime.combine(jour, heure)
+    return {
+        "uid": uid,
+        "start": start,
+        "end": start + timedelta(minutes=duree or DUREE_PAR_DEFAUT),
+        "summary": summary,
+        "location": location,
+        "description": description,
+    }
+
+
+def group_events(examens, domain="edt-exam"):
+    """Événements d'un emploi du temps de groupe (les examens sans date sont ignorés)"""
+    events = []
+    for examen in examens:
+        description = f"Session : {examen.get('session_nom') or '-'}"
+        if examen.get('professeur_surveillant'):
+            description += f"\nSurveillant(s) : {examen['professeur_surveillant']}"
+        event = _event(
+            f"examen-{examen['id']}@{domain}",
+            examen.get('date_examen'), examen.get('heure_debut'), examen.get('duree_minutes'),
+            f"Examen : {examen['module_nom']}",
+            examen.get('salle_nom'),
+            description,
+        )
+        if event:
+            events.append(event)
+    return events
+
+
+def prof_events(surveillances, domain="edt-exam"):
+    """Événements d'un emploi du temps de surveillant"""
+    events = []
+    for surveillance in surveillances:
+        description = f"Groupe : {surveillance.get('groupe_nom') or '-'}"
+        if surveillance.get('effectif'):
+            description += f" ({surveillance['effectif']} étudiants)"
+        description += f"\nSession : {surveillance.get('session_nom') or '-'}"
+        event = _event(
+            f"surveillance-{surveillance['id']}@{domain}",
+            surveillance.get('date_surveillance'), surveillance.get('heure_debut'),
+            surveillance.get('duree_minutes'),
+            f"Surveillance : {surveillance['module_nom']}",
+            surveillance.get('salle_nom'),
+            description,
+        )
+        if event:
+            events.append(event)
+    return events
+
+
+def owner_calendar(owner_type, owner_id, items):
+    """Calendrier complet d'un groupe ("GROUPE") ou d'un surveillant ("PROF")"""
+    if owner_type == "GROUPE":
+        first = items[0] if items else {}
+        if first.get('groupe_nom'):
+            name = f"Examens - {first['groupe_nom']} ({first.get('formation_nom') or '-'})"
+        else:
+            name = f"Examens - groupe {owner_id}"
+        return render_calendar(name, group_events(items))
+    return render_calendar("Mes surveillances d'examens", prof_events(items))
@@ -0,0 +1,413 @@
+# backend/invigilation.py - AFFECTATION DES SURVEILLANTS
+"""
+Affectation automatique des professeurs aux examens d'une session (table surveillances).
+
+Chaque ligne examens (une par salle) demande un surveillant par tranche de
+ETUDIANTS_PAR_SURVEILLANT étudiants. Contraintes dures :
+- pas deux surveillances qui se chevauchent pour un même professeur
+  (y compris celles d'autres sessions) ;
+- pas de surveillance pendant une indisponibilité (migration 0008) ;
+- au plus nb_max_surveillances_jour par jour et heures_semaine_max par semaine.
+
+1. Glouton chronologique : chaque surveillance va au professeur éligible le moins
+   chargé, un professeur d'un autre département comptant PENALITE_DEPARTEMENT
+   minutes de plus.
+2. Réparation : une surveillance sans professeur peut déloger une surveillance
+   qui la bloque, si celle-ci trouve un autre professeur.
+3. Équilibrage : déplacer des surveillances des plus chargés vers les moins
+   chargés tant que la charge (pénalité de département comprise) diminue.
+
+Comme scheduler.py, InvigilationPlanner ne dépend pas de la base ;
+assign_surveillances() charge les données et écrit le résultat par lots.
+"""
+import math
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+
+from psycopg2 import Error
+from psycopg2.extras import execute_values
+
+from .conflict_graph import invalidate_conflict_graph
+from .conflicts import exam_interval
+from .database import get_connection
+from .snapshots import refresh_published_snapshots
+
+ETUDIANTS_PAR_SURVEILLANT = 60
+MAX_PAR_JOUR_DEFAUT = 3
+# Surcoût (en minutes de charge) d'un surveillant d'un autre département
+PENALITE_DEPARTEMENT = 240
+# Budget (secondes) de la réparation et de l'équilibrage
+TIME_BUDGET = 1.0
+
+
+@dataclass(frozen=True)
+class Duty:
+    """Une place de surveillant à pourvoir sur une ligne examens"""
+    key: int
+    examen_id: int
+    departement_id: object
+    start: datetime
+    end: datetime
+
+    @property
+    def minutes(self):
+        return int((self.end - self.start).total_seconds() // 60)
+
+
+@dataclass(frozen=True)
+class Invigilator:
+    """Professeur pouvant surveiller"""
+    id: int
+    departement_id: object = None
+    max_par_jour: int = MAX_PAR_JOUR_DEFAUT
+    minutes_semaine_max: object = None  # None : pas de plafond hebdomadaire
+
+
+@dataclass
+class InvigilationPlan:
+    """Résultat : professeur de chaque surveillance pourvue"""
+    prof_of: dict
+    unassigned: list
+    statistics: dict
+
+
+def surveillants_requis(places):
+    """Nombre de surveillants pour une salle de `places` étudiants (au moins un)"""
+    return max(1, math.ceil((places or 0) / ETUDIANTS_PAR_SURVEILLANT))
+
+
+def _overlaps(intervals, start, end):
+    return [item for item in intervals if item[0] < end and start < item[1]]
+
+
+class InvigilationPlanner:
+    """
+    duties : Duty à pourvoir ; invigilators : Invigilator
+    busy : (prof_id, début, fin) déjà occupés, comptés dans la charge
+    unavailable : (prof_id, début, fin) d'indisponibilité
+    """
+
+    def __init__(self, duties, invigilators, busy=(), unavailable=()):
+        self.duties = {duty.key: duty for duty in duties}
+        self.profs = {prof.id: prof for prof in invigilators}
+        self.prof_ids = sorted(self.profs)
+        self.intervals = {p: {} for p in self.profs}   # prof -> jour -> [(début, fin, clé ou None)]
+        self.unavailable = {p: {} for p in self.profs}
+        self.load = dict.fromkeys(self.profs, 0)        # minutes de surveillance
+        self.day_count = {}                             # (prof, jour) -> surveillances
+        self.week_minutes = {}                          # (prof, année, semaine) -> minutes
+        self.duties_of = {p: set() for p in self.profs}
+        self.prof_of = {}
+
+        for prof_id, start, end in busy:
+            if prof_id in self.profs:
+                self._occupy(prof_id, start, end, None, +1)
+        for prof_id, start, end in unavailable:
+            if prof_id in self.profs:
+                self.unavailable[prof_id].setdefault(start.date(), []).append((start, end))
+
+    # ------------------------------------------------------------------
+    # API
+    # ------------------------------------------------------------------
+    def solve(self, time_budget=TIME_BUDGET):
+        start = time.perf_counter()
+        deadline = start + time_budget
+
+        unassigned = []
+        for duty in sorted(self.duties.values(), key=lambda d: (d.start, d.key)):
+            prof_id = self._best_prof(duty)
+            if prof_id is None:
+                unassigned.append(duty.key)
+            else:
+                self._assign(duty.key, prof_id)
+        greedy_unassigned = len(unassigned)
+
+        unassigned = [key for key in unassigned if not self._repair(key, deadline)]
+        moves = self._balance(deadline)
+        return self._build_plan(start, unassigned, greedy_unassigned, moves)
+
+    # ------------------------------------------------------------------
+    # Contraintes et coût
+    # ------------------------------------------------------------------
+    def _eligible(self, prof_id, duty):
+        prof = self.profs[prof_id]
+        day = duty.start.date()
+        if _overlaps(self.unavailable[prof_id].get(day, ()), duty.start, duty.end):
+            return False
+        if _overlaps(self.intervals[prof_id].get(day, ()), duty.start, duty.end):
+            return False
+        if self.day_count.get((prof_id, day), 0) >= prof.max_par_jour:
+            return False
+        if prof.minutes_semaine_max is not None:
+            week = (prof_id, *day.isocalendar()[:2])
+            if self.week_minutes.get(week, 0) + duty.minutes > prof.minutes_semaine_max:
+                return False
+        return True
+
+    def _penalty(self, prof_id, duty):
+        if duty.departement_id is None or self.profs[prof_id].departement_id == duty.departement_id:
+            return 0
+        return PENALITE_DEPARTEMENT
+
+    def _best_prof(self, duty, exclude=()):
+        """Professeur éligible le moins chargé : les contraintes ne sont vérifiées que dans l'ordre du coût"""
+        ordre = sorted(self.prof_ids, key=lambda p: self.load[p] + self._penalty(p, duty))
+        for prof_id in ordre:
+            if prof_id not in exclude and self._eligible(prof_id, duty):
+                return prof_id
+        return None
+
+    # ------------------------------------------------------------------
+    # Réparation et équilibrage
+    # ------------------------------------------------------------------
+    def _repair(self, key, deadline):
+        """Libérer un professeur en déplaçant l'unique surveillance qui bloque `key`"""
+        duty = self.duties[key]
+        day = duty.start.date()
+        candidats = sorted(self.prof_ids, key=lambda p: self.load[p] + self._penalty(p, duty))
+        for prof_id in candidats:
+            if time.perf_counter() >= deadline:
+                return False
+            blockers = _overlaps(self.intervals[prof_id].get(day, ()), duty.start, duty.end)
+            if len(blockers) != 1 or blockers[0][2] is None:
+                continue
+            blocker = blockers[0][2]
+            self._unassign(blocker)
+            if self._eligible(prof_id, duty):
+                other = self._best_prof(self.duties[blocker], exclude=(prof_id,))
+                if other is not None:
+                    self._assign(blocker, other)
+                    self._assign(key, prof_id)
+                    return True
+            self._assign(blocker, prof_id)
+        return False
+
+    def _balance(self, deadline):
+        moves = 0
+        improved = True
+        while improved and time.perf_counter() < deadline:
+            improved = False
+            for prof_id in sorted(self.prof_ids, key=lambda p: self.load[p], reverse=True):
+                for key in sorted(self.duties_of[prof_id]):
+                    if time.perf_counter() >= deadline:
+                        return moves
+                    duty = self.duties[key]
+                    current = self.load[prof_id] + self._penalty(prof_id, duty)
+                    self._unassign(key)
+                    target = self._best_prof(duty, exclude=(prof_id,))
+                    if target is not None and (self.load[target] + duty.minutes
+                                               + self._penalty(target, duty)) < current:
+                        self._assign(key, target)
+                        moves += 1
+                        improved = True
+                    else:
+                        self._assign(key, prof_id)
+        return moves
+
+    # ------------------------------------------------------------------
+    # État
+    # ------------------------------------------------------------------
+    def _occupy(self, prof_id, start, end, key, sign):
+        day = start.date()
+        minutes = int((end - start).total_seconds() // 60)
+        intervals = self.intervals[prof_id].setdefault(day, [])
+        if sign > 0:
+            intervals.append((start, end, key))
+        else:
+            intervals.remove((start, end, key))
+        self.load[prof_id] += sign * minutes
+        self.day_count[(prof_id, day)] = self.day_count.get((prof_id, day), 0) + sign
+        week = (prof_id, *day.isocalendar()[:2])
+        self.week_minutes[week] = self.week_minutes.get(week, 0) + sign * minutes
+
+    def _assign(self, key, prof_id):
+        duty = self.duties[key]
+        self._occupy(prof_id, duty.start, duty.end, key, +1)
+        self.prof_of[key] = prof_id
+        self.duties_of[prof_id].add(key)
+
+    def _unassign(self, key):
+        duty = self.duties[key]
+        prof_id = self.prof_of.pop(key)
+        self._occupy(prof_id, duty.start, duty.end, key, -1)
+        self.duties_of[prof_id].discard(key)
+
+    def _build_plan(self, start, unassigned, greedy_unassigned, moves):
+        counts = [len(self.duties_of[p]) for p in self.prof_ids]
+        same_department = sum(1 for key, prof_id in self.prof_of.items()
+                              if self._penalty(prof_id, self.duties[key]) == 0)
+        return InvigilationPlan(
+            prof_of=dict(self.prof_of),
+            unassigned=unassigned,
+            statistics={
+                "total_duties": len(self.duties),
+                "assigned_duties": len(self.prof_of),
+                "unassigned_duties": len(unassigned),
+                "repaired_duties": greedy_unassigned - len(unassigned),
+                "same_department": same_department,
+                "professors_used": sum(1 for c in counts if c),
+                "min_load": min(counts, default=0),
+                "max_load": max(counts, default=0),
+                "balancing_moves": moves,
+                "execution_time": round(time.perf_counter() - start, 3),
+            },
+        )
+
+
+# ----------------------------------------------------------------------
+# Accès aux données
+# ----------------------------------------------------------------------
+def load_invigilation_data(cursor, session_id, examen_ids=None):
+    """
+    Charger en quatre requêtes les surveillances à pourvoir, les professeurs actifs,
+    leurs surveillances déjà fixées et leurs indisponibilités sur la période.
+    examen_ids : limiter aux examens donnés (les autres surveillances de la session restent fixées).
+    Sans examen_ids, les surveillances actuelles de la session seront remplacées : elles ne bloquent personne.
+    Retourne (duties, invigilators, busy, unavailable) ou None si la session n'existe pas.
+    """
+    cursor.execute("SELECT date_debut, date_fin FROM sessions WHERE id = %s", (session_id,))
+    row = cursor.fetchone()
+    if row is None:
+        return None
+    date_debut, date_fin = row
+
+    cursor.execute("""
+        SELECT e.id, e.date_examen, e.heure_debut, e.duree_minutes, e.heure_fin,
+               f.departement_id, LEAST(COALESCE(e.nb_places, g.effectif), s.capacite)
+        FROM examens e
+        JOIN modules m ON e.module_id = m.id
+        JOIN formations f ON f.id = COALESCE(e.formation_id, m.formation_id)
+        LEFT JOIN groupes g ON e.groupe_id = g.id
+        LEFT JOIN salles s ON e.salle_id = s.id
+        WHERE e.session_id = %s
+        AND e.statut <> 'REFUSE'
+        AND (%s::int[] IS NULL OR e.id = ANY(%s::int[]))
+        ORDER BY e.date_examen, e.heure_debut, e.id
+    """, (session_id, examen_ids, examen_ids))
+    duties = []
+    for examen_id, date_examen, heure_debut, duree, heure_fin, departement_id, places in cursor.fetchall():
+        interval = exam_interval(date_examen, heure_debut, duree, heure_fin)
+        if interval is None:
+            continue
+        for _ in range(surveillants_requis(places)):
+            duties.append(Duty(len(duties), examen_id, departement_id, *interval))
+
+    cursor.execute("""
+        SELECT p.id, p.departement_id, COALESCE(p.nb_max_surveillances_jour, %s),
+               p.heures_semaine_max * 60
+        FROM professeurs p
+        JOIN users u ON p.user_id = u.id
+        WHERE COALESCE(u.is_active, TRUE)
+        ORDER BY p.id
+    """, (MAX_PAR_JOUR_DEFAUT,))
+    invigilators = [Invigilator(*row) for row in cursor.fetchall()]
+
+    cursor.execute("""
+        SELECT sv.prof_id, COALESCE(sv.date_surveillance, e.date_examen),
+               COALESCE(sv.heure_debut, e.heure_debut), e.duree_minutes, e.heure_fin
+        FROM surveillances sv
+        JOIN examens e ON sv.examen_id = e.id
+        WHERE (e.session_id IS DISTINCT FROM %s
+               OR (%s::int[] IS NOT NULL AND NOT e.id = ANY(%s::int[])))
+        AND COALESCE(sv.date_surveillance, e.date_examen) BETWEEN %s AND %s
+    """, (session_id, examen_ids, examen_ids, date_debut, date_fin))
+    busy = []
+    for prof_id, date_value, heure_debut, duree, heure_fin in cursor.fetchall():
+        interval = exam_interval(date_value, heure_debut, duree, heure_fin)
+        if interval is not None:
+            busy.append((prof_id, *interval))
+
+    cursor.execute("""
+        SELECT prof_id, date_indisponibilite, heure_debut, heure_fin
+        FROM indisponibilites_professeurs
+        WHERE date_indisponibilite BETWEEN %s AND %s
+    """, (date_debut, date_fin))
+    unavailable = []
+    for prof_id, jour, heure_debut, heure_fin in cursor.fetchall():
+        minuit = datetime.combine(jour, datetime.min.time())
+        debut = datetime.combine(jour, heure_debut) if heure_debut else minuit
+        fin = datetime.combine(jour, heure_fin) if heure_fin else minuit + timedelta(days=1)
+        unavailable.append((prof_id, debut, fin))
+
+    return duties, invigilators, busy, unavailable
+
+
+def assign_surveillances(cursor, session_id, time_budget=TIME_BUDGET, examen_ids=None):
+    """
+    Recalculer les surveillances d'une session (ou des seuls examens examen_ids)
+    sur le curseur fourni (la transaction reste à l'appelant).
+    Retourne les statistiques du plan ou None.
+    """
+    if examen_ids is not None:
+        examen_ids = list(examen_ids)
+    data = load_invigilation_data(cursor, session_id, examen_ids)
+    if data is None:
+        return None
+    duties, invigilators, busy, unavailable = data
+
+    plan = InvigilationPlanner(duties, invigilators, busy, unavailable).solve(time_budget)
+    by_key = {duty.key: duty for duty in duties}
+    rows = [
+        (by_key[key].examen_id, prof_id, by_key[key].start.date(), by_key[key].start.time())
+        for key, prof_id in sorted(plan.prof_of.items())
+    ]
+
+    cursor.execute("""
+        DELETE FROM surveillances
+        WHERE examen_id IN (SELECT id FROM examens WHERE session_id = %s)
+        AND (%s::int[] IS NULL OR examen_id = ANY(%s::int[]))
+    """, (session_id, examen_ids, examen_ids))
+    execute_values(cursor, """
+        INSERT INTO surveillances (examen_id, prof_id, date_surveillance, heure_debut)
+        VALUES %s
+    """, rows, page_size=1000)
+    return plan.statistics
+
+
+def safe_assign_surveillances(cursor, session_id, time_budget=TIME_BUDGET, examen_ids=None):
+    """
+    assign_surveillances() dans un SAVEPOINT : une erreur (migration 0008 non
+    appliquée...) n'annule pas la planification des examens.
+    """
+    cursor.execute("SAVEPOINT surveillances")
+    try:
+        statistics = assign_surveillances(cursor, session_id, time_budget, examen_ids)
+        cursor.execute("RELEASE SAVEPOINT surveillances")
+        return statistics
+    except Error as e:
+        cursor.execute("ROLLBACK TO SAVEPOINT surveillances")
+        print(f"❌ Erreur d'affectation des surveillants: {e}")
+        return None
+
+
+def generate_surveillances(session_id, time_budget=TIME_BUDGET):
+    """
+    Recalculer et enregistrer les surveillances d'une session (transaction propre).
+    Les emplois du temps d'une session déjà publiée sont recalculés dans la même transaction.
+    """
+    conn = get_connection()
+    if conn is None:
+        return {"success": False, "message": "Erreur de connexion à la base de données"}
+    try:
+        cursor = conn.cursor()
+        statistics = assign_surveillances(cursor, session_id, time_budget)
+        if statistics is None:
+            conn.rollback()
+            return {"success": False, "message": "Session non trouvée"}
+        refresh_published_snapshots(cursor, [session_id])
+        conn.commit()
+        cursor.close()
+    except Error as e:
+        conn.rollback()
+        return {"success": False, "message": f"Erreur: {e}"}
+    finally:
+        conn.close()
+
+    # Le graphe de conflits de la session contient les surveillances
+    invalidate_conflict_graph(session_id)
+    message = (f"{statistics['assigned_duties']}/{statistics['total_duties']} surveillances affectées "
+               f"à {statistics['professors_used']} professeurs")
+    if statistics['unassigned_duties']:
+        message += f", {statistics['unassigned_duties']} sans surveillant disponible"
+    return {"success": True, "message": message, "statistics": statistics}
@@ -0,0 +1,113 @@
+# backend/jobs.py - TÂCHES DE FOND (PLANIFICATION SANS BLOQUER L'INTERFACE)
+"""
+Exécution d'une fonction longue dans un thread, suivie depuis l'interface.
+
+- start_job() lance la fonction avec deux arguments en plus : progress (fonction
+  qui publie l'état courant : phase, coût, examens non planifiés, ...) et
+  stop_event (threading.Event levé par stop_job()).
+- get_job() retourne une copie de l'état de la tâche ; la page Streamlit
+  l'interroge à chaque réexécution.
+- Un thread plutôt qu'un processus : la fonction écrit en base avec le pool de
+  connexions de l'application ; les calculs lourds (multi-départ) passent déjà
+  par des processus (backend.multistart).
+
+Le registre est propre au processus Streamlit : il est partagé entre les
+sessions du navigateur, et les tâches terminées sont oubliées après RETENTION.
+"""
+import threading
+import time
+import uuid
+
+EN_COURS = "EN_COURS"
+TERMINE = "TERMINE"
+ARRETE = "ARRETE"
+ERREUR = "ERREUR"
+
+# Durée (secondes) pendant laquelle une tâche terminée reste consultable
+RETENTION = 3600
+
+_jobs = {}
+_jobs_lock = threading.Lock()
+
+
+class Job:
+    """Tâche de fond : état, dernier avancement publié et résultat"""
+
+    def __init__(self, name):
+        self.id = uuid.uuid4().hex
+        self.name = name
+        self.status = EN_COURS
+        self.result = None
+        self.error = None
+        self.started_at = time.time()
+        self.finished_at = None
+        self.stop_event = threading.Event()
+        self._progress = {}
+        self._lock = threading.Lock()
+
+    def report(self, state):
+        """Fusionner un état publié par la fonction (appelé depuis le thread de la tâche)"""
+        with self._lock:
+            self._progress.update(state)
+
+    def snapshot(self):
+        end = self.finished_at or time.time()
+        with self._lock:
+            progress = dict(self._progress)
+        return {
+            "id": self.id,
+            "name": self.name,
+            "status": self.status,
+            "progress": progress,
+            "elapsed": round(end - self.started_at, 1),
+            "stop_requested": self.stop_event.is_set(),
+            "result": self.result,
+            "error": self.error,
+        }
+
+
+def _purge():
+    limite = time.time() - RETENTION
+    with _jobs_lock:
+        for job_id in [job_id for job_id, job in _jobs.items()
+                       if job.finished_at and job.finished_at < limite]:
+            del _jobs[job_id]
+
+
+def start_job(name, func, *args, **kwargs):
+    """Lancer func(*args, progress=..., stop_event=..., **kwargs) en tâche de fond ; retourne son id"""
+    _purge()
+    job = Job(name)
+
+    def target():
+        try:
+            job.result = func(*args, progress=job.report, stop_event=job.stop_event, **kwargs)
+            job.status = ARRETE if job.stop_event.is_set() else TERMINE
+        except Exception as e:
+            print(f"❌ Erreur de la tâche {name}: {e}")
+            job.error = str(e)
+            job.status = ERREUR
+        finally:
+            job.finished_at = time.time()
+
+    with _jobs_lock:
+        _jobs[job.id] = job
+    threading.Thread(target=target, name=f"job-{name}-{job.id[:8]}", daemon=True).start()
+    return job.id
+
+
+def get_job(job_id):
+    """État courant d'une tâche (dictionnaire), ou None si elle est inconnue"""
+    with _jobs_lock:
+        job = _jobs.get(job_id)
+    return job.snapshot() if job else None
+
+
+def stop_job(job_id):
+    """Demander l'arrêt d'une tâche ; la fonction garde son meilleur résultat"""
+    with _jobs_lock:
+        job = _jobs.get(job_id)
+    if job is None or job.status != EN_COURS:
+        return False
+    job.stop_event.set()
+    return True
@@ -0,0 +1,48 @@
+# backend/migrations/__main__.py - LIGNE DE COMMANDE
+"""
+    python -m backend.migrations            # appliquer les migrations en attente
+    python -m backend.migrations --status   # lister les migrations
+    python -m backend.migrations --check    # EXPLAIN des requêtes des tableaux de bord
+"""
+import argparse
+import sys
+
+from .check import check_query_plans
+from .runner import migrate, status
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Migrations du schéma PostgreSQL")
+    parser.add_argument("--target", type=int, default=None, help="Dernière version à appliquer")
+    parser.add_argument("--status", action="store_true", help="Lister les migrations et leur état")
+    parser.add_argument("--check", action="store_true", help="Signaler les parcours séquentiels")
+    args = parser.parse_args(argv)
+
+    if args.status:
+        migrations = status()
+        if migrations is None:
+            print("❌ Impossible de se connecter à la base de données")
+            return 2
+        for version, name, applied in migrations:
+            print(f"{'✅' if applied else '⏳'} {version:04d}_{name}")
+        return 0
+
+    if args.check:
+        flagged = check_query_plans()
+        if flagged is None:
+            print("❌ Impossible de se connecter à la base de données")
+            return 2
+        for name, tables in flagged:
+            print(f"⚠️ {name}: {', '.join(tables)}")
+        print(f"\n📊 {len(flagged)} requête(s) sans index utilisable")
+        return 1 if flagged else 0
+
+    result = migrate(args.target)
+    for version, name in result["applied"]:
+        print(f"✅ {version:04d}_{name}")
+    print(("✅ " if result["success"] else "❌ ") + result["message"])
+    return 0 if result["success"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,112 @@
+# backend/migrations/check.py - VÉRIFICATION DES PLANS D'EXÉCUTION
+"""
+EXPLAIN des requêtes réellement exécutées par les tableaux de bord, pour
+repérer les parcours séquentiels sur les grandes tables.
+
+Les fonctions de lecture du backend (database.fetch_*, validation, stats) sont
+appelées avec database._fetch_all remplacé par un relevé : leur texte SQL et
+leurs paramètres sont ensuite passés à EXPLAIN, sans être exécutés. La
+requête de connexion (database._LOGIN_SQL) est ajoutée telle quelle.
+
+Les parcours séquentiels sont désactivés pendant l'EXPLAIN (enable_seqscan = off) :
+sur une petite base le planificateur les préfère de toute façon ; s'il en
+reste un malgré tout, c'est qu'aucun index ne peut servir la requête.
+Les pages qui écrivent leur SQL dans frontend/ ne sont pas couvertes.
+
+À lancer en ligne de commande uniquement (python -m backend.migrations --check) :
+le remplacement de database._fetch_all vaut pour tout le processus.
+"""
+import json
+from contextlib import contextmanager
+
+from psycopg2 import Error
+
+from .. import database, stats, validation
+from ..database import get_connection
+
+# Tables dont la taille croît avec le nombre d'étudiants / d'examens
+LARGE_TABLES = ("examens", "surveillances", "etudiants", "users", "professeurs")
+
+# (nom, fonction de lecture du backend, arguments) : filtres des tableaux de bord
+DASHBOARD_READS = (
+    ("liste des professeurs (page suivante)", database.fetch_professeurs_page, (50,)),
+    ("liste des étudiants (page suivante)", database.fetch_etudiants_page, (50,)),
+    ("liste des groupes (page suivante)", database.fetch_groupes_page, (50,)),
+    ("détails d'une session", database.fetch_examens_by_session_grouped, (1,)),
+    ("validation : compteurs de la session", validation.fetch_validation_summary, (1,)),
+    ("validation : examens d'un département", validation.fetch_validation_details, (1, 1)),
+    ("validation : examens refusés", validation.fetch_examens_par_statut, (1, "REFUSE")),
+    ("statistiques : formations d'un département", stats.fetch_stats_formations, (1,)),
+    ("statistiques : répartition par statut", stats.fetch_distribution_statuts, (1, 1)),
+)
+
+
+@contextmanager
+def _recorded_queries():
+    """Relever (requête, paramètres) au lieu d'exécuter les lectures de database._fetch_all"""
+    found = []
+    original = database._fetch_all
+    database._fetch_all = lambda query, params=None: found.append((query, params)) or []
+    try:
+        yield found
+    finally:
+        database._fetch_all = original
+
+
+def dashboard_queries(reads=DASHBOARD_READS):
+    """[(nom, requête, paramètres)] des lectures des tableaux de bord, connexion comprise"""
+    queries = [("connexion (users.email)", database._LOGIN_SQL, ("admin@univ.dz",))]
+    for name, read, args in reads:
+        # Les lectures en cache (@cached) sont appelées sans leur cache
+        read = getattr(read, "uncached", read)
+        with _recorded_queries() as found:
+            read(*args)
+        queries += [(name, query, params) for query, params in found]
+    return queries
+
+
+def _seq_scans(plan, found):
+    """Tables lues par Seq Scan dans un plan JSON"""
+    if plan.get("Node Type") == "Seq Scan":
+        found.append(plan.get("Relation Name"))
+    for child in plan.get("Plans", ()):
+        _seq_scans(child, found)
+    return found
+
+
+def check_query_plans(queries=None, tables=LARGE_TABLES):
+    """
+    Retourne [(nom, [tables en parcours séquentiel ou erreur])] pour les requêtes concernées
+    (liste vide : tous les filtres sont servis par un index). None si pas de connexion.
+    queries : [(nom, requête, paramètres)], dashboard_queries() par défaut
+    """
+    if queries is None:
+        # stats : la vue matérialisée doit exister avant que ses lectures soient relevées
+        stats.ensure_ready()
+        queries = dashboard_queries()
+    conn = get_connection()
+    if conn is None:
+        return None
+
+    flagged = []
+    try:
+        cursor = conn.cursor()
+        cursor.execute("SET LOCAL enable_seqscan = off")
+        for name, query, params in queries:
+            try:
+                cursor.execute("SAVEPOINT explain_check")
+                cursor.execute("EXPLAIN (FORMAT JSON) " + query, params)
+                plan = cursor.fetchone()[0]
+                if isinstance(plan, str):
+                    plan = json.loads(plan)
+                scans = [t for t in _seq_scans(plan[0]["Plan"], []) if t in tables]
+                cursor.execute("RELEASE SAVEPOINT explain_check")
+            except Error as e:
+                cursor.execute("ROLLBACK TO SAVEPOINT explain_check")
+                scans = [f"erreur: {str(e).splitlines()[0]}"]
+            if scans:
+                flagged.append((name, scans))
+        return flagged
+    finally:
+        conn.rollback()
+        conn.close()
@@ -0,0 +1,117 @@
+# backend/migrations/m0001_schema.py - SCHÉMA INITIAL
+"""
+Tables utilisées par l'application. IF NOT EXISTS : la migration peut être
+appliquée sur une base existante (Neon) sans toucher aux données ; les
+colonnes ajoutées après coup sont créées par ALTER TABLE ... ADD COLUMN IF NOT EXISTS.
+"""
+VERSION = 1
+NAME = "schema"
+
+SQL = """
+CREATE TABLE IF NOT EXISTS departements (
+    id SERIAL PRIMARY KEY,
+    nom VARCHAR(150) NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS users (
+    id SERIAL PRIMARY KEY,
+    email VARCHAR(255) NOT NULL UNIQUE,
+    password VARCHAR(255) NOT NULL,
+    role VARCHAR(30) NOT NULL,
+    departement_id INTEGER REFERENCES departements(id),
+    is_active BOOLEAN NOT NULL DEFAULT TRUE,
+    created_at TIMESTAMP DEFAULT NOW()
+);
+
+CREATE TABLE IF NOT EXISTS formations (
+    id SERIAL PRIMARY KEY,
+    nom VARCHAR(150) NOT NULL,
+    departement_id INTEGER REFERENCES departements(id)
+);
+
+CREATE TABLE IF NOT EXISTS groupes (
+    id SERIAL PRIMARY KEY,
+    nom VARCHAR(50) NOT NULL,
+    formation_id INTEGER NOT NULL REFERENCES formations(id),
+    effectif INTEGER NOT NULL DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS modules (
+    id SERIAL PRIMARY KEY,
+    nom VARCHAR(150) NOT NULL,
+    formation_id INTEGER NOT NULL REFERENCES formations(id)
+);
+
+CREATE TABLE IF NOT EXISTS salles (
+    id SERIAL PRIMARY KEY,
+    nom VARCHAR(50) NOT NULL,
+    capacite INTEGER NOT NULL,
+    type VARCHAR(20) NOT NULL DEFAULT 'SALLE'
+);
+
+CREATE TABLE IF NOT EXISTS etudiants (
+    id SERIAL PRIMARY KEY,
+    user_id INTEGER REFERENCES users(id),
+    nom VARCHAR(100),
+    prenom VARCHAR(100),
+    matricule VARCHAR(30),
+    groupe_id INTEGER REFERENCES groupes(id)
+);
+
+CREATE TABLE IF NOT EXISTS professeurs (
+    id SERIAL PRIMARY KEY,
+    user_id INTEGER REFERENCES users(id),
+    departement_id INTEGER REFERENCES departements(id),
+    specialite VARCHAR(150),
+    nb_max_surveillances_jour INTEGER DEFAULT 3,
+    heures_semaine_max INTEGER DEFAULT 20
+);
+
+CREATE TABLE IF NOT EXISTS sessions (
+    id SERIAL PRIMARY KEY,
+    nom VARCHAR(150) NOT NULL,
+    date_debut DATE NOT NULL,
+    date_fin DATE NOT NULL,
+    statut VARCHAR(30) NOT NULL DEFAULT 'CREATION',
+    date_creation TIMESTAMP DEFAULT NOW(),
+    last_modified TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS examens (
+    id SERIAL PRIMARY KEY,
+    module_id INTEGER NOT NULL REFERENCES modules(id),
+    session_id INTEGER REFERENCES sessions(id) ON DELETE CASCADE,
+    formation_id INTEGER REFERENCES formations(id),
+    groupe_id INTEGER REFERENCES groupes(id),
+    salle_id INTEGER REFERENCES salles(id),
+    date_examen DATE,
+    heure_debut TIME,
+    heure_fin TIME,
+    duree_minutes INTEGER DEFAULT 120,
+    statut VARCHAR(20) NOT NULL DEFAULT 'EN_ATTENTE',
+    last_modified TIMESTAMP,
+    modified_by INTEGER
+);
+
+CREATE TABLE IF NOT EXISTS surveillances (
+    id SERIAL PRIMARY KEY,
+    examen_id INTEGER NOT NULL REFERENCES examens(id) ON DELETE CASCADE,
+    prof_id INTEGER NOT NULL REFERENCES professeurs(id),
+    date_surveillance DATE,
+    heure_debut TIME
+);
+
+CREATE TABLE IF NOT EXISTS planning_generations (
+    id SERIAL PRIMARY KEY,
+    generated_by INTEGER,
+    generation_date TIMESTAMP DEFAULT NOW(),
+    exams_scheduled INTEGER,
+    parameters TEXT
+);
+
+-- Colonnes utilisées par la validation du vice-doyen, absentes des premières bases
+ALTER TABLE sessions ADD COLUMN IF NOT EXISTS last_modified TIMESTAMP;
+ALTER TABLE examens ADD COLUMN IF NOT EXISTS duree_minutes INTEGER DEFAULT 120;
+ALTER TABLE examens ADD COLUMN IF NOT EXISTS last_modified TIMESTAMP;
+ALTER TABLE examens ADD COLUMN IF NOT EXISTS modified_by INTEGER;
+"""
@@ -0,0 +1,35 @@
+# backend/migrations/m0002_indexes.py - INDEX DES REQUÊTES DES TABLEAUX DE BORD
+"""
+Un index par filtre des tableaux de bord ; les index composites suivent
+l'ordre égalité puis tri : (groupe_id, statut, date_examen) sert à la fois
+le WHERE et l'ORDER BY du planning étudiant.
+"""
+VERSION = 2
+NAME = "indexes"
+
+SQL = """
+-- Examens : sessions (génération, conflits, validation finale)
+CREATE INDEX IF NOT EXISTS examens_session_statut_idx ON examens (session_id, statut);
+-- Examens : planning d'un groupe (étudiants)
+CREATE INDEX IF NOT EXISTS examens_groupe_statut_date_idx ON examens (groupe_id, statut, date_examen);
+-- Examens : validation par formation (chef de département)
+CREATE INDEX IF NOT EXISTS examens_formation_statut_idx ON examens (formation_id, statut);
+-- Examens : occupation des salles
+CREATE INDEX IF NOT EXISTS examens_salle_date_idx ON examens (salle_id, date_examen);
+CREATE INDEX IF NOT EXISTS examens_module_idx ON examens (module_id);
+
+-- Surveillances : planning d'un professeur et surveillants d'un examen
+CREATE INDEX IF NOT EXISTS surveillances_prof_date_idx ON surveillances (prof_id, date_surveillance);
+CREATE INDEX IF NOT EXISTS surveillances_examen_idx ON surveillances (examen_id);
+
+-- Profils rattachés au compte (connexion, pages étudiant / professeur)
+CREATE INDEX IF NOT EXISTS etudiants_user_idx ON etudiants (user_id);
+CREATE INDEX IF NOT EXISTS etudiants_groupe_idx ON etudiants (groupe_id);
+CREATE INDEX IF NOT EXISTS professeurs_user_idx ON professeurs (user_id);
+CREATE INDEX IF NOT EXISTS professeurs_departement_idx ON professeurs (departement_id);
+
+-- Données de référence
+CREATE INDEX IF NOT EXISTS groupes_formation_idx ON groupes (formation_id);
+CREATE INDEX IF NOT EXISTS modules_formation_idx ON modules (formation_id);
+CREATE INDEX IF NOT EXISTS formations_departement_idx ON formations (departement_id);
+"""
@@ -0,0 +1,23 @@
+# backend/migrations/m0003_sessions_examens.py - VUE DE COMPATIBILITÉ sessions_examens
+"""
+Le backend écrit dans sessions ; les pages étudiant, professeur et vice-doyen
+lisent (et mettent à jour) sessions_examens. Une vue simple sur sessions est
+modifiable par PostgreSQL, les deux noms désignent donc les mêmes lignes.
+Rien n'est créé si une relation sessions_examens existe déjà.
+Les colonnes sont listées : SELECT * serait figé à la création de la vue, et une
+migration qui ajoute une colonne à sessions recrée la vue (voir m0007).
+"""
+VERSION = 3
+NAME = "sessions_examens"
+
+SQL = """
+DO $$
+BEGIN
+    IF to_regclass('sessions_examens') IS NULL THEN
+        CREATE VIEW sessions_examens AS
+            SELECT id, nom, date_debut, date_fin, statut, date_creation, last_modified
+            FROM sessions;
+    END IF;
+END
+$$;
+"""
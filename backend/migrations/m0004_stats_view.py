@@ -0,0 +1,7 @@
+# backend/migrations/m0004_stats_view.py - VUE MATÉRIALISÉE DES STATISTIQUES
+from ..stats import CREATE_VIEW_SQL, CREATE_INDEX_SQL
+
+VERSION = 4
+NAME = "stats_view"
+
+SQL = CREATE_VIEW_SQL + ";\n" + CREATE_INDEX_SQL + ";\n"
@@ -0,0 +1,16 @@
+# backend/migrations/m0005_timetable_snapshots.py - EMPLOIS DU TEMPS PUBLIÉS
+VERSION = 5
+NAME = "timetable_snapshots"
+
+SQL = """
+CREATE SEQUENCE IF NOT EXISTS timetable_version_seq;
+
+CREATE TABLE IF NOT EXISTS timetable_snapshots (
+    owner_type VARCHAR(10) NOT NULL,
+    owner_id INTEGER NOT NULL,
+    version BIGINT NOT NULL,
+    payload JSONB NOT NULL,
+    created_at TIMESTAMP NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (owner_type, owner_id)
+);
+"""
@@ -0,0 +1,7 @@
+# backend/migrations/m0006_timetable_ics.py - CALENDRIERS ICS DES EMPLOIS DU TEMPS PUBLIÉS
+VERSION = 6
+NAME = "timetable_ics"
+
+SQL = """
+ALTER TABLE timetable_snapshots ADD COLUMN IF NOT EXISTS ics TEXT;
+"""
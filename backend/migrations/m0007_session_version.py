@@ -0,0 +1,58 @@
+# backend/migrations/m0007_session_version.py - VERSION DES SESSIONS
+"""
+sessions.version est incrémentée à chaque modification des examens de la
+session (triggers au niveau instruction : une seule mise à jour par session
+touchée, même pour un COPY de milliers de lignes). Les exports sont mis en
+cache par (session, version).
+La vue sessions_examens (m0003) est recréée pour exposer la nouvelle colonne.
+"""
+VERSION = 7
+NAME = "session_version"
+
+SQL = """
+ALTER TABLE sessions ADD COLUMN IF NOT EXISTS version BIGINT NOT NULL DEFAULT 1;
+
+DO $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM pg_views WHERE viewname = 'sessions_examens' AND schemaname = current_schema()) THEN
+        CREATE OR REPLACE VIEW sessions_examens AS
+            SELECT id, nom, date_debut, date_fin, statut, date_creation, last_modified, version
+            FROM sessions;
+    END IF;
+END
+$$;
+
+CREATE OR REPLACE FUNCTION bump_session_version() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        UPDATE sessions SET version = version + 1
+        WHERE id IN (SELECT DISTINCT session_id FROM new_rows);
+    ELSIF TG_OP = 'DELETE' THEN
+        UPDATE sessions SET version = version + 1
+        WHERE id IN (SELECT DISTINCT session_id FROM old_rows);
+    ELSE
+        UPDATE sessions SET version = version + 1
+        WHERE id IN (SELECT session_id FROM new_rows UNION SELECT session_id FROM old_rows);
+    END IF;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS examens_version_insert ON examens;
+CREATE TRIGGER examens_version_insert
+    AFTER INSERT ON examens
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_session_version();
+
+DROP TRIGGER IF EXISTS examens_version_update ON examens;
+CREATE TRIGGER examens_version_update
+    AFTER UPDATE ON examens
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_session_version();
+
+DROP TRIGGER IF EXISTS examens_version_delete ON examens;
+CREATE TRIGGER examens_version_delete
+    AFTER DELETE ON examens
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_session_version();
+"""
@@ -0,0 +1,21 @@
+# backend/migrations/m0008_indisponibilites.py - INDISPONIBILITÉS DES SURVEILLANTS
+"""
+Périodes pendant lesquelles un professeur ne peut pas surveiller
+(heure_debut / heure_fin NULL : toute la journée). Lues par backend.invigilation.
+"""
+VERSION = 8
+NAME = "indisponibilites"
+
+SQL = """
+CREATE TABLE IF NOT EXISTS indisponibilites_professeurs (
+    id SERIAL PRIMARY KEY,
+    prof_id INTEGER NOT NULL REFERENCES professeurs(id) ON DELETE CASCADE,
+    date_indisponibilite DATE NOT NULL,
+    heure_debut TIME,
+    heure_fin TIME,
+    motif VARCHAR(200)
+);
+
+CREATE INDEX IF NOT EXISTS indisponibilites_prof_date_idx
+    ON indisponibilites_professeurs (prof_id, date_indisponibilite);
+"""
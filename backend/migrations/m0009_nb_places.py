@@ -0,0 +1,13 @@
+# backend/migrations/m0009_nb_places.py - PLACES PAR SALLE D'UN EXAMEN
+"""
+examens.nb_places : nombre d'étudiants du groupe placés dans la salle de la
+ligne (un groupe réparti sur plusieurs salles a une ligne par salle).
+NULL pour les lignes écrites avant cette migration : tout le groupe.
+Lu par detect_capacity_issues() et par le calcul des surveillants requis.
+"""
+VERSION = 9
+NAME = "nb_places"
+
+SQL = """
+ALTER TABLE examens ADD COLUMN IF NOT EXISTS nb_places INTEGER;
+"""
@@ -0,0 +1,12 @@
+# backend/migrations/m0010_group_ics_public.py - CALENDRIERS DE GROUPE SANS EMAIL
+"""
+Les calendriers ICS de groupe stockés avant cette version citaient les emails
+des surveillants. Ils sont effacés : la prochaine publication les régénère
+sans champ personnel, et l'API les recalcule en attendant.
+"""
+VERSION = 10
+NAME = "group_ics_public"
+
+SQL = """
+UPDATE timetable_snapshots SET ics = NULL WHERE owner_type = 'GROUPE';
+"""
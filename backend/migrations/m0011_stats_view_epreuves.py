@@ -0,0 +1,12 @@
+# backend/migrations/m0011_stats_view_epreuves.py - STATISTIQUES PAR ÉPREUVE
+"""
+mv_examens_stats comptait les lignes examens : un groupe réparti sur plusieurs
+salles comptait une fois par salle. La vue est recréée pour compter les
+épreuves (module, groupe) ; voir backend.stats.
+"""
+from ..stats import CREATE_VIEW_SQL, CREATE_INDEX_SQL, VIEW_NAME
+
+VERSION = 11
+NAME = "stats_view_epreuves"
+
+SQL = f"DROP MATERIALIZED VIEW IF EXISTS {VIEW_NAME};\n" + CREATE_VIEW_SQL + ";\n" + CREATE_INDEX_SQL + ";\n"
@@ -0,0 +1,108 @@
+# backend/migrations/runner.py - APPLICATION DES MIGRATIONS
+"""
+Chaque migration est un module mNNNN_nom.py de ce package qui définit
+VERSION, NAME et SQL. Les versions appliquées sont enregistrées dans
+schema_migrations ; migrate() applique les suivantes dans l'ordre, chacune
+dans sa propre transaction.
+"""
+import importlib
+import pkgutil
+import re
+
+from psycopg2 import Error
+
+from ..database import get_connection
+
+# Verrou consultatif : deux processus ne migrent pas la base en même temps
+LOCK_ID = 8_137_001
+
+_MODULE_RE = re.compile(r"^m\d{4}_\w+$")
+
+
+def load_migrations():
+    """Modules de migration du package, triés par version"""
+    package = __name__.rsplit(".", 1)[0]
+    path = importlib.import_module(package).__path__
+    migrations = [
+        importlib.import_module(f"{package}.{info.name}")
+        for info in pkgutil.iter_modules(path)
+        if _MODULE_RE.match(info.name)
+    ]
+    migrations.sort(key=lambda m: m.VERSION)
+    versions = [m.VERSION for m in migrations]
+    if len(set(versions)) != len(versions):
+        raise ValueError(f"Versions de migration dupliquées: {versions}")
+    return migrations
+
+
+def _ensure_table(cursor):
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version INTEGER PRIMARY KEY,
+            name VARCHAR(100) NOT NULL,
+            applied_at TIMESTAMP NOT NULL DEFAULT NOW()
+        )
+    """)
+
+
+def applied_versions(cursor):
+    """Versions déjà appliquées"""
+    _ensure_table(cursor)
+    cursor.execute("SELECT version FROM schema_migrations")
+    return {row[0] for row in cursor.fetchall()}
+
+
+def status():
+    """[(version, nom, appliquée)] pour toutes les migrations connues"""
+    conn = get_connection()
+    if conn is None:
+        return None
+    try:
+        cursor = conn.cursor()
+        applied = applied_versions(cursor)
+        conn.commit()
+        return [(m.VERSION, m.NAME, m.VERSION in applied) for m in load_migrations()]
+    finally:
+        conn.close()
+
+
+def migrate(target=None):
+    """
+    Appliquer les migrations en attente (jusqu'à `target` inclus).
+    Retourne {"success": bool, "message": str, "applied": [(version, nom)]}.
+    """
+    conn = get_connection()
+    if conn is None:
+        return {"success": False, "message": "Erreur de connexion", "applied": []}
+
+    applied = []
+    try:
+        cursor = conn.cursor()
+        for migration in load_migrations():
+            if target is not None and migration.VERSION > target:
+                break
+            try:
+                # Verrou de transaction : relâché au COMMIT / ROLLBACK, même sur une connexion du pool
+                cursor.execute("SELECT pg_advisory_xact_lock(%s)", (LOCK_ID,))
+                if migration.VERSION in applied_versions(cursor):
+                    conn.rollback()
+                    continue
+                cursor.execute(migration.SQL)
+                cursor.execute(
+                    "INSERT INTO schema_migrations (version, name) VALUES (%s, %s)",
+                    (migration.VERSION, migration.NAME)
+                )
+                conn.commit()
+            except Error as e:
+                conn.rollback()
+                return {
+                    "success": False,
+                    "message": f"Migration {migration.VERSION:04d}_{migration.NAME} échouée: {e}",
+                    "applied": applied,
+                }
+            applied.append((migration.VERSION, migration.NAME))
+
+        message = f"{len(applied)} migration(s) appliquée(s)" if applied else "Schéma à jour"
+        return {"success": True, "message": message, "applied": applied}
+    finally:
+        conn.close()
@@ -0,0 +1,149 @@
+# backend/multistart.py - PLANIFICATION MULTI-DÉPART EN PARALLÈLE
+"""
+La qualité d'une planification (DSatur + recherche locale) dépend de la graine :
+ordre entre examens de même saturation, choix entre créneaux équivalents.
+solve_multistart() lance plusieurs exécutions indépendantes d'ExamScheduler
+dans un ProcessPoolExecutor et garde celle de moindre coût (Schedule.cost).
+
+Le problème (examens, salles, créneaux, graphe, contexte de replanification)
+est transmis une seule fois à chaque processus (initializer) ; une tâche ne
+transmet que sa graine. Le budget est un temps réel total : les exécutions
+non terminées à l'échéance sont abandonnées.
+
+Sans processus disponible (un seul cœur, pool impossible à créer), les
+exécutions se font à la suite dans le processus courant, dans le même budget.
+
+progress / stop_event : la meilleure exécution terminée est publiée au fil de
+l'eau ; un arrêt demandé garde le meilleur résultat déjà obtenu (en mode
+séquentiel, l'exécution en cours s'arrête elle-même et compte comme résultat).
+"""
+import math
+import multiprocessing
+import os
+import random
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+
+from .scheduler import ExamScheduler
+
+# Part du budget gardée pour le démarrage des processus et le retour des résultats
+MARGE = 0.25
+# Budget minimal (secondes) de recherche locale d'une exécution
+BUDGET_MIN = 0.1
+# Attente maximale (secondes) entre deux vérifications de l'arrêt demandé
+POLL_INTERVAL = 0.2
+
+_problem = None
+
+
+def _init_worker(problem):
+    global _problem
+    _problem = problem
+
+
+def _run(seed, time_budget, progress=None, stop_event=None):
+    args, context = _problem
+    schedule = ExamScheduler(*args, **context).solve(
+        seed=seed, time_budget=time_budget, progress=progress, stop_event=stop_event
+    )
+    return seed, schedule
+
+
+def _stopped(stop_event):
+    return stop_event is not None and stop_event.is_set()
+
+
+def _report_best(progress, results, runs):
+    if progress is None or not results:
+        return
+    best = min(schedule.cost for _, schedule in results)
+    progress({"phase": "multi-départ", "cost": best, "runs_completed": len(results), "runs": runs})
+
+
+def default_workers():
+    """Processus de calcul par défaut : un cœur reste libre pour l'application"""
+    return max(1, (os.cpu_count() or 1) - 1)
+
+
+def _solve_parallel(problem, seeds, workers, run_budget, deadline, progress=None, stop_event=None):
+    # spawn : les processus ne partagent ni threads ni connexions du pool PostgreSQL
+    executor = ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+        initargs=(problem,),
+    )
+    try:
+        pending = {executor.submit(_run, seed, run_budget) for seed in seeds}
+        results = []
+        while pending:
+            remaining = deadline - time.perf_counter()
+            # Un arrêt demandé n'est pris en compte qu'une fois un résultat disponible
+            if remaining <= 0 or (results and _stopped(stop_event)):
+                break
+            done, pending = wait(pending, timeout=min(POLL_INTERVAL, remaining),
+                                 return_when=FIRST_COMPLETED)
+            finished = [future.result() for future in done if future.exception() is None]
+            if finished:
+                results.extend(finished)
+                _report_best(progress, results, len(seeds))
+        return results
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _solve_sequential(problem, seeds, deadline, progress=None, stop_event=None):
+    _init_worker(problem)
+    results = []
+    for position, seed in enumerate(seeds):
+        remaining = deadline - time.perf_counter()
+        if results and (remaining <= BUDGET_MIN or _stopped(stop_event)):
+            break
+        run_budget = max(BUDGET_MIN, remaining / (len(seeds) - position))
+        results.append(_run(seed, run_budget, progress, stop_event))
+        _report_best(progress, results, len(seeds))
+    return results
+
+
+def solve_multistart(exams, rooms, slots, adjacency=None, runs=None, workers=None,
+                     time_budget=2.0, seed=None, progress=None, stop_event=None, **context):
+    """
+    Meilleure de `runs` planifications indépendantes, en au plus time_budget secondes.
+    context : paramètres de replanification d'ExamScheduler (blocked, occupied, group_day, preferred)
+    progress / stop_event : voir ExamScheduler.solve()
+    """
+    start = time.perf_counter()
+    deadline = start + time_budget
+    workers = workers or default_workers()
+    runs = runs or workers
+    seeds = random.Random(seed).sample(range(2 ** 31), runs)
+    problem = ((list(exams), list(rooms), list(slots), adjacency), context)
+
+    results = []
+    parallel = workers > 1 and runs > 1
+    if parallel:
+        workers = min(workers, runs)
+        # Les exécutions passent par vagues de `workers` ; chacune a sa part du budget
+        waves = math.ceil(runs / workers)
+        run_budget = max(BUDGET_MIN, time_budget * (1 - MARGE) / waves)
+        try:
+            results = _solve_parallel(problem, seeds, workers, run_budget, deadline,
+                                      progress, stop_event)
+        except (OSError, BrokenProcessPool) as e:
+            print(f"⚠️ Exécutions parallèles impossibles, repli séquentiel: {e}")
+    if not results:
+        parallel = False
+        results = _solve_sequential(problem, seeds, deadline, progress, stop_event)
+
+    best_seed, best = min(results, key=lambda result: result[1].cost)
+    best.statistics.update({
+        "runs": runs,
+        "runs_completed": len(results),
+        "parallel_workers": workers if parallel else 1,
+        "best_seed": best_seed,
+        "run_costs": sorted(schedule.cost for _, schedule in results),
+        "execution_time": round(time.perf_counter() - start, 3),
+        "stopped_early": _stopped(stop_event),
+    })
+    return best
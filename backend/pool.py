@@ -0,0 +1,224 @@
+# backend/pool.py - POOL DE CONNEXIONS POSTGRESQL PARTAGÉ
+import threading
+import time
+
+import psycopg2
+from psycopg2 import extensions
+from psycopg2.pool import PoolError
+
+
+class ConnectionPool:
+    """
+    Pool de connexions borné (min/max) partagé par tout le processus.
+    - Les connexions inactives sont réutilisées (LIFO) sans nouvelle poignée de main TLS
+    - Une connexion restée inactive trop longtemps est vérifiée (SELECT 1) avant d'être rendue
+    - Les connexions inactives au-delà de `max_idle` secondes sont fermées (en gardant `minconn`)
+    """
+
+    def __init__(self, dsn, minconn=1, maxconn=10, max_idle=300,
+                 health_check_after=30, timeout=10, **connect_kwargs):
+        if minconn < 0 or maxconn < 1 or minconn > maxconn:
+            raise ValueError("Taille de pool invalide")
+        self.dsn = dsn
+        self.minconn = minconn
+        self.maxconn = maxconn
+        self.max_idle = max_idle
+        self.health_check_after = health_check_after
+        self.timeout = timeout
+        self.connect_kwargs = connect_kwargs
+
+        self._idle = []  # [(connexion, dernière utilisation)] - la plus récente à la fin
+        self._size = 0   # connexions ouvertes (inactives + empruntées + en création)
+        self._closed = False
+        self._cond = threading.Condition()
+
+    # ------------------------------------------------------------------
+    # Emprunt / restitution
+    # ------------------------------------------------------------------
+    def getconn(self, timeout=None):
+        """Emprunter une connexion saine (bloque au plus `timeout` secondes si le pool est plein)"""
+        deadline = time.monotonic() + (self.timeout if timeout is None else timeout)
+
+        while True:
+            raw = None
+            last_used = None
+            with self._cond:
+                if self._closed:
+                    raise PoolError("Le pool de connexions est fermé")
+                self._reap_idle()
+                if self._idle:
+                    raw, last_used = self._idle.pop()
+                elif self._size < self.maxconn:
+                    self._size += 1
+                else:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise PoolError(f"Pool de connexions épuisé ({self.maxconn} connexions utilisées)")
+                    self._cond.wait(remaining)
+                    continue
+
+            if raw is None:
+                # Place réservée : ouvrir une nouvelle connexion hors du verrou
+                try:
+                    raw = psycopg2.connect(self.dsn, **self.connect_kwargs)
+                except Exception:
+                    with self._cond:
+                        self._size -= 1
+                        self._cond.notify()
+                    raise
+                return PooledConnection(self, raw)
+
+            if self._is_healthy(raw, last_used):
+                return PooledConnection(self, raw)
+            self._discard(raw)
+
+    def putconn(self, raw, discard=False):
+        """Rendre une connexion au pool (annule toute transaction restée ouverte)"""
+        if not discard and not raw.closed:
+            try:
+                if raw.info.transaction_status != extensions.TRANSACTION_STATUS_IDLE:
+                    raw.rollback()
+                if raw.autocommit:
+                    raw.autocommit = False
+            except psycopg2.Error:
+                discard = True
+
+        if discard or raw.closed:
+            self._discard(raw)
+            return
+
+        with self._cond:
+            if self._closed:
+                self._size -= 1
+                raw.close()
+                return
+            self._idle.append((raw, time.monotonic()))
+            self._cond.notify()
+
+    def closeall(self):
+        """Fermer toutes les connexions inactives et refuser les nouveaux emprunts"""
+        with self._cond:
+            self._closed = True
+            while self._idle:
+                raw, _ = self._idle.pop()
+                self._size -= 1
+                _close_quietly(raw)
+            self._cond.notify_all()
+
+    def stats(self):
+        """État courant du pool (pour le diagnostic)"""
+        with self._cond:
+            return {
+                "size": self._size,
+                "idle": len(self._idle),
+                "in_use": self._size - len(self._idle),
+                "maxconn": self.maxconn,
+            }
+
+    # ------------------------------------------------------------------
+    # Interne
+    # ------------------------------------------------------------------
+    def _is_healthy(self, raw, last_used):
+        if raw.closed:
+            return False
+        if time.monotonic() - last_used < self.health_check_after:
+            return True
+        try:
+            cursor = raw.cursor()
+            cursor.execute("SELECT 1")
+            cursor.close()
+            raw.rollback()
+            return True
+        except psycopg2.Error:
+            return False
+
+    def _discard(self, raw):
+        _close_quietly(raw)
+        with self._cond:
+            self._size -= 1
+            self._cond.notify()
+
+    def _reap_idle(self):
+        """Fermer les connexions inactives depuis trop longtemps (appelé sous verrou)"""
+        if not self.max_idle:
+            return
+        limit = time.monotonic() - self.max_idle
+        # Les plus anciennes sont en tête de liste
+        while self._idle and self._size > self.minconn and self._idle[0][1] < limit:
+            raw, _ = self._idle.pop(0)
+            self._size -= 1
+            _close_quietly(raw)
+
+
+class PooledConnection:
+    """
+    Enveloppe d'une connexion psycopg2 empruntée au pool.
+    close() rend la connexion au pool au lieu de la fermer, ce qui permet aux
+    dashboards existants (get_connection() ... conn.close()) de fonctionner tels quels.
+    Une connexion oubliée est rendue automatiquement quand l'objet est détruit.
+    Utilisable comme gestionnaire de contexte : `with get_connection() as conn:`
+    valide la transaction (ou l'annule en cas d'exception) puis rend la connexion.
+    """
+    __slots__ = ("_pool", "_raw")
+
+    def __init__(self, pool, raw):
+        self._pool = pool
+        self._raw = raw
+
+    def __getattr__(self, name):
+        if name in PooledConnection.__slots__:
+            raise AttributeError(name)
+        raw = self._raw
+        if raw is None:
+            raise psycopg2.InterfaceError("Connexion déjà rendue au pool")
+        return getattr(raw, name)
+
+    def __setattr__(self, name, value):
+        if name in PooledConnection.__slots__:
+            object.__setattr__(self, name, value)
+        else:
+            setattr(self._raw, name, value)
+
+    @property
+    def raw(self):
+        """Connexion psycopg2 sous-jacente"""
+        return self._raw
+
+    @property
+    def closed(self):
+        return 1 if self._raw is None else self._raw.closed
+
+    def close(self):
+        """Rendre la connexion au pool (idempotent)"""
+        raw, self._raw = self._raw, None
+        if raw is not None:
+            self._pool.putconn(raw)
+
+    def __enter__(self):
+        if self._raw is None:
+            raise psycopg2.InterfaceError("Connexion déjà rendue au pool")
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            if self._raw is not None and not self._raw.closed:
+                if exc_type is None:
+                    self._raw.commit()
+                else:
+                    self._raw.rollback()
+        finally:
+            self.close()
+        return False
+
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
+
+
+def _close_quietly(raw):
+    try:
+        raw.close()
+    except Exception:
+        pass
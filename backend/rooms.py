@@ -0,0 +1,107 @@
+# backend/rooms.py - AFFECTATION DES SALLES PAR CRÉNEAU
+"""
+Répartition des groupes d'un créneau dans les salles (meilleur ajustement décroissant).
+
+- Les épreuves sont traitées par effectif décroissant ; chacune reçoit la plus
+  petite salle libre qui peut accueillir tout le groupe. À capacité égale une
+  SALLE est préférée à un AMPHI, pour garder les amphithéâtres aux grands groupes.
+- Un groupe plus grand que toutes les salles libres est réparti sur plusieurs
+  salles : les plus grandes d'abord, puis la plus petite qui suffit pour le reste.
+  C'est ce qui minimise le nombre de salles utilisées.
+- Une salle n'accueille qu'une épreuve à la fois (sinon conflicts.py signale une
+  double utilisation). Un groupe réparti donne une ligne examens par salle, avec
+  ses places (examens.nb_places) relues par detect_capacity_issues().
+
+Coût : O(k log r) par créneau pour k épreuves et r salles.
+"""
+import bisect
+from dataclasses import dataclass, field
+
+AMPHI = "AMPHI"
+SALLE = "SALLE"
+
+
+@dataclass(frozen=True)
+class Placement:
+    """Partie d'un groupe placée dans une salle"""
+    room: object
+    places: int
+
+
+@dataclass
+class RoomAllocation:
+    """Résultat de l'affectation d'un créneau"""
+    rooms_of: dict = field(default_factory=dict)   # clé examen -> [Placement]
+    overflows: int = 0                             # épreuves dont une partie du groupe n'a pas de place
+    missing_seats: int = 0                         # étudiants sans place au total
+    split_exams: int = 0                           # épreuves réparties sur plusieurs salles
+
+    @property
+    def rooms_used(self):
+        return sum(len(placements) for placements in self.rooms_of.values())
+
+
+def _room_order(room):
+    return (room.capacite, room.type == AMPHI)
+
+
+class _FreeRooms:
+    """Salles libres triées par capacité (recherche du meilleur ajustement par bisect)"""
+
+    def __init__(self, rooms):
+        self.rooms = sorted(rooms, key=_room_order)
+        self.capacites = [room.capacite for room in self.rooms]
+
+    def __len__(self):
+        return len(self.rooms)
+
+    def best_fit(self, effectif):
+        """Indice de la plus petite salle de capacité >= effectif, ou None"""
+        i = bisect.bisect_left(self.capacites, effectif)
+        return i if i < len(self.rooms) else None
+
+    def take(self, i):
+        self.capacites.pop(i)
+        return self.rooms.pop(i)
+
+
+def allocate_rooms(exams, rooms, allow_split=True):
+    """
+    Affecter les salles aux épreuves d'un même créneau.
+    exams : objets avec key et effectif ; rooms : objets avec capacite et type.
+    Chaque épreuve reçoit au moins une salle tant qu'il y a autant de salles que d'épreuves.
+    """
+    free = _FreeRooms(rooms)
+    allocation = RoomAllocation()
+    ordered = sorted(exams, key=lambda e: e.effectif, reverse=True)
+
+    for position, exam in enumerate(ordered):
+        if not free:
+            break
+        # Garder au moins une salle pour chacune des épreuves suivantes
+        reserve = len(ordered) - position - 1
+        remaining = exam.effectif
+        placements = []
+
+        while True:
+            i = free.best_fit(remaining)
+            if i is not None:
+                room = free.take(i)
+                placements.append(Placement(room, remaining))
+                remaining = 0
+                break
+            # Aucune salle ne suffit : prendre la plus grande
+            room = free.take(len(free) - 1)
+            placements.append(Placement(room, room.capacite))
+            remaining -= room.capacite
+            if not allow_split or not free or len(free) <= reserve:
+                break
+
+        allocation.rooms_of[exam.key] = placements
+        if len(placements) > 1:
+            allocation.split_exams += 1
+        if remaining > 0:
+            allocation.overflows += 1
+            allocation.missing_seats += remaining
+
+    return allocation
@@ -0,0 +1,401 @@
+# backend/scheduler.py - MOTEUR DE PLANIFICATION DES EXAMENS
+"""
+Planification par contraintes des examens d'une session.
+
+1. Coloration DSatur du graphe de conflits : chaque couleur est un créneau
+   (jour + heure), deux examens partageant des étudiants ne reçoivent jamais
+   le même créneau et un créneau n'accueille pas plus d'examens que de salles
+   ni plus d'étudiants que de places.
+2. Affectation des salles par créneau (backend.rooms : meilleur ajustement
+   décroissant, grands groupes répartis sur plusieurs salles).
+3. Recherche locale : déplacement d'examens vers d'autres créneaux pour éviter
+   qu'un groupe ait plusieurs examens le même jour.
+
+Le module ne dépend pas de la base de données : algorithm_simple charge les
+données, construit les ExamRequest / Room / Slot et écrit le résultat.
+"""
+import heapq
+import random
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+
+from .rooms import allocate_rooms
+
+# Créneaux par défaut (début) et durée d'une épreuve en minutes
+DEFAULT_HEURES = ("08:30", "11:00", "13:30", "16:00")
+DEFAULT_DUREE = 120
+
+# Pondérations de la fonction de coût
+PENALITE_NON_PLANIFIE = 1000   # examen sans créneau
+PENALITE_CAPACITE = 100        # examen dont une partie du groupe n'a pas de place
+PENALITE_MEME_JOUR = 10        # examen supplémentaire d'un groupe dans la même journée
+
+# Intervalle minimal (secondes) entre deux rapports de progression
+PROGRESS_INTERVAL = 0.25
+
+
+@dataclass(frozen=True)
+class ExamRequest:
+    """Examen à planifier : un module pour un groupe"""
+    key: int
+    module_id: int
+    formation_id: int
+    groupe_id: int
+    effectif: int = 0
+    duree_minutes: int = DEFAULT_DUREE
+
+
+@dataclass(frozen=True)
+class Room:
+    """Salle d'examen"""
+    id: int
+    nom: str
+    capacite: int
+    type: str = "SALLE"
+
+
+@dataclass(frozen=True)
+class Slot:
+    """Créneau d'examen (jour + heure de début)"""
+    index: int
+    day: int
+    date: object
+    heure_debut: object
+    heure_fin: object
+
+
+@dataclass
+class Schedule:
+    """Résultat d'une planification"""
+    slot_of: list                    # index du créneau par examen (-1 = non planifié)
+    rooms_of: list                   # [Placement] par examen (vide = pas de salle)
+    cost: int
+    statistics: dict = field(default_factory=dict)
+
+    def assignments(self, exams, slots):
+        """
+        Itérer sur (examen, créneau, Placement) pour les examens planifiés :
+        une fois par salle pour un groupe réparti, Placement None si aucune salle.
+        """
+        for exam in exams:
+            slot_index = self.slot_of[exam.key]
+            if slot_index < 0:
+                continue
+            placements = self.rooms_of[exam.key]
+            if not placements:
+                yield exam, slots[slot_index], None
+            for placement in placements:
+                yield exam, slots[slot_index], placement
+
+
+def build_slots(date_debut, date_fin, heures=DEFAULT_HEURES, duree_minutes=DEFAULT_DUREE, jours_exclus=()):
+    """
+    Construire la grille des créneaux entre date_debut et date_fin (incluses).
+    jours_exclus : numéros de jours de la semaine à ignorer (0 = lundi ... 6 = dimanche)
+    """
+    slots = []
+    day = 0
+    current = date_debut
+    while current <= date_fin:
+        if current.weekday() not in jours_exclus:
+            for heure in heures:
+                debut = datetime.strptime(heure, "%H:%M")
+                fin = debut + timedelta(minutes=duree_minutes)
+                slots.append(Slot(len(slots), day, current, debut.time(), fin.time()))
+            day += 1
+        current += timedelta(days=1)
+    return slots
+
+
+def build_group_adjacency(exams):
+    """Graphe de conflits minimal : deux examens d'un même groupe partagent tous leurs étudiants"""
+    adjacency = [set() for _ in exams]
+    par_groupe = {}
+    for exam in exams:
+        par_groupe.setdefault(exam.groupe_id, []).append(exam.key)
+    for keys in par_groupe.values():
+        for key in keys:
+            adjacency[key].update(keys)
+            adjacency[key].discard(key)
+    return adjacency
+
+
+class ExamScheduler:
+    """
+    Planificateur d'une session.
+    exams : liste d'ExamRequest dont les clés valent 0..n-1
+    adjacency : liste d'ensembles de clés en conflit (par défaut : même groupe)
+
+    Replanification partielle (les examens fixés ne font pas partie de `exams`) :
+    blocked : {clé: créneaux interdits} (créneaux des voisins fixés, créneau refusé)
+    occupied : {créneau: ids des salles prises par les examens fixés}
+    group_day : {(groupe_id, jour): nombre d'examens fixés} pour la pénalité même jour
+    preferred : {clé: créneau actuel}, gardé en priorité s'il reste possible
+    """
+
+    def __init__(self, exams, rooms, slots, adjacency=None, blocked=None, occupied=None, group_day=None,
+                 preferred=None):
+        self.exams = list(exams)
+        self.rooms = list(rooms)
+        self.slots = list(slots)
+        self.adjacency = adjacency if adjacency is not None else build_group_adjacency(self.exams)
+        self.blocked = blocked or {}
+        self.fixed_group_day = dict(group_day or {})
+        self.preferred = preferred or {}
+        occupied = occupied or {}
+        self.slot_rooms = [
+            [room for room in self.rooms if room.id not in occupied[slot.index]]
+            if occupied.get(slot.index) else self.rooms
+            for slot in self.slots
+        ]
+        self.slot_capacity = [len(rooms) for rooms in self.slot_rooms]
+        self.seat_capacity = [sum(room.capacite for room in rooms) for rooms in self.slot_rooms]
+
+    # ------------------------------------------------------------------
+    # API
+    # ------------------------------------------------------------------
+    def solve(self, seed=None, time_budget=2.0, progress=None, stop_event=None):
+        """
+        Construire puis améliorer une planification ; time_budget en secondes pour la recherche locale.
+        La recherche locale n'accepte que des améliorations : à tout instant la planification
+        courante est la meilleure trouvée (algorithme « anytime »).
+        progress : fonction appelée avec l'état courant (coût, examens non planifiés, temps écoulé)
+        stop_event : threading.Event ; levé, il arrête la recherche locale et la planification
+                     courante est retournée
+        """
+        start = time.perf_counter()
+        rng = random.Random(seed)
+        self._progress = progress
+        self._stop_event = stop_event
+        self._start = start
+        self._last_report = 0.0
+
+        self._reset()
+        self._construct(rng)
+        constructed_same_day = self._same_day_count()
+        self._report("construction", 0, force=True)
+        moves = self._improve(rng, start + time_budget)
+        schedule = self._build_schedule(start, constructed_same_day, moves)
+        schedule.statistics["stopped_early"] = self._stopped()
+        self._report("salles", moves, force=True, cost=schedule.cost)
+        return schedule
+
+    def _stopped(self):
+        return self._stop_event is not None and self._stop_event.is_set()
+
+    def _report(self, phase, moves, force=False, cost=None):
+        """
+        Publier l'état courant. Avant l'affectation des salles le coût est estimé
+        sans les dépassements de capacité ; le dernier rapport donne le coût exact.
+        """
+        if self._progress is None:
+            return
+        now = time.perf_counter()
+        if not force and now - self._last_report < PROGRESS_INTERVAL:
+            return
+        self._last_report = now
+        unscheduled = sum(1 for s in self.slot_of if s < 0)
+        same_day = self._same_day_count()
+        self._progress({
+            "phase": phase,
+            "cost": cost if cost is not None else unscheduled * PENALITE_NON_PLANIFIE + same_day * PENALITE_MEME_JOUR,
+            "unscheduled_exams": unscheduled,
+            "same_day_exams": same_day,
+            "moves": moves,
+            "solver_time": round(now - self._start, 2),
+        })
+
+    # ------------------------------------------------------------------
+    # Construction (DSatur)
+    # ------------------------------------------------------------------
+    def _reset(self):
+        n = len(self.exams)
+        self.slot_of = [-1] * n
+        self.slot_members = [set() for _ in self.slots]
+        self.slot_seats = [0] * len(self.slots)
+        self.group_day = dict(self.fixed_group_day)
+
+    def _construct(self, rng):
+        n = len(self.exams)
+        # créneau -> nombre de voisins placés (les créneaux interdits comptent d'emblée)
+        neighbour_slots = [dict.fromkeys(self.blocked.get(k, ()), 1) for k in range(n)]
+        saturation = [len(counts) for counts in neighbour_slots]
+        heap = [(-saturation[k], -len(self.adjacency[k]), rng.random(), k) for k in range(n)]
+        heapq.heapify(heap)
+        done = [False] * n
+
+        while heap:
+            neg_sat, _, _, key = heapq.heappop(heap)
+            if done[key] or -neg_sat != saturation[key]:
+                continue
+            done[key] = True
+
+            slot_index = self._best_slot(key, neighbour_slots[key], rng)
+            if slot_index < 0:
+                continue
+            self._place(key, slot_index)
+
+            for other in self.adjacency[key]:
+                if done[other]:
+                    continue
+                counts = neighbour_slots[other]
+                if slot_index not in counts:
+                    counts[slot_index] = 1
+                    saturation[other] += 1
+                    heapq.heappush(heap, (-saturation[other], -len(self.adjacency[other]), rng.random(), other))
+                else:
+                    counts[slot_index] += 1
+
+    def _best_slot(self, key, forbidden, rng):
+        """Créneau libre de conflits le moins coûteux (même jour pour le groupe, puis charge)"""
+        exam = self.exams[key]
+        preferred = self.preferred.get(key)
+        best = -1
+        best_score = None
+        for slot in self.slots:
+            if slot.index in forbidden or not self._fits(exam, slot.index):
+                continue
+            score = (
+                slot.index != preferred,
+                self.group_day.get((exam.groupe_id, slot.day), 0),
+                len(self.slot_members[slot.index]),
+                rng.random(),
+            )
+            if best_score is None or score < best_score:
+                best, best_score = slot.index, score
+        return best
+
+    # ------------------------------------------------------------------
+    # Recherche locale
+    # ------------------------------------------------------------------
+    def _improve(self, rng, deadline):
+        """Déplacer les examens pénalisés tant que le coût diminue et que le temps le permet"""
+        moves = 0
+        improved = True
+        while improved and time.perf_counter() < deadline and not self._stopped():
+            improved = False
+            candidats = [k for k in range(len(self.exams)) if self._exam_penalty(k) > 0]
+            rng.shuffle(candidats)
+            for key in candidats:
+                if time.perf_counter() >= deadline or self._stopped():
+                    break
+                if self._try_move(key):
+                    moves += 1
+                    improved = True
+                    self._report("recherche locale", moves)
+        return moves
+
+    def _exam_penalty(self, key):
+        slot_index = self.slot_of[key]
+        if slot_index < 0:
+            return PENALITE_NON_PLANIFIE
+        exam = self.exams[key]
+        return PENALITE_MEME_JOUR * (self.group_day[(exam.groupe_id, self.slots[slot_index].day)] - 1)
+
+    def _try_move(self, key):
+        exam = self.exams[key]
+        current = self.slot_of[key]
+        forbidden = {self.slot_of[other] for other in self.adjacency[key]}
+        forbidden.update(self.blocked.get(key, ()))
+
+        if current >= 0:
+            current_day = self.slots[current].day
+            current_cost = self.group_day[(exam.groupe_id, current_day)] - 1
+        else:
+            # Un examen non planifié accepte n'importe quel créneau réalisable
+            current_day = None
+            current_cost = float("inf")
+
+        best = None
+        best_cost = current_cost
+        for slot in self.slots:
+            if slot.index == current or slot.index in forbidden:
+                continue
+            if not self._fits(exam, slot.index):
+                continue
+            cost = self.group_day.get((exam.groupe_id, slot.day), 0)
+            if slot.day == current_day:
+                cost -= 1
+            if cost < best_cost:
+                best, best_cost = slot.index, cost
+
+        if best is None:
+            return False
+        if current >= 0:
+            self._unplace(key)
+        self._place(key, best)
+        return True
+
+    # ------------------------------------------------------------------
+    # État
+    # ------------------------------------------------------------------
+    def _fits(self, exam, slot_index):
+        """Une salle et assez de places libres dans le créneau (un groupe plus grand que tout passe seul)"""
+        members = self.slot_members[slot_index]
+        if len(members) >= self.slot_capacity[slot_index]:
+            return False
+        return not members or self.slot_seats[slot_index] + exam.effectif <= self.seat_capacity[slot_index]
+
+    def _place(self, key, slot_index):
+        exam = self.exams[key]
+        self.slot_of[key] = slot_index
+        self.slot_members[slot_index].add(key)
+        self.slot_seats[slot_index] += exam.effectif
+        day_key = (exam.groupe_id, self.slots[slot_index].day)
+        self.group_day[day_key] = self.group_day.get(day_key, 0) + 1
+
+    def _unplace(self, key):
+        exam = self.exams[key]
+        slot_index = self.slot_of[key]
+        self.slot_of[key] = -1
+        self.slot_members[slot_index].discard(key)
+        self.slot_seats[slot_index] -= exam.effectif
+        self.group_day[(exam.groupe_id, self.slots[slot_index].day)] -= 1
+
+    def _same_day_count(self):
+        return sum(c - 1 for c in self.group_day.values() if c > 1)
+
+    def _build_schedule(self, start, constructed_same_day, moves):
+        rooms_of = [[] for _ in self.exams]
+        depassements = places_manquantes = repartis = salles = 0
+        for slot_index, members in enumerate(self.slot_members):
+            if not members:
+                continue
+            allocation = allocate_rooms([self.exams[k] for k in members], self.slot_rooms[slot_index])
+            depassements += allocation.overflows
+            places_manquantes += allocation.missing_seats
+            repartis += allocation.split_exams
+            salles += allocation.rooms_used
+            for key, placements in allocation.rooms_of.items():
+                rooms_of[key] = placements
+
+        unscheduled = sum(1 for s in self.slot_of if s < 0)
+        # Planifiés mais sans salle (plus de salles libres dans le créneau)
+        sans_salle = sum(1 for key, s in enumerate(self.slot_of) if s >= 0 and not rooms_of[key])
+        same_day = self._same_day_count()
+        cost = (unscheduled * PENALITE_NON_PLANIFIE
+                + same_day * PENALITE_MEME_JOUR
+                + depassements * PENALITE_CAPACITE)
+
+        return Schedule(
+            slot_of=list(self.slot_of),
+            rooms_of=rooms_of,
+            cost=cost,
+            statistics={
+                "total_exams": len(self.exams),
+                "planned_exams": len(self.exams) - unscheduled,
+                "unscheduled_exams": unscheduled,
+                "exams_without_room": sans_salle,
+                "conflicts_resolved": constructed_same_day - same_day,
+                "same_day_exams": same_day,
+                "capacity_overflows": depassements,
+                "missing_seats": places_manquantes,
+                "split_exams": repartis,
+                "rooms_used": salles,
+                "slots_used": sum(1 for m in self.slot_members if m),
+                "local_search_moves": moves,
+                "cost": cost,
+                "execution_time": round(time.perf_counter() - start, 3),
+            },
+        )
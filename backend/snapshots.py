@@ -0,0 +1,323 @@
+# backend/snapshots.py - EMPLOIS DU TEMPS PUBLIÉS (INSTANTANÉS)
+"""
+À la publication d'une session, l'emploi du temps de chaque groupe et de
+chaque surveillant concerné est calculé une fois (INSERT ... SELECT json_agg)
+et stocké dans timetable_snapshots, clé primaire (owner_type, owner_id).
+
+Les pages étudiant et professeur lisent ensuite une seule ligne par clé
+primaire au lieu des jointures sur examens / surveillances / sessions.
+Un instantané couvre toutes les sessions publiées du groupe ou du professeur ;
+sa version (séquence timetable_version_seq) change à chaque publication.
+Le calendrier ICS est produit en même temps et stocké avec l'instantané :
+un téléchargement ne recalcule rien. Il est destiné aux étudiants et à l'API
+publique : il ne contient aucun champ de PRIVATE_FIELDS (emails des surveillants).
+"""
+from dataclasses import dataclass
+from datetime import date, time
+
+from psycopg2 import Error
+from psycopg2.extras import execute_values
+
+from .database import get_connection
+from .ics import owner_calendar
+
+GROUPE = "GROUPE"
+PROF = "PROF"
+
+# Statuts de session considérés comme publiés (vice-doyen / planification)
+SESSIONS_PUBLIEES = ("PUBLIE", "PUBLIEE")
+# Examens visibles par les étudiants et les surveillants
+EXAMENS_PUBLIES = ("CONFIRME", "VALIDE")
+# Champs de l'instantané absents du calendrier ICS et de l'API (données personnelles)
+PRIVATE_FIELDS = ("professeur_surveillant",)
+
+_GROUPE_SQL = """
+    INSERT INTO timetable_snapshots (owner_type, owner_id, version, payload)
+    SELECT %(type)s, e.groupe_id, %(version)s,
+           json_agg(json_build_object(
+               'id', e.id,
+               'session_id', e.session_id,
+               'session_nom', se.nom,
+               'module_nom', m.nom,
+               'formation_nom', f.nom,
+               'groupe_nom', g.nom,
+               'date_examen', e.date_examen,
+               'heure_debut', e.heure_debut,
+               'duree_minutes', e.duree_minutes,
+               'salle_nom', sa.nom,
+               'statut', e.statut,
+               'professeur_surveillant', (
+                   SELECT string_agg(u.email, ', ' ORDER BY u.email)
+                   FROM surveillances sv
+                   JOIN professeurs p ON sv.prof_id = p.id
+                   JOIN users u ON p.user_id = u.id
+                   WHERE sv.examen_id = e.id
+               )
+           ) ORDER BY e.date_examen, e.heure_debut, m.nom)
+    FROM examens e
+    JOIN sessions se ON e.session_id = se.id
+    JOIN modules m ON e.module_id = m.id
+    JOIN groupes g ON e.groupe_id = g.id
+    JOIN formations f ON g.formation_id = f.id
+    LEFT JOIN salles sa ON e.salle_id = sa.id
+    WHERE e.groupe_id = ANY(%(owners)s)
+    AND se.statut = ANY(%(sessions)s)
+    AND e.statut = ANY(%(examens)s)
+    GROUP BY e.groupe_id
+"""
+
+_PROF_SQL = """
+    INSERT INTO timetable_snapshots (owner_type, owner_id, version, payload)
+    SELECT %(type)s, sv.prof_id, %(version)s,
+           json_agg(json_build_object(
+               'id', sv.id,
+               'examen_id', e.id,
+               'session_id', e.session_id,
+               'session_nom', se.nom,
+               'date_surveillance', COALESCE(sv.date_surveillance, e.date_examen),
+               'heure_debut', COALESCE(sv.heure_debut, e.heure_debut),
+               'duree_minutes', e.duree_minutes,
+               'examen_statut', e.statut,
+               'module_nom', m.nom,
+               'formation_nom', f.nom,
+               'salle_nom', sa.nom,
+               'groupe_nom', g.nom,
+               'effectif', g.effectif
+           ) ORDER BY COALESCE(sv.date_surveillance, e.date_examen), COALESCE(sv.heure_debut, e.heure_debut))
+    FROM surveillances sv
+    JOIN examens e ON sv.examen_id = e.id
+    JOIN sessions se ON e.session_id = se.id
+    JOIN modules m ON e.module_id = m.id
+    LEFT JOIN formations f ON f.id = COALESCE(e.formation_id, m.formation_id)
+    LEFT JOIN salles sa ON e.salle_id = sa.id
+    LEFT JOIN groupes g ON e.groupe_id = g.id
+    WHERE sv.prof_id = ANY(%(owners)s)
+    AND se.statut = ANY(%(sessions)s)
+    AND e.statut = ANY(%(examens)s)
+    GROUP BY sv.prof_id
+"""
+
+
+
+@dataclass(frozen=True)
+class TimetableSnapshot:
+    """Emploi du temps publié d'un groupe ou d'un professeur"""
+    version: int
+    rows: list
+    ics: str = None   # calendrier généré à la publication
+
+
+# Champs JSON à reconvertir en date / heure pour les pages existantes
+_DATE_FIELDS = ("date_examen", "date_surveillance")
+_TIME_FIELDS = ("heure_debut",)
+
+
+def public_items(items):
+    """Lignes d'un instantané sans les champs personnels"""
+    return [{key: value for key, value in item.items() if key not in PRIVATE_FIELDS} for item in items]
+
+
+def _rebuild(cursor, owner_type, owners, version, query):
+    """Remplacer les instantanés des propriétaires donnés (ceux qui n'ont plus rien sont supprimés)"""
+    if not owners:
+        return 0
+    cursor.execute(
+        "DELETE FROM timetable_snapshots WHERE owner_type = %s AND owner_id = ANY(%s)",
+        (owner_type, owners)
+    )
+    cursor.execute(query, {
+        "type": owner_type,
+        "version": version,
+        "owners": owners,
+        "sessions": list(SESSIONS_PUBLIEES),
+        "examens": list(EXAMENS_PUBLIES),
+    })
+    return cursor.rowcount
+
+
+def _store_ics(cursor, owner_type, owners):
+    """Générer en une passe les calendriers ICS (sans champ personnel) des instantanés reconstruits"""
+    if not owners:
+        return
+    cursor.execute(
+        "SELECT owner_id, payload FROM timetable_snapshots WHERE owner_type = %s AND owner_id = ANY(%s)",
+        (owner_type, owners)
+    )
+    rows = [
+        (owner_calendar(owner_type, owner_id, public_items(_decode(entry) for entry in payload)),
+         owner_type, owner_id)
+        for owner_id, payload in cursor.fetchall()
+    ]
+    execute_values(cursor, """
+        UPDATE timetable_snapshots AS t SET ics = v.ics
+        FROM (VALUES %s) AS v(ics, owner_type, owner_id)
+        WHERE t.owner_type = v.owner_type AND t.owner_id = v.owner_id
+    """, rows, page_size=500)
+
+
+def publish_snapshots(cursor, session_id):
+    """
+    Recalculer les instantanés des groupes et surveillants d'une session.
+    À appeler dans la transaction qui publie la session (après la mise à jour de son statut).
+    Retourne {"version", "groupes", "professeurs"}.
+    """
+    cursor.execute("SELECT nextval('timetable_version_seq')")
+    version = cursor.fetchone()[0]
+
+    cursor.execute("""
+        SELECT array_agg(DISTINCT groupe_id) FILTER (WHERE groupe_id IS NOT NULL)
+        FROM examens WHERE session_id = %s
+    """, (session_id,))
+    groupes = cursor.fetchone()[0] or []
+
+    # Surveillants actuels de la session, et ceux dont l'instantané la cite encore
+    # (surveillance retirée par une réaffectation : l'instantané doit être recalculé ou supprimé)
+    cursor.execute("""
+        SELECT array_agg(DISTINCT prof_id) FROM (
+            SELECT sv.prof_id
+            FROM surveillances sv
+            JOIN examens e ON sv.examen_id = e.id
+            WHERE e.session_id = %(session)s
+            UNION
+            SELECT owner_id
+            FROM timetable_snapshots
+            WHERE owner_type = %(type)s
+            AND payload @> jsonb_build_array(jsonb_build_object('session_id', %(session)s::int))
+        ) AS owners(prof_id)
+    """, {"session": session_id, "type": PROF})
+    professeurs = cursor.fetchone()[0] or []
+
+    result = {
+        "version": version,
+        "groupes": _rebuild(cursor, GROUPE, groupes, version, _GROUPE_SQL),
+        "professeurs": _rebuild(cursor, PROF, professeurs, version, _PROF_SQL),
+    }
+    _store_ics(cursor, GROUPE, groupes)
+    _store_ics(cursor, PROF, professeurs)
+    return result
+
+
+def safe_publish_snapshots(cursor, session_id):
+    """
+    publish_snapshots() dans un SAVEPOINT : si les instantanés ne peuvent pas être
+    calculés (migration non appliquée...), la publication n'est pas bloquée et les
+    pages retombent sur les requêtes directes.
+    """
+    cursor.execute("SAVEPOINT timetable_snapshots")
+    try:
+        result = publish_snapshots(cursor, session_id)
+        cursor.execute("RELEASE SAVEPOINT timetable_snapshots")
+        return result
+    except Error as e:
+        cursor.execute("ROLLBACK TO SAVEPOINT timetable_snapshots")
+        print(f"❌ Erreur de calcul des emplois du temps publiés: {e}")
+        return None
+
+
+def refresh_published_snapshots(cursor, session_ids):
+    """
+    Recalculer les instantanés de celles des sessions données qui sont publiées.
+    À appeler avant le commit de toute écriture sur leurs examens ou surveillances.
+    """
+    cursor.execute(
+        "SELECT id FROM sessions WHERE id = ANY(%s) AND statut = ANY(%s)",
+        (list(session_ids), list(SESSIONS_PUBLIEES))
+    )
+    for row in cursor.fetchall():
+        safe_publish_snapshots(cursor, row[0])
+
+
+def _decode(entry):
+    for field in _DATE_FIELDS:
+        if entry.get(field):
+            entry[field] = date.fromisoformat(entry[field])
+    for field in _TIME_FIELDS:
+        if entry.get(field):
+            entry[field] = time.fromisoformat(entry[field])
+    return entry
+
+
+def load_snapshot(owner_type, owner_id):
+    """
+    Emploi du temps publié d'un groupe ou d'un professeur et son calendrier ICS
+    (une lecture par clé primaire). Retourne un TimetableSnapshot ou None.
+    """
+    if owner_id is None:
+        return None
+    conn = get_connection()
+    if conn is None:
+        return None
+    try:
+        cursor = conn.cursor()
+        cursor.execute(
+            "SELECT version, payload, ics FROM timetable_snapshots WHERE owner_type = %s AND owner_id = %s",
+            (owner_type, owner_id)
+        )
+        row = cursor.fetchone()
+        cursor.close()
+    except Error as e:
+        print(f"❌ Erreur de lecture de l'emploi du temps publié: {e}")
+        return None
+    finally:
+        conn.close()
+
+    if row is None:
+        return None
+    version, payload, ics = row
+    return TimetableSnapshot(version, [_decode(entry) for entry in payload], ics)
+
+
+def snapshot_version(owner_type, owner_id):
+    """Version de l'instantané (sans transférer son contenu) ; None s'il n'existe pas"""
+    conn = get_connection()
+    if conn is None:
+        return None
+    try:
+        cursor = conn.cursor()
+        cursor.execute(
+            "SELECT version FROM timetable_snapshots WHERE owner_type = %s AND owner_id = %s",
+            (owner_type, owner_id)
+        )
+        row = cursor.fetchone()
+        cursor.close()
+        return row[0] if row else None
+    except Error as e:
+        print(f"❌ Erreur de lecture de l'emploi du temps publié: {e}")
+        return None
+    finally:
+        conn.close()
+
+
+def load_ics(owner_type, owner_id):
+    """Calendrier ICS stocké à la publication : (version, texte) ou None"""
+    if owner_id is None:
+        return None
+    conn = get_connection()
+    if conn is None:
+        return None
+    try:
+        cursor = conn.cursor()
+        cursor.execute(
+            "SELECT version, ics FROM timetable_snapshots WHERE owner_type = %s AND owner_id = %s",
+            (owner_type, owner_id)
+        )
+        row = cursor.fetchone()
+        cursor.close()
+    except Error as e:
+        print(f"❌ Erreur de lecture du calendrier publié: {e}")
+        return None
+    finally:
+        conn.close()
+    if row is None or row[1] is None:
+        return None
+    return row[0], row[1]
+
+
+def load_group_timetable(groupe_id):
+    """Examens publiés d'un groupe : TimetableSnapshot ou None"""
+    return load_snapshot(GROUPE, groupe_id)
+
+
+def load_prof_timetable(prof_id):
+    """Surveillances publiées d'un professeur : TimetableSnapshot ou None"""
+    return load_snapshot(PROF, prof_id)
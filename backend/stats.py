@@ -0,0 +1,213 @@
+# backend/stats.py - STATISTIQUES DES EXAMENS (VUE MATÉRIALISÉE)
+"""
+Statistiques par session, département, formation et statut.
+
+La vue matérialisée mv_examens_stats contient une ligne par
+(session, département, formation, statut) avec le nombre d'examens : elle
+reste petite quelle que soit la taille de la table examens. Un examen est une
+épreuve (module, groupe) : un groupe réparti sur plusieurs salles compte une fois. Les tableaux de
+bord lisent cette vue au lieu d'agréger examens à chaque affichage.
+
+refresh_stats() doit être appelé après chaque changement de statut des
+examens (génération, validation du chef, validation finale, publication).
+Depuis un clic de l'interface, request_refresh() fait le calcul en arrière-plan
+et regroupe les clics rapprochés en un seul REFRESH.
+"""
+import threading
+import time
+
+from psycopg2 import Error
+
+from . import database
+from .database import get_connection
+
+VIEW_NAME = "mv_examens_stats"
+
+CREATE_VIEW_SQL = f"""
+    CREATE MATERIALIZED VIEW IF NOT EXISTS {VIEW_NAME} AS
+    SELECT COALESCE(e.session_id, 0) AS session_id,
+           COALESCE(f.departement_id, 0) AS departement_id,
+           f.id AS formation_id,
+           e.statut,
+           -- Une ligne par salle pour un groupe réparti : compter les épreuves (module, groupe)
+           COUNT(DISTINCT (e.module_id, COALESCE(e.groupe_id, -e.id))) AS nb_examens
+    FROM examens e
+    JOIN modules m ON e.module_id = m.id
+    JOIN formations f ON f.id = COALESCE(e.formation_id, m.formation_id)
+    GROUP BY 1, 2, 3, 4
+"""
+
+# Index unique requis par REFRESH MATERIALIZED VIEW CONCURRENTLY
+CREATE_INDEX_SQL = f"""
+    CREATE UNIQUE INDEX IF NOT EXISTS {VIEW_NAME}_pk
+    ON {VIEW_NAME} (session_id, departement_id, formation_id, statut)
+"""
+
+# Délai (secondes) pendant lequel les demandes de rafraîchissement sont regroupées
+REFRESH_DELAY = 2.0
+
+_ready = False
+_ready_lock = threading.Lock()
+
+_refresh_lock = threading.Lock()
+_refresh_thread = None
+_refresh_pending = False
+
+
+def ensure_stats_view(cursor):
+    """Créer la vue matérialisée et son index si nécessaire"""
+    cursor.execute(CREATE_VIEW_SQL)
+    cursor.execute(CREATE_INDEX_SQL)
+
+
+def ensure_ready():
+    """Créer la vue au premier usage dans le processus ; retourne False si la base est indisponible"""
+    global _ready
+    if _ready:
+        return True
+    with _ready_lock:
+        if _ready:
+            return True
+        conn = get_connection()
+        if conn is None:
+            return False
+        try:
+            cursor = conn.cursor()
+            ensure_stats_view(cursor)
+            conn.commit()
+            cursor.close()
+            _ready = True
+        except Error as e:
+            conn.rollback()
+            print(f"❌ Erreur de création de {VIEW_NAME}: {e}")
+        finally:
+            conn.close()
+    return _ready
+
+
+def refresh_stats():
+    """
+    Recalculer la vue après un changement de statut des examens.
+    CONCURRENTLY : les lectures des tableaux de bord ne sont pas bloquées pendant le calcul.
+    """
+    if not ensure_ready():
+        return False
+    conn = get_connection()
+    if conn is None:
+        return False
+    try:
+        conn.autocommit = True
+        cursor = conn.cursor()
+        cursor.execute(f"REFRESH MATERIALIZED VIEW CONCURRENTLY {VIEW_NAME}")
+        cursor.close()
+        return True
+    except Error as e:
+        print(f"❌ Erreur de rafraîchissement des statistiques: {e}")
+        return False
+    finally:
+        conn.close()
+
+
+def request_refresh(delay=REFRESH_DELAY):
+    """
+    Rafraîchir la vue en arrière-plan, sans bloquer la page.
+    Un seul thread : une demande reçue pendant le calcul en relance un après lui.
+    """
+    global _refresh_thread, _refresh_pending
+    with _refresh_lock:
+        _refresh_pending = True
+        if _refresh_thread is not None:
+            return
+        _refresh_thread = threading.Thread(target=_refresh_worker, args=(delay,),
+                                           name="stats-refresh", daemon=True)
+        _refresh_thread.start()
+
+
+def _refresh_worker(delay):
+    global _refresh_thread, _refresh_pending
+    while True:
+        time.sleep(delay)
+        with _refresh_lock:
+            if not _refresh_pending:
+                _refresh_thread = None
+                return
+            _refresh_pending = False
+        refresh_stats()
+
+
+def _fetch_all(query, params=None):
+    """Lecture via la couche d'accès aux données, après création éventuelle de la vue"""
+    if not ensure_ready():
+        return []
+    return database._fetch_all(query, params)
+
+
+# Colonnes de répartition par statut communes aux requêtes ci-dessous
+_STATUTS_SQL = """
+    COALESCE(SUM(v.nb_examens), 0)::bigint AS total_examens,
+    COALESCE(SUM(v.nb_examens) FILTER (WHERE v.statut = 'VALIDE'), 0)::bigint AS valides,
+    COALESCE(SUM(v.nb_examens) FILTER (WHERE v.statut = 'CONFIRME'), 0)::bigint AS confirmes,
+    COALESCE(SUM(v.nb_examens) FILTER (WHERE v.statut = 'EN_ATTENTE'), 0)::bigint AS en_attente,
+    COALESCE(SUM(v.nb_examens) FILTER (WHERE v.statut = 'REFUSE'), 0)::bigint AS refuses
+"""
+
+
+def fetch_totaux():
+    """Nombre de départements, formations, groupes, professeurs et examens (une requête)"""
+    rows = _fetch_all(f"""
+        SELECT (SELECT COUNT(*) FROM departements) AS departements,
+               (SELECT COUNT(*) FROM formations) AS formations,
+               (SELECT COUNT(*) FROM groupes) AS groupes,
+               (SELECT COUNT(*) FROM professeurs) AS professeurs,
+               (SELECT COALESCE(SUM(nb_examens), 0)::bigint FROM {VIEW_NAME}) AS examens
+    """)
+    return rows[0] if rows else None
+
+
+def fetch_stats_departements():
+    """Répartition des examens par statut pour chaque département"""
+    return _fetch_all(f"""
+        SELECT d.nom AS departement, {_STATUTS_SQL}
+        FROM departements d
+        LEFT JOIN {VIEW_NAME} v ON v.departement_id = d.id
+        GROUP BY d.id, d.nom
+        ORDER BY d.nom
+    """)
+
+
+def fetch_stats_formations(departement_id=None):
+    """Répartition des examens par statut pour chaque formation (d'un département ou de toutes)"""
+    return _fetch_all(f"""
+        SELECT f.id AS formation_id, f.nom AS formation, {_STATUTS_SQL}
+        FROM formations f
+        LEFT JOIN {VIEW_NAME} v ON v.formation_id = f.id
+        WHERE %s IS NULL OR f.departement_id = %s
+        GROUP BY f.id, f.nom
+        ORDER BY f.nom
+    """, (departement_id, departement_id))
+
+
+def fetch_stats_sessions(limit=10):
+    """Dernières sessions avec leur répartition des examens par statut"""
+    return _fetch_all(f"""
+        SELECT s.id, s.nom, s.date_debut, s.date_fin, s.statut,
+               {_STATUTS_SQL}
+        FROM sessions s
+        LEFT JOIN {VIEW_NAME} v ON v.session_id = s.id
+        GROUP BY s.id, s.nom, s.date_debut, s.date_fin, s.statut
+        ORDER BY s.date_debut DESC
+        LIMIT %s
+    """, (limit,))
+
+
+def fetch_distribution_statuts(departement_id=None, session_id=None):
+    """Nombre et pourcentage d'examens par statut"""
+    return _fetch_all(f"""
+        SELECT statut, SUM(nb_examens)::bigint AS nombre,
+               ROUND(SUM(nb_examens) * 100.0 / NULLIF(SUM(SUM(nb_examens)) OVER (), 0), 1) AS pourcentage
+        FROM {VIEW_NAME}
+        WHERE (%s IS NULL OR departement_id = %s)
+        AND (%s IS NULL OR session_id = %s)
+        GROUP BY statut
+        ORDER BY nombre DESC
+    """, (departement_id, departement_id, session_id, session_id))
@@ -0,0 +1,295 @@
+# backend/timetable_api.py - API HTTP DES EMPLOIS DU TEMPS PUBLIÉS
+"""
+Service HTTP asynchrone en lecture seule, indépendant de Streamlit :
+
+    GET /groupes/<id>.json        GET /groupes/<id>.ics
+    GET /professeurs/<id>.json    GET /professeurs/<id>.ics
+    GET /health
+
+Les données viennent de backend.snapshots (une lecture par clé primaire).
+L'ETag dépend de la version de l'instantané : un client qui renvoie
+If-None-Match reçoit 304 sans corps tant que la session n'est pas republiée.
+
+Les identifiants sont séquentiels : les réponses ne contiennent aucune donnée
+personnelle (emails des surveillants retirés), le serveur écoute par défaut sur
+127.0.0.1, et un jeton (--token ou TIMETABLE_API_TOKEN) peut être exigé
+(en-tête Authorization: Bearer <jeton>) avant de l'exposer sur le réseau.
+
+    python -m backend.timetable_api --port 8080
+"""
+import argparse
+import asyncio
+import hmac
+import json
+import os
+import re
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import formatdate
+
+from . import snapshots
+from .ics import owner_calendar
+
+# Durée (secondes) pendant laquelle la version d'un instantané est réutilisée sans requête
+VERSION_TTL = 5
+# Cache-Control envoyé aux clients et aux proxys
+MAX_AGE = 60
+# Corps déjà rendus gardés en mémoire (clé : propriétaire, version, format)
+CACHE_SIZE = 4096
+# Fermeture des connexions keep-alive inactives (secondes)
+IDLE_TIMEOUT = 15
+MAX_HEADER_BYTES = 16 * 1024
+# Corps de requête lus puis ignorés (une requête GET n'en a normalement pas)
+MAX_BODY_BYTES = 64 * 1024
+TOKEN_ENV = "TIMETABLE_API_TOKEN"
+
+_ROUTE = re.compile(r"^/(groupes|professeurs)/(\d+)(?:\.(json|ics))?/?$")
+_OWNERS = {"groupes": snapshots.GROUPE, "professeurs": snapshots.PROF}
+_CONTENT_TYPES = {
+    "json": "application/json; charset=utf-8",
+    "ics": "text/calendar; charset=utf-8",
+}
+_REASONS = {
+    200: "OK", 304: "Not Modified", 400: "Bad Request", 401: "Unauthorized", 404: "Not Found",
+    405: "Method Not Allowed", 413: "Payload Too Large", 500: "Internal Server Error",
+    503: "Service Unavailable",
+}
+
+
+def make_etag(owner_type, owner_id, version, fmt):
+    return f'"{owner_type.lower()}-{owner_id}-v{version}-{fmt}"'
+
+
+def etag_matches(header, etag):
+    """If-None-Match : liste d'ETags (faibles ou forts) ou *"""
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    candidates = [tag.strip() for tag in header.split(",")]
+    return any(tag.removeprefix("W/") == etag for tag in candidates)
+
+
+def render_body(owner_type, owner_id, version, items, fmt):
+    """Corps JSON ou ICS d'un emploi du temps"""
+    if fmt == "ics":
+        return owner_calendar(owner_type, owner_id, items).encode("utf-8")
+    document = {
+        "owner_type": owner_type,
+        "owner_id": owner_id,
+        "version": version,
+        "items": items,
+    }
+    return json.dumps(document, ensure_ascii=False, default=str).encode("utf-8")
+
+
+class TimetableService:
+    """Résolution des requêtes (indépendante du transport HTTP)"""
+
+    def __init__(self, max_workers=8, version_ttl=VERSION_TTL, cache_size=CACHE_SIZE, token=None):
+        # psycopg2 est bloquant : les lectures passent par un pool de threads
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="timetable-db")
+        self.token = token
+        self.version_ttl = version_ttl
+        self.cache_size = cache_size
+        self._versions = OrderedDict()  # (type, id) -> (version, instant de lecture) (LRU)
+        self._bodies = OrderedDict()    # (type, id, version, format) -> octets (LRU)
+
+    async def _run(self, func, *args):
+        return await asyncio.get_running_loop().run_in_executor(self.executor, func, *args)
+
+    async def version(self, owner_type, owner_id):
+        key = (owner_type, owner_id)
+        cached = self._versions.get(key)
+        now = time.monotonic()
+        if cached and now - cached[1] < self.version_ttl:
+            return cached[0]
+        version = await self._run(snapshots.snapshot_version, owner_type, owner_id)
+        self._remember_version(key, version, now)
+        return version
+
+    def _remember_version(self, key, version, now):
+        """Même borne que les corps : les propriétaires les moins récemment lus sont oubliés"""
+        self._versions[key] = (version, now)
+        self._versions.move_to_end(key)
+        while len(self._versions) > self.cache_size:
+            self._versions.popitem(last=False)
+
+    async def body(self, owner_type, owner_id, version, fmt):
+        key = (owner_type, owner_id, version, fmt)
+        body = self._bodies.get(key)
+        if body is not None:
+            self._bodies.move_to_end(key)
+            return body
+
+        stored = None
+        if fmt == "ics":
+            # Calendrier généré à la publication, sans champ personnel : servi tel quel
+            stored = await self._run(snapshots.load_ics, owner_type, owner_id)
+        if stored is not None:
+            version, body = stored[0], stored[1].encode("utf-8")
+        else:
+            snapshot = await self._run(snapshots.load_snapshot, owner_type, owner_id)
+            if snapshot is None:
+                return None
+            version = snapshot.version
+            body = render_body(owner_type, owner_id, version, snapshots.public_items(snapshot.rows), fmt)
+        # L'instantané a pu être republié entre-temps : indexer par sa version réelle
+        self._remember_version((owner_type, owner_id), version, time.monotonic())
+        self._bodies[(owner_type, owner_id, version, fmt)] = body
+        while len(self._bodies) > self.cache_size:
+            self._bodies.popitem(last=False)
+        return body
+
+    def authorized(self, headers):
+        if not self.token:
+            return True
+        return hmac.compare_digest(headers.get("authorization", ""), f"Bearer {self.token}")
+
+    async def handle(self, method, path, headers):
+        """Retourne (statut, en-têtes, corps)"""
+        if method not in ("GET", "HEAD"):
+            return 405, {"Allow": "GET, HEAD"}, b""
+        path = path.split("?", 1)[0]
+        if path == "/health":
+            return 200, {"Content-Type": "text/plain; charset=utf-8"}, b"ok"
+        if not self.authorized(headers):
+            return 401, {"WWW-Authenticate": "Bearer"}, b""
+
+        match = _ROUTE.match(path)
+        if not match:
+            return 404, {"Content-Type": "text/plain; charset=utf-8"}, b"not found"
+        owner_type = _OWNERS[match.group(1)]
+        owner_id = int(match.group(2))
+        fmt = match.group(3) or "json"
+
+        version = await self.version(owner_type, owner_id)
+        if version is None:
+            return 404, {"Content-Type": "text/plain; charset=utf-8"}, b"no published timetable"
+
+        etag = make_etag(owner_type, owner_id, version, fmt)
+        cache_headers = {"ETag": etag, "Cache-Control": f"public, max-age={MAX_AGE}"}
+        if etag_matches(headers.get("if-none-match"), etag):
+            return 304, cache_headers, b""
+
+        body = await self.body(owner_type, owner_id, version, fmt)
+        if body is None:
+            return 404, {"Content-Type": "text/plain; charset=utf-8"}, b"no published timetable"
+        version = self._versions[(owner_type, owner_id)][0]
+        cache_headers["ETag"] = make_etag(owner_type, owner_id, version, fmt)
+        return 200, {"Content-Type": _CONTENT_TYPES[fmt], **cache_headers}, body
+
+
+async def _read_request(reader):
+    """(méthode, chemin, version HTTP, en-têtes) ou None en fin de connexion"""
+    try:
+        raw = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), IDLE_TIMEOUT)
+    except (asyncio.IncompleteReadError, asyncio.TimeoutError, ConnectionError):
+        return None
+    except asyncio.LimitOverrunError:
+        raise ValueError("en-têtes trop longs")
+
+    lines = raw.decode("latin-1").split("\r\n")
+    parts = lines[0].split()
+    if len(parts) != 3:
+        raise ValueError("ligne de requête invalide")
+    headers = {}
+    for line in lines[1:]:
+        if ":" in line:
+            name, value = line.split(":", 1)
+            headers[name.strip().lower()] = value.strip()
+    return parts[0].upper(), parts[1], parts[2], headers
+
+
+async def _discard_body(reader, headers):
+    """
+    Lire et ignorer le corps d'une requête, pour que la requête suivante de la
+    connexion keep-alive commence au bon endroit. Retourne un statut d'erreur
+    (la connexion est alors fermée) ou None.
+    """
+    if "transfer-encoding" in headers:
+        return 400
+    length = headers.get("content-length", "0")
+    if not length.isdigit():
+        return 400
+    length = int(length)
+    if length > MAX_BODY_BYTES:
+        return 413
+    if length:
+        try:
+            await asyncio.wait_for(reader.readexactly(length), IDLE_TIMEOUT)
+        except (asyncio.IncompleteReadError, asyncio.TimeoutError):
+            return 400
+    return None
+
+
+def _response(status, headers, body, method, keep_alive):
+    lines = [f"HTTP/1.1 {status} {_REASONS.get(status, '')}",
+             f"Date: {formatdate(usegmt=True)}",
+             f"Content-Length: {len(body)}",
+             f"Connection: {'keep-alive' if keep_alive else 'close'}"]
+    lines += [f"{name}: {value}" for name, value in headers.items()]
+    head = ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+    return head if method == "HEAD" or status == 304 else head + body
+
+
+async def serve(host="127.0.0.1", port=8080, service=None):
+    """Démarrer le serveur et le faire tourner indéfiniment"""
+    service = service or TimetableService()
+
+    async def client(reader, writer):
+        try:
+            while True:
+                try:
+                    request = await _read_request(reader)
+                except ValueError:
+                    writer.write(_response(400, {}, b"", "GET", False))
+                    break
+                if request is None:
+                    break
+                method, path, http_version, headers = request
+                error = await _discard_body(reader, headers)
+                if error:
+                    writer.write(_response(error, {}, b"", "GET", False))
+                    break
+                keep_alive = (http_version == "HTTP/1.1"
+                              and headers.get("connection", "").lower() != "close")
+                try:
+                    status, response_headers, body = await service.handle(method, path, headers)
+                except Exception as e:
+                    print(f"❌ Erreur de l'API emplois du temps: {e}")
+                    status, response_headers, body = 500, {}, b""
+                writer.write(_response(status, response_headers, body, method, keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    server = await asyncio.start_server(client, host, port, limit=MAX_HEADER_BYTES)
+    print(f"📅 API emplois du temps sur http://{host}:{port}")
+    async with server:
+        await server.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="API HTTP des emplois du temps publiés")
+    parser.add_argument("--host", default="127.0.0.1",
+                        help="Adresse d'écoute (0.0.0.0 : tout le réseau, de préférence avec --token)")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--workers", type=int, default=8, help="Threads de lecture PostgreSQL")
+    parser.add_argument("--token", default=os.getenv(TOKEN_ENV),
+                        help=f"Jeton exigé des clients (par défaut ${TOKEN_ENV})")
+    args = parser.parse_args(argv)
+    service = TimetableService(max_workers=args.workers, token=args.token)
+    try:
+        asyncio.run(serve(args.host, args.port, service))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+# backend/validation.py - DONNÉES DE LA VALIDATION FINALE (VICE-DOYEN)
+"""
+Données de la page de validation finale, regroupées et formatées côté SQL.
+
+- fetch_validation_summary() : compteurs par statut à chaque niveau
+  (session, département, formation, groupe) en une requête GROUP BY ROLLUP ;
+  seules les lignes agrégées sont transférées.
+- fetch_validation_details() : examens d'un seul département, dates ISO et
+  heures déjà formatées, surveillants concaténés (une ligne par examen).
+- fetch_examens_par_statut() : liste courte des examens en attente / refusés.
+"""
+from . import database
+
+_SUMMARY_SQL = """
+    SELECT GROUPING(d.id, f.id, g.id) AS niveau,
+           d.id AS departement_id, d.nom AS departement_nom,
+           f.id AS formation_id, f.nom AS formation_nom,
+           g.id AS groupe_id, COALESCE(g.nom, 'Sans groupe') AS groupe_nom,
+           g.effectif AS groupe_effectif,
+           COUNT(*) AS nb_examens,
+           COUNT(*) FILTER (WHERE e.statut = 'CONFIRME') AS nb_confirmes,
+           COUNT(*) FILTER (WHERE e.statut = 'EN_ATTENTE') AS nb_en_attente,
+           COUNT(*) FILTER (WHERE e.statut = 'REFUSE') AS nb_refuses,
+           COUNT(*) FILTER (WHERE e.statut = 'VALIDE') AS nb_valides
+    FROM examens e
+    JOIN formations f ON e.formation_id = f.id
+    JOIN departements d ON f.departement_id = d.id
+    LEFT JOIN groupes g ON e.groupe_id = g.id
+    WHERE e.session_id = %s
+    GROUP BY ROLLUP ((d.id, d.nom), (f.id, f.nom), (g.id, g.nom, g.effectif))
+    ORDER BY GROUPING(d.id) DESC, d.nom, d.id,
+             GROUPING(f.id) DESC, f.nom, f.id,
+             GROUPING(g.id) DESC, g.nom NULLS LAST, g.id
+"""
+
+# Valeurs de GROUPING(d.id, f.id, g.id) : bit à 1 = colonne agrégée
+NIVEAU_GROUPE, NIVEAU_FORMATION, NIVEAU_DEPARTEMENT, NIVEAU_TOTAL = 0, 1, 3, 7
+
+_DETAILS_SQL = """
+    SELECT f.id AS formation_id, f.nom AS formation_nom,
+           e.groupe_id, COALESCE(g.nom, 'Sans groupe') AS groupe_nom,
+           m.nom AS module_nom,
+           to_char(e.date_examen, 'YYYY-MM-DD') AS date_examen,
+           COALESCE(to_char(e.heure_debut, 'HH24:MI'), '') AS heure_debut,
+           COALESCE(e.duree_minutes || ' min', 'N/A') AS duree,
+           COALESCE(s.nom, 'Non assignée') AS salle_nom,
+           COALESCE((
+               SELECT string_agg(u.email, ', ' ORDER BY u.email)
+               FROM surveillances sv
+               JOIN professeurs p ON sv.prof_id = p.id
+               JOIN users u ON p.user_id = u.id
+               WHERE sv.examen_id = e.id
+           ), 'Non assigné') AS surveillants,
+           e.statut
+    FROM examens e
+    JOIN modules m ON e.module_id = m.id
+    JOIN formations f ON e.formation_id = f.id
+    LEFT JOIN groupes g ON e.groupe_id = g.id
+    LEFT JOIN salles s ON e.salle_id = s.id
+    WHERE e.session_id = %s
+    AND f.departement_id = %s
+    ORDER BY f.nom, g.nom NULLS LAST, e.date_examen, e.heure_debut
+"""
+
+_PAR_STATUT_SQL = """
+    SELECT d.nom AS departement_nom, f.nom AS formation_nom,
+           COALESCE(g.nom, 'Sans groupe') AS groupe_nom, m.nom AS module_nom
+    FROM examens e
+    JOIN modules m ON e.module_id = m.id
+    JOIN formations f ON e.formation_id = f.id
+    JOIN departements d ON f.departement_id = d.id
+    LEFT JOIN groupes g ON e.groupe_id = g.id
+    WHERE e.session_id = %s
+    AND e.statut = %s
+    ORDER BY d.nom, f.nom, g.nom, m.nom
+"""
+
+
+def fetch_validation_summary(session_id):
+    """
+    Compteurs de la session sous forme d'arbre :
+    {"total": ligne, "departements": [{"ligne", "formations": [{"ligne", "groupes": [lignes]}]}]}
+    Retourne None si la session n'a aucun examen.
+    """
+    rows = database._fetch_all(_SUMMARY_SQL, (session_id,))
+    # ROLLUP renvoie toujours la ligne de total (en premier), même sans aucun examen
+    if not rows or rows[0]['nb_examens'] == 0:
+        return None
+
+    summary = {"total": None, "departements": []}
+    for row in rows:
+        if row['niveau'] == NIVEAU_TOTAL:
+            summary["total"] = row
+        elif row['niveau'] == NIVEAU_DEPARTEMENT:
+            summary["departements"].append({"ligne": row, "formations": []})
+        elif row['niveau'] == NIVEAU_FORMATION:
+            summary["departements"][-1]["formations"].append({"ligne": row, "groupes": []})
+        else:
+            summary["departements"][-1]["formations"][-1]["groupes"].append(row)
+    return summary
+
+
+def fetch_validation_details(session_id, departement_id):
+    """Examens d'un département pour la session, prêts à afficher"""
+    return database._fetch_all(_DETAILS_SQL, (session_id, departement_id))
+
+
+def fetch_examens_par_statut(session_id, statut):
+    """Examens de la session ayant un statut donné (département, formation, groupe, module)"""
+    return database._fetch_all(_PAR_STATUT_SQL, (session_id, statut))
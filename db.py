@@ -1,55 +1,12 @@
 # db.py - Version améliorée
-import psycopg2
 import os
-from dotenv import load_dotenv
 import sys
 
-# Charger les variables d'environnement
-load_dotenv()
+# Le pool de connexions est défini dans backend.database : on le partage ici
+# pour ne jamais ouvrir de connexion en dehors du pool
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-def get_connection():
-    """Établir la connexion à Neon PostgreSQL"""
-    try:
-        # Récupérer l'URL depuis les variables d'environnement
-        database_url = os.getenv("DATABASE_URL")
-        
-        if not database_url:
-            print("❌ ERREUR: DATABASE_URL non configuré dans .env")
-            return None
-        
-        # Nettoyer l'URL (enlever les espaces)
-        database_url = database_url.strip()
-        
-        print(f"🔗 Connexion à Neon...")
-        print(f"URL: {database_url[:50]}...")
-        
-        # Pour Neon, on utilise directement l'URL
-        # Le paramètre sslmode est déjà dans l'URL (?sslmode=require)
-        conn = psycopg2.connect(database_url)
-        
-        # Tester la connexion
-        cursor = conn.cursor()
-        cursor.execute("SELECT 1")
-        cursor.close()
-        
-        print("✅ Connexion à Neon PostgreSQL établie avec succès!")
-        return conn
-        
-    except Exception as e:
-        print(f"❌ Erreur de connexion PostgreSQL: {e}")
-        
-        # Afficher des informations détaillées
-        if hasattr(e, 'pgerror'):
-            print(f"   Détails: {e.pgerror}")
-        
-        # Suggestions de dépannage
-        print("\n🔧 Suggestions de dépannage:")
-        print("1. Vérifiez votre connexion Internet")
-        print("2. Vérifiez que l'URL Neon est correcte")
-        print("3. Vérifiez que votre projet Neon est actif")
-        print("4. Essayez sans &channel_binding=require")
-        
-        return None
+from backend.database import get_connection, get_pool
 
 # Fonction utilitaire pour tester la connexion
 def test_connection():
@@ -84,6 +41,7 @@ def test_connection():
             cursor.close()
             conn.close()
             
+            print(f"\n🔁 Pool: {get_pool().stats()}")
             return True
             
         except Exception as e:
@@ -4,19 +4,28 @@ import pandas as pd
 from datetime import datetime, timedelta
 import sys
 import os
+import time
 
 project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.insert(0, project_root)
 
 try:
     from backend.database import (
-        get_connection, fetch_formations, fetch_salles, fetch_professeurs,
-        fetch_etudiants, fetch_all_users, fetch_examens,
-        create_session, fetch_sessions, fetch_examens_by_session,
-        fetch_examens_by_session_grouped, create_user,
+        get_connection, RowCursor, fetch_formations,
+        fetch_salles_page, fetch_professeurs_page, fetch_etudiants_page, fetch_groupes_page,
+        fetch_list_totals,
+        fetch_departements, fetch_groupe_options, fetch_modules,
+        fetch_sessions, fetch_examens_by_session_grouped, fetch_overview_stats, create_user,
         verify_password_strength
     )
-    from backend.algorithm_simple import SimplePlanningGenerator, create_session_and_generate_exams, planify_session_exams
+    from backend.cache import invalidate
+    from backend.export import available_formats, export_session
+    from backend.invigilation import generate_surveillances
+    from backend.algorithm_simple import (
+        create_session_and_generate_exams, planify_session_exams, confirm_and_publish_session,
+        TIME_BUDGET
+    )
+    from backend.jobs import start_job, get_job, stop_job, EN_COURS, ERREUR
     ALGO_AVAILABLE = True
 except ImportError as e:
     ALGO_AVAILABLE = False
@@ -84,55 +93,71 @@ def show_dashboard():
 def show_overview():
     
     st.header("📊 Vue d'ensemble du système")
-    conn = get_connection()
-    if conn:
-        cursor = conn.cursor(dictionary=True)
-        cursor.execute("""
-            SELECT COUNT(*) as nb_refused 
-            FROM examens 
-            WHERE statut = 'REFUSE'
-        """)
-        result = cursor.fetchone()
-        conn.close()
-        
-        if result and result['nb_refused'] > 0:
-            st.error(f"🚨 {result['nb_refused']} examen(s) refusé(s) par le chef de département")
-            
-           
-            st.divider()
-    try:
-        # Récupérer les données
-        sessions = fetch_sessions()
-        salles = fetch_salles()
-        professeurs = fetch_professeurs()
-        etudiants = fetch_etudiants()
-        examens = fetch_examens()
-        formations = fetch_formations()
-        
-        # Afficher les métriques dans 3 colonnes
-        col1, col2, col3 = st.columns(3)
-        
-        with col1:
-            st.metric("🗓️ Sessions d'examens", len(sessions))
-            st.metric("🏫 Salles disponibles", len(salles))
-            st.metric("📚 Formations", len(formations))
-        
-        with col2:
-            st.metric("👨‍🏫 Professeurs", len(professeurs))
-            st.metric("👨‍🎓 Étudiants", len(etudiants))
-            st.metric("📝 Examens programmés", len([e for e in examens if e['statut'] == 'CONFIRME']))
-        
-        with col3:
-            st.metric("⏳ Examens en attente", len([e for e in examens if e['statut'] == 'EN_ATTENTE']))
-            st.metric("🎓 Amphithéâtres", len([s for s in salles if s['type'] == 'AMPHI']))
-            st.metric("🪑 Salles de cours", len([s for s in salles if s['type'] == 'SALLE']))
-        
+    stats = fetch_overview_stats()
+    if stats is None:
+        st.error("❌ Erreur lors du chargement des données")
+        return
+    
+    if stats['nb_refuses'] > 0:
+        st.error(f"🚨 {stats['nb_refuses']} examen(s) refusé(s) par le chef de département")
         st.divider()
-        
-        # Dernières sessions
-        
-    except Exception as e:
-        st.error(f"❌ Erreur lors du chargement des données: {e}")
+    
+    # Afficher les métriques dans 3 colonnes
+    col1, col2, col3 = st.columns(3)
+    
+    with col1:
+        st.metric("🗓️ Sessions d'examens", stats['nb_sessions'])
+        st.metric("🏫 Salles disponibles", stats['nb_salles'])
+        st.metric("📚 Formations", stats['nb_formations'])
+    
+    with col2:
+        st.metric("👨‍🏫 Professeurs", stats['nb_professeurs'])
+        st.metric("👨‍🎓 Étudiants", stats['nb_etudiants'])
+        st.metric("📝 Examens programmés", stats['nb_confirmes'])
+    
+    with col3:
+        st.metric("⏳ Examens en attente", stats['nb_en_attente'])
+        st.metric("🎓 Amphithéâtres", stats['nb_amphis'])
+        st.metric("🪑 Salles de cours", stats['nb_salles_cours'])
+    
+    st.divider()
+
+# Intervalle (secondes) entre deux lectures de l'avancement d'une planification
+POLL_INTERVAL = 0.5
+
+def show_generation_progress(job, time_budget):
+    """Avancement d'une planification en tâche de fond ; retourne True tant qu'elle tourne"""
+    if job['status'] != EN_COURS:
+        if job['status'] == ERREUR or not job['result']:
+            st.session_state.creation_results = {
+                "success": False, "message": job['error'] or "Planification interrompue"
+            }
+        else:
+            st.session_state.creation_results = job['result']
+        del st.session_state['generation_job']
+        return False
+    
+    progress = job['progress']
+    st.subheader("⏳ Planification en cours")
+    st.progress(min(job['elapsed'] / max(time_budget, 0.1), 1.0),
+                text=f"Phase : {progress.get('phase', 'démarrage')}")
+    
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Meilleur coût", progress.get('cost', '—'))
+    col2.metric("Examens sans créneau", progress.get('unscheduled_exams', '—'))
+    col3.metric("Temps écoulé", f"{job['elapsed']} s")
+    if 'same_day_exams' in progress:
+        st.caption(f"📅 {progress['same_day_exams']} examen(s) en trop le même jour pour un groupe • "
+                   f"{progress.get('moves', 0)} amélioration(s)")
+    if 'runs_completed' in progress:
+        st.caption(f"🔁 {progress['runs_completed']}/{progress['runs']} exécutions terminées")
+    
+    if job['stop_requested']:
+        st.info("⏹️ Arrêt demandé : enregistrement de la meilleure solution trouvée...")
+    elif st.button("⏹️ Arrêter et garder la meilleure solution"):
+        stop_job(job['id'])
+        st.rerun()
+    return True
 
 def show_new_session():
     """Créer une nouvelle session"""
@@ -142,6 +167,15 @@ def show_new_session():
     if 'creation_results' not in st.session_state:
         st.session_state.creation_results = None
     
+    # Planification en tâche de fond : la page relit l'avancement jusqu'à la fin
+    if st.session_state.get('generation_job'):
+        job = get_job(st.session_state.generation_job)
+        if job is None:
+            del st.session_state['generation_job']
+        elif show_generation_progress(job, st.session_state.get('generation_budget', TIME_BUDGET)):
+            time.sleep(POLL_INTERVAL)
+            st.rerun()
+    
     # Formulaire de création
     with st.form("new_session_form"):
         st.subheader("📋 Informations de la session")
@@ -158,6 +192,18 @@ def show_new_session():
         default_end = start_date + timedelta(days=10) if 'start_date' in locals() else datetime.now().date() + timedelta(days=17)
         end_date = st.date_input("Date de fin *", value=default_end)
         
+        runs = st.number_input(
+            "Exécutions parallèles du planificateur",
+            min_value=1, max_value=32, value=1,
+            help="Plusieurs exécutions avec des graines différentes sur des processus séparés ; la meilleure est gardée"
+        )
+        
+        time_budget = st.number_input(
+            "Budget de calcul (secondes)",
+            min_value=1.0, max_value=600.0, value=TIME_BUDGET, step=1.0,
+            help="Durée maximale de la recherche ; la planification peut être arrêtée avant, en gardant la meilleure solution"
+        )
+        
      
         
         submitted = st.form_submit_button("🚀 Créer et Planifier Automatiquement", type="primary")
@@ -171,30 +217,36 @@ def show_new_session():
                 st.error("⚠️ La date de fin doit être après la date de début")
                 return
             
-            with st.spinner("⏳ Création et planification en cours... Cette opération peut prendre quelques secondes"):
-                try:
-                    if not ALGO_AVAILABLE:
-                        st.error("❌ L'algorithme de planification n'est pas disponible")
-                        return
-                    
-                    formations = fetch_formations()
-                    if not formations:
-                        st.error("❌ Aucune formation trouvée dans la base de données")
-                        return
-                    
-                    formation_ids = [f['id'] for f in formations]
-                    
-                    results = create_session_and_generate_exams(
-                        nom_session=session_name,
-                        date_debut=start_date,
-                        date_fin=end_date,
-                        formation_ids=formation_ids
-                    )
-                    
-                    st.session_state.creation_results = results
-                    
-                except Exception as e:
-                    st.error(f"❌ Erreur lors de la création : {str(e)}")
+            try:
+                if not ALGO_AVAILABLE:
+                    st.error("❌ L'algorithme de planification n'est pas disponible")
+                    return
+                
+                formations = fetch_formations()
+                if not formations:
+                    st.error("❌ Aucune formation trouvée dans la base de données")
+                    return
+                
+                formation_ids = [f['id'] for f in formations]
+                
+                st.session_state.generation_job = start_job(
+                    "planification",
+                    create_session_and_generate_exams,
+                    nom_session=session_name,
+                    date_debut=start_date,
+                    date_fin=end_date,
+                    formation_ids=formation_ids,
+                    runs=int(runs),
+                    time_budget=float(time_budget)
+                )
+                st.session_state.generation_budget = float(time_budget)
+                st.session_state.creation_results = None
+                
+            except Exception as e:
+                st.error(f"❌ Erreur lors de la création : {str(e)}")
+            
+            if st.session_state.get('generation_job'):
+                st.rerun()
     
     # Afficher les résultats
     if st.session_state.creation_results:
@@ -281,8 +333,8 @@ def show_session_details(session_id):
             del st.session_state['selected_session']
         st.rerun()
     
-    # Bouton pour replanifier
-    if st.button("🔄 Replanifier cette session", type="secondary"):
+    # Replanification des seuls examens refusés (les examens acceptés ne bougent pas)
+    if st.button("🔄 Replanifier les examens refusés", type="secondary"):
         with st.spinner("Replanification en cours..."):
             results = planify_session_exams(session_id)
             if results['success']:
@@ -291,6 +343,25 @@ def show_session_details(session_id):
             else:
                 st.error(results['message'])
     
+    # Confirmer les examens en attente et publier la session
+    if st.button("📢 Confirmer et publier la session", type="secondary"):
+        with st.spinner("Publication en cours..."):
+            results = confirm_and_publish_session(session_id)
+            if results['success']:
+                st.success(results['message'])
+                st.rerun()
+            else:
+                st.error(results['message'])
+    
+    # Surveillants : recalcul complet (disponibilités, plafonds, équilibrage des charges)
+    if st.button("👮 Affecter les surveillants", type="secondary"):
+        with st.spinner("Affectation des surveillants..."):
+            results = generate_surveillances(session_id)
+            if results['success']:
+                st.success(results['message'])
+            else:
+                st.error(results['message'])
+    
     # Récupérer les examens
     examens = fetch_examens_by_session_grouped(session_id)
     
@@ -298,61 +369,131 @@ def show_session_details(session_id):
         st.info("ℹ️ Aucun examen trouvé pour cette session")
         return
     
-    # Convertir en DataFrame
+    # Une seule passe groupby : les lignes arrivent déjà triées par formation,
+    # groupe puis horaire (ORDER BY SQL), l'ordre est conservé avec sort=False
     df = pd.DataFrame(examens)
+    df['groupe_nom'] = df['groupe_nom'].fillna("Sans groupe")
+    df['en_attente'] = df['statut'] == 'EN_ATTENTE'
     
-    if 'date_examen' in df.columns and df['date_examen'].notna().any():
-        df['date_examen'] = pd.to_datetime(df['date_examen']).dt.date
+    groupes_par_formation = {}
+    for (formation, groupe), groupe_exams in df.groupby(['formation_nom', 'groupe_nom'], sort=False):
+        groupes_par_formation.setdefault(formation, []).append((groupe, groupe_exams))
     
- 
+    resume = df.groupby(['formation_nom', 'groupe_nom'], sort=False).agg(
+        nb_examens=('id', 'size'),
+        nb_planifies=('date_examen', 'count'),
+        nb_en_attente=('en_attente', 'sum')
+    ).reset_index()
     
-    # Planning par formation et groupe
+    # Planning par formation et groupe : une formation affichée à la fois
     st.subheader("📚 Planning détaillé par Formation et Groupe")
     
-    if 'formation_nom' in df.columns and 'groupe_nom' in df.columns:
-        formations_list = sorted(df['formation_nom'].unique())
-        
-        for formation in formations_list:
-            st.markdown(f"#### 📖 {formation}")
-            
-            formation_exams = df[df['formation_nom'] == formation]
-            groupes_list = sorted(formation_exams['groupe_nom'].unique())
-            
-            for groupe in groupes_list:
-                with st.expander(f"👥 Groupe {groupe}", expanded=True):
-                    groupe_exams = formation_exams[formation_exams['groupe_nom'] == groupe].copy()
-                    
-                    if 'date_examen' in groupe_exams.columns and 'heure_debut' in groupe_exams.columns:
-                        groupe_exams = groupe_exams.sort_values(['date_examen', 'heure_debut'])
-                    
-                    groupe_columns = ['module_nom', 'date_examen', 'heure_debut', 'salle_nom', 'statut']
-                    groupe_columns = [col for col in groupe_columns if col in groupe_exams.columns]
-                    
-                    if groupe_columns:
-                        st.dataframe(
-                            groupe_exams[groupe_columns],
-                            column_config={
-                                "module_nom": "Module",
-                                "date_examen": "Date",
-                                "heure_debut": "Heure",
-                                "salle_nom": "Salle",
-                                "statut": "Statut"
-                            },
-                            use_container_width=True,
-                            hide_index=True
-                        )
-    
-    # Export
+    formation = st.selectbox(
+        "Formation",
+        list(groupes_par_formation),
+        format_func=lambda f: f"{f} ({len(groupes_par_formation[f])} groupe(s))",
+        key=f"details_formation_{session_id}"
+    )
+    
+    st.dataframe(
+        resume[resume['formation_nom'] == formation].drop(columns='formation_nom'),
+        column_config={
+            "groupe_nom": "Groupe",
+            "nb_examens": "Examens",
+            "nb_planifies": "Planifiés",
+            "nb_en_attente": "En attente"
+        },
+        use_container_width=True,
+        hide_index=True
+    )
+    
+    groupe_columns = ['module_nom', 'date_examen', 'heure_debut', 'salle_nom', 'statut']
+    for groupe, groupe_exams in groupes_par_formation[formation]:
+        with st.expander(f"👥 Groupe {groupe} ({len(groupe_exams)} examen(s))", expanded=False):
+            st.dataframe(
+                groupe_exams[groupe_columns],
+                column_config={
+                    "module_nom": "Module",
+                    "date_examen": "Date",
+                    "heure_debut": "Heure",
+                    "salle_nom": "Salle",
+                    "statut": "Statut"
+                },
+                use_container_width=True,
+                hide_index=True
+            )
+    
+    # Export : fichier généré à la demande depuis un curseur serveur, gardé par version de session
     st.subheader("📤 Export des données")
-    csv = df.to_csv(index=False)
-    st.download_button(
-        label="📥 Télécharger en CSV",
-        data=csv,
-        file_name=f"session_{session_id}.csv",
-        mime="text/csv",
-        use_container_width=True
+    col_format, col_action = st.columns([1, 2])
+    with col_format:
+        export_format = st.selectbox(
+            "Format",
+            available_formats(),
+            format_func=str.upper,
+            key=f"export_format_{session_id}"
+        )
+    with col_action:
+        if st.button("📦 Préparer l'export", use_container_width=True, key=f"export_{session_id}"):
+            with st.spinner("Génération du fichier..."):
+                st.session_state[f"export_{session_id}_{export_format}"] = export_session(session_id, export_format)
+        
+        export = st.session_state.get(f"export_{session_id}_{export_format}")
+        if export and not export['success']:
+            st.error(f"❌ {export['message']}")
+        elif export and os.path.exists(export['path']):
+            st.download_button(
+                label=f"📥 Télécharger en {export_format.upper()}",
+                data=read_export(export['path']),
+                file_name=f"session_{session_id}_v{export['version']}.{export_format}",
+                mime=export['mime'],
+                use_container_width=True
+            )
+
+@st.cache_data(max_entries=4, show_spinner=False)
+def read_export(path):
+    """Contenu d'un fichier d'export, lu une seule fois : le chemin contient la session, la version et le format"""
+    with open(path, "rb") as export_file:
+        return export_file.read()
+
+def show_paged_table(key, fetch_page, total, column_config, columns=None):
+    """
+    Tableau paginé par clé : seule la page affichée est lue en base.
+    st.session_state[key] garde la pile des after_id des pages parcourues.
+    """
+    pages = st.session_state.setdefault(key, [0])
+    rows, next_after = fetch_page(after_id=pages[-1])
+    if not rows and len(pages) > 1:
+        # Page vidée entre-temps (suppressions) : revenir au début
+        pages[:] = [0]
+        rows, next_after = fetch_page(after_id=0)
+    if not rows:
+        return False
+
+    df = pd.DataFrame(rows)
+    st.dataframe(
+        df[columns] if columns else df,
+        column_config=column_config,
+        use_container_width=True,
+        hide_index=True
     )
 
+    col_prev, col_info, col_next = st.columns([1, 3, 1])
+    with col_prev:
+        if st.button("⬅️ Précédent", key=f"{key}_prev", disabled=len(pages) == 1):
+            pages.pop()
+            st.rerun()
+    with col_info:
+        info = f"Page {len(pages)} · {len(rows)} ligne(s)"
+        if total is not None:
+            info += f" · {total} au total"
+        st.caption(info)
+    with col_next:
+        if st.button("Suivant ➡️", key=f"{key}_next", disabled=next_after is None):
+            pages.append(next_after)
+            st.rerun()
+    return True
+
 def manage_salles():
     """Gestion des salles"""
     st.header("🏫 Gestion des Salles")
@@ -361,28 +502,23 @@ def manage_salles():
     tab1, tab2 = st.tabs(["📋 Liste des Salles", "➕ Ajouter une Salle"])
     
     with tab1:
-        salles = fetch_salles()
-        if salles:
-            df = pd.DataFrame(salles)
-            st.dataframe(
-                df,
-                column_config={
-                    "id": "ID",
-                    "nom": "Nom",
-                    "capacite": "Capacité",
-                    "type": "Type"
-                },
-                use_container_width=True,
-                hide_index=True
-            )
-            
+        totaux = fetch_list_totals() or {}
+        if show_paged_table(
+            "page_salles", fetch_salles_page, totaux.get('nb_salles'),
+            column_config={
+                "id": "ID",
+                "nom": "Nom",
+                "capacite": "Capacité",
+                "type": "Type"
+            }
+        ):
             col1, col2 = st.columns(2)
             with col1:
-                st.metric("Nombre total de salles", len(salles))
-                st.metric("Capacité totale", sum(s['capacite'] for s in salles))
+                st.metric("Nombre total de salles", totaux.get('nb_salles', 0))
+                st.metric("Capacité totale", totaux.get('capacite_totale', 0))
             with col2:
-                st.metric("Amphithéâtres", len([s for s in salles if s['type'] == 'AMPHI']))
-                st.metric("Salles de cours", len([s for s in salles if s['type'] == 'SALLE']))
+                st.metric("Amphithéâtres", totaux.get('nb_amphis', 0))
+                st.metric("Salles de cours", totaux.get('nb_salles_cours', 0))
         else:
             st.info("ℹ️ Aucune salle trouvée")
     
@@ -414,6 +550,7 @@ def manage_salles():
                                 (nom, capacite, type_salle)
                             )
                             conn.commit()
+                            invalidate("salles")
                             st.success(f"✅ Salle '{nom}' ajoutée avec succès !")
                             st.rerun()
                         except Exception as e:
@@ -430,22 +567,18 @@ def manage_professeurs():
     tab1, tab2 = st.tabs(["📋 Liste des Professeurs", "➕ Ajouter un Professeur"])
     
     with tab1:
-        professeurs = fetch_professeurs()
-        if professeurs:
-            df = pd.DataFrame(professeurs)
-            st.dataframe(
-                df[['id', 'email', 'specialite', 'departement', 'is_active']],
-                column_config={
-                    "id": "ID",
-                    "email": "Email",
-                    "specialite": "Spécialité",
-                    "departement": "Département",
-                    "is_active": "Actif"
-                },
-                use_container_width=True,
-                hide_index=True
-            )
-        else:
+        totaux = fetch_list_totals() or {}
+        if not show_paged_table(
+            "page_professeurs", fetch_professeurs_page, totaux.get('nb_professeurs'),
+            column_config={
+                "id": "ID",
+                "email": "Email",
+                "specialite": "Spécialité",
+                "departement": "Département",
+                "is_active": "Actif"
+            },
+            columns=['id', 'email', 'specialite', 'departement', 'is_active']
+        ):
             st.info("ℹ️ Aucun professeur trouvé")
     
     with tab2:
@@ -459,13 +592,8 @@ def manage_professeurs():
                 specialite = st.text_input("Spécialité *", placeholder="ex: Mathématiques")
             
             with col2:
-                conn = get_connection()
-                if conn:
-                    cursor = conn.cursor(dictionary=True)
-                    cursor.execute("SELECT id, nom FROM departements")
-                    departements = cursor.fetchall()
-                    conn.close()
-                    
+                departements = fetch_departements()
+                if departements:
                     departement_options = {d['nom']: d['id'] for d in departements}
                     departement_nom = st.selectbox("Département *", list(departement_options.keys()))
                     departement_id = departement_options.get(departement_nom)
@@ -517,20 +645,16 @@ def manage_etudiants():
     tab1, tab2 = st.tabs(["📋 Liste des Étudiants", "➕ Ajouter un Étudiant"])
     
     with tab1:
-        etudiants = fetch_etudiants()
-        if etudiants:
-            df = pd.DataFrame(etudiants)
-            st.dataframe(
-                df,
-                column_config={
-                    "id": "ID",
-                    "email": "Email",
-                    "groupe_id": "Groupe ID"
-                },
-                use_container_width=True,
-                hide_index=True
-            )
-        else:
+        totaux = fetch_list_totals() or {}
+        if not show_paged_table(
+            "page_etudiants", fetch_etudiants_page, totaux.get('nb_etudiants'),
+            column_config={
+                "id": "ID",
+                "email": "Email",
+                "groupe_id": "Groupe ID",
+                "groupe_nom": "Groupe"
+            }
+        ):
             st.info("ℹ️ Aucun étudiant trouvé")
     
     with tab2:
@@ -546,25 +670,8 @@ def manage_etudiants():
                 prenom = st.text_input("Prénom *")
             
             with col2:
-                conn = get_connection()
-                if conn:
-                    cursor = conn.cursor(dictionary=True)
-                    cursor.execute("SELECT id, nom, formation_id FROM groupes")
-                    groupes = cursor.fetchall()
-                    conn.close()
-                    
-                    groupe_options = {}
-                    for g in groupes:
-                        conn2 = get_connection()
-                        cursor2 = conn2.cursor(dictionary=True)
-                        cursor2.execute("SELECT nom FROM formations WHERE id = %s", (g['formation_id'],))
-                        formation = cursor2.fetchone()
-                        conn2.close()
-                        
-                        formation_nom = formation['nom'] if formation else "Inconnu"
-                        label = f"{g['nom']} ({formation_nom})"
-                        groupe_options[label] = g['id']
-                    
+                groupe_options = fetch_groupe_options()
+                if groupe_options:
                     groupe_label = st.selectbox("Groupe *", list(groupe_options.keys()))
                     groupe_id = groupe_options.get(groupe_label)
                 else:
@@ -628,13 +735,8 @@ def manage_modules_formations():
             
             nom = st.text_input("Nom de la formation *", placeholder="ex: Informatique L1")
             
-            conn = get_connection()
-            if conn:
-                cursor = conn.cursor(dictionary=True)
-                cursor.execute("SELECT id, nom FROM departements")
-                departements = cursor.fetchall()
-                conn.close()
-                
+            departements = fetch_departements()
+            if departements:
                 departement_options = {d['nom']: d['id'] for d in departements}
                 departement_nom = st.selectbox("Département *", list(departement_options.keys()))
                 departement_id = departement_options.get(departement_nom)
@@ -657,6 +759,7 @@ def manage_modules_formations():
                                 (nom, departement_id)
                             )
                             conn.commit()
+                            invalidate("formations")
                             st.success(f"✅ Formation '{nom}' ajoutée avec succès !")
                             st.rerun()
                         except Exception as e:
@@ -667,66 +770,59 @@ def manage_modules_formations():
     with tab3:
         st.subheader("📘 Gestion des Modules")
         
-        conn = get_connection()
-        if conn:
-            cursor = conn.cursor(dictionary=True)
-            cursor.execute("""
-                SELECT m.id, m.nom, f.nom as formation_nom 
-                FROM modules m
-                JOIN formations f ON m.formation_id = f.id
-                ORDER BY f.nom, m.nom
-            """)
-            modules = cursor.fetchall()
-            
-            if modules:
-                df_modules = pd.DataFrame(modules)
-                st.dataframe(
-                    df_modules,
-                    column_config={
-                        "id": "ID",
-                        "nom": "Nom du module",
-                        "formation_nom": "Formation"
-                    },
-                    use_container_width=True,
-                    hide_index=True
-                )
-            else:
-                st.info("ℹ️ Aucun module trouvé")
+        modules = fetch_modules()
+        
+        if modules:
+            df_modules = pd.DataFrame(modules)
+            st.dataframe(
+                df_modules[['id', 'nom', 'formation_nom']],
+                column_config={
+                    "id": "ID",
+                    "nom": "Nom du module",
+                    "formation_nom": "Formation"
+                },
+                use_container_width=True,
+                hide_index=True
+            )
+        else:
+            st.info("ℹ️ Aucun module trouvé")
+        
+        st.subheader("➕ Ajouter un nouveau module")
+        with st.form("add_module_form"):
+            col1, col2 = st.columns(2)
             
-            st.subheader("➕ Ajouter un nouveau module")
-            with st.form("add_module_form"):
-                col1, col2 = st.columns(2)
-                
-                with col1:
-                    module_nom = st.text_input("Nom du module *", placeholder="ex: Algorithmique")
-                
-                with col2:
-                    cursor.execute("SELECT id, nom FROM formations")
-                    formations_list = cursor.fetchall()
-                    formation_options = {f['nom']: f['id'] for f in formations_list}
-                    formation_nom = st.selectbox("Formation *", list(formation_options.keys()))
-                    formation_id = formation_options.get(formation_nom)
-                
-                submitted_module = st.form_submit_button("➕ Ajouter le module", type="primary")
-                
-                if submitted_module:
-                    if not module_nom or not formation_id:
-                        st.error("⚠️ Veuillez remplir tous les champs obligatoires (*)")
-                    else:
+            with col1:
+                module_nom = st.text_input("Nom du module *", placeholder="ex: Algorithmique")
+            
+            with col2:
+                formation_options = {f['nom']: f['id'] for f in fetch_formations()}
+                formation_nom = st.selectbox("Formation *", list(formation_options.keys()))
+                formation_id = formation_options.get(formation_nom)
+            
+            submitted_module = st.form_submit_button("➕ Ajouter le module", type="primary")
+            
+            if submitted_module:
+                if not module_nom or not formation_id:
+                    st.error("⚠️ Veuillez remplir tous les champs obligatoires (*)")
+                else:
+                    conn = get_connection()
+                    if conn:
                         try:
+                            cursor = conn.cursor()
                             cursor.execute(
                                 "INSERT INTO modules (nom, formation_id) VALUES (%s, %s)",
                                 (module_nom, formation_id)
                             )
                             conn.commit()
+                            invalidate("modules")
                             st.success(f"✅ Module '{module_nom}' ajouté avec succès !")
                             st.rerun()
                         except Exception as e:
                             st.error(f"❌ Erreur: {e}")
-            
-            conn.close()
-        else:
-            st.error("❌ Impossible de se connecter à la base de données")
+                        finally:
+                            conn.close()
+                    else:
+                        st.error("❌ Impossible de se connecter à la base de données")
 
 def manage_groupes():
     """Gestion des groupes"""
@@ -735,41 +831,24 @@ def manage_groupes():
     tab1, tab2 = st.tabs(["📋 Liste des Groupes", "➕ Ajouter un Groupe"])
     
     with tab1:
-        conn = get_connection()
-        if conn:
-            cursor = conn.cursor(dictionary=True)
-            cursor.execute("""
-                SELECT g.id, g.nom, g.effectif, f.nom as formation_nom
-                FROM groupes g
-                JOIN formations f ON g.formation_id = f.id
-                ORDER BY f.nom, g.nom
-            """)
-            groupes = cursor.fetchall()
-            conn.close()
-            
-            if groupes:
-                df = pd.DataFrame(groupes)
-                st.dataframe(
-                    df,
-                    column_config={
-                        "id": "ID",
-                        "nom": "Nom",
-                        "effectif": "Effectif",
-                        "formation_nom": "Formation"
-                    },
-                    use_container_width=True,
-                    hide_index=True
-                )
-                
-                col1, col2 = st.columns(2)
-                with col1:
-                    st.metric("Nombre total de groupes", len(groupes))
-                with col2:
-                    st.metric("Effectif total", sum(g['effectif'] for g in groupes))
-            else:
-                st.info("ℹ️ Aucun groupe trouvé")
+        totaux = fetch_list_totals() or {}
+        if show_paged_table(
+            "page_groupes", fetch_groupes_page, totaux.get('nb_groupes'),
+            column_config={
+                "id": "ID",
+                "nom": "Nom",
+                "effectif": "Effectif",
+                "formation_nom": "Formation"
+            },
+            columns=['id', 'nom', 'effectif', 'formation_nom']
+        ):
+            col1, col2 = st.columns(2)
+            with col1:
+                st.metric("Nombre total de groupes", totaux.get('nb_groupes', 0))
+            with col2:
+                st.metric("Effectif total", totaux.get('effectif_total', 0))
         else:
-            st.error("❌ Impossible de se connecter à la base de données")
+            st.info("ℹ️ Aucun groupe trouvé")
     
     with tab2:
         with st.form("add_groupe_form"):
@@ -782,13 +861,8 @@ def manage_groupes():
                 effectif = st.number_input("Effectif *", min_value=1, max_value=200, value=30)
             
             with col2:
-                conn = get_connection()
-                if conn:
-                    cursor = conn.cursor(dictionary=True)
-                    cursor.execute("SELECT id, nom FROM formations")
-                    formations = cursor.fetchall()
-                    conn.close()
-                    
+                formations = fetch_formations()
+                if formations:
                     formation_options = {f['nom']: f['id'] for f in formations}
                     formation_nom = st.selectbox("Formation *", list(formation_options.keys()))
                     formation_id = formation_options.get(formation_nom)
@@ -811,6 +885,7 @@ def manage_groupes():
                                 (nom, formation_id, effectif)
                             )
                             conn.commit()
+                            invalidate("groupes")
                             st.success(f"✅ Groupe '{nom}' ajouté avec succès !")
                             st.rerun()
                         except Exception as e:
@@ -825,44 +900,36 @@ def manage_departements():
     tab1, tab2 = st.tabs(["📋 Liste des Départements", "➕ Ajouter un Département"])
     
     with tab1:
-        conn = get_connection()
-        if conn:
-            cursor = conn.cursor(dictionary=True)
-            cursor.execute("SELECT id, nom FROM departements ORDER BY nom")
-            departements = cursor.fetchall()
+        departements = fetch_departements()
+        if departements:
+            df = pd.DataFrame(departements)
+            st.dataframe(
+                df,
+                column_config={
+                    "id": "ID",
+                    "nom": "Nom du département"
+                },
+                use_container_width=True,
+                hide_index=True
+            )
+            
+            conn = get_connection()
+            cursor = conn.cursor(cursor_factory=RowCursor)
+            cursor.execute("""
+                SELECT d.nom, COUNT(f.id) as nb_formations
+                FROM departements d
+                LEFT JOIN formations f ON d.id = f.departement_id
+                GROUP BY d.id
+                ORDER BY d.nom
+            """)
+            stats = cursor.fetchall()
             conn.close()
             
-            if departements:
-                df = pd.DataFrame(departements)
-                st.dataframe(
-                    df,
-                    column_config={
-                        "id": "ID",
-                        "nom": "Nom du département"
-                    },
-                    use_container_width=True,
-                    hide_index=True
-                )
-                
-                conn = get_connection()
-                cursor = conn.cursor(dictionary=True)
-                cursor.execute("""
-                    SELECT d.nom, COUNT(f.id) as nb_formations
-                    FROM departements d
-                    LEFT JOIN formations f ON d.id = f.departement_id
-                    GROUP BY d.id
-                    ORDER BY d.nom
-                """)
-                stats = cursor.fetchall()
-                conn.close()
-                
-                st.subheader("📊 Statistiques par département")
-                for stat in stats:
-                    st.write(f"**{stat['nom']}**: {stat['nb_formations']} formation(s)")
-            else:
-                st.info("ℹ️ Aucun département trouvé")
+            st.subheader("📊 Statistiques par département")
+            for stat in stats:
+                st.write(f"**{stat['nom']}**: {stat['nb_formations']} formation(s)")
         else:
-            st.error("❌ Impossible de se connecter à la base de données")
+            st.info("ℹ️ Aucun département trouvé")
     
     with tab2:
         with st.form("add_departement_form"):
@@ -885,6 +952,7 @@ def manage_departements():
                                 (nom,)
                             )
                             conn.commit()
+                            invalidate("departements")
                             st.success(f"✅ Département '{nom}' ajouté avec succès !")
                             st.rerun()
                         except Exception as e:
@@ -1,7 +1,6 @@
 # frontend/dashboard_chef.py
 import streamlit as st
 import pandas as pd
-from datetime import datetime
 import sys
 import os
 
@@ -9,7 +8,10 @@ project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.insert(0, project_root)
 
 try:
-    from backend.database import get_connection, fetch_formations, fetch_examens_by_session_grouped
+    from backend.database import get_connection, RowCursor
+    from backend.conflicts import load_conflicts, LIBELLES, SALLE, GROUPE, PROF
+    from backend.snapshots import refresh_published_snapshots
+    from backend.stats import request_refresh, fetch_totaux, fetch_distribution_statuts
     DB_AVAILABLE = True
 except ImportError as e:
     DB_AVAILABLE = False
@@ -61,7 +63,7 @@ def show_validation_section():
     
     try:
         conn = get_connection()
-        cursor = conn.cursor(dictionary=True)
+        cursor = conn.cursor(cursor_factory=RowCursor)
         
         # Récupérer le département du chef (simulation)
         # Dans une vraie application, récupérer depuis la table users
@@ -229,9 +231,15 @@ def update_exams_status(formation_id, new_status):
             SET statut = %s
             WHERE formation_id = %s
             AND statut != %s
+            RETURNING session_id
         """, (new_status, formation_id, new_status))
         
+        # Emplois du temps déjà publiés : recalculés dans la même transaction
+        refresh_published_snapshots(cursor, {row[0] for row in cursor.fetchall()})
+        
         conn.commit()
+        # Statistiques recalculées en arrière-plan : le clic n'attend pas le REFRESH
+        request_refresh()
         cursor.close()
         conn.close()
         
@@ -247,8 +255,11 @@ def show_statistics_section():
         return
     
     try:
-        conn = get_connection()
-        cursor = conn.cursor(dictionary=True)
+        # Lecture de la vue matérialisée des statistiques (pas d'agrégation sur examens)
+        totaux = fetch_totaux()
+        if not totaux:
+            st.error("❌ Impossible de se connecter à la base de données")
+            return
         
         # Statistiques générales
         st.subheader("📈 Vue d'ensemble")
@@ -256,39 +267,21 @@ def show_statistics_section():
         col1, col2, col3, col4 = st.columns(4)
         
         with col1:
-            cursor.execute("SELECT COUNT(*) as total FROM formations")
-            total_formations = cursor.fetchone()['total']
-            st.metric("Formations", total_formations)
+            st.metric("Formations", totaux['formations'])
         
         with col2:
-            cursor.execute("SELECT COUNT(*) as total FROM groupes")
-            total_groupes = cursor.fetchone()['total']
-            st.metric("Groupes", total_groupes)
+            st.metric("Groupes", totaux['groupes'])
         
         with col3:
-            cursor.execute("SELECT COUNT(*) as total FROM examens")
-            total_examens = cursor.fetchone()['total']
-            st.metric("Examens", total_examens)
+            st.metric("Examens", totaux['examens'])
         
         with col4:
-            cursor.execute("SELECT COUNT(*) as total FROM professeurs")
-            total_profs = cursor.fetchone()['total']
-            st.metric("Professeurs", total_profs)
+            st.metric("Professeurs", totaux['professeurs'])
         
         # Distribution des examens par statut
         st.subheader("📊 Distribution par Statut")
         
-        cursor.execute("""
-            SELECT 
-                statut,
-                COUNT(*) as nombre,
-                ROUND(COUNT(*) * 100.0 / (SELECT COUNT(*) FROM examens), 1) as pourcentage
-            FROM examens
-            GROUP BY statut
-            ORDER BY nombre DESC
-        """)
-        
-        stats = cursor.fetchall()
+        stats = fetch_distribution_statuts()
         
         if stats:
             df_stats = pd.DataFrame(stats)
@@ -310,9 +303,6 @@ def show_statistics_section():
                 
                 st.write(f"{statut_text}: {stat['nombre']} ({stat['pourcentage']}%)")
         
-        cursor.close()
-        conn.close()
-        
     except Exception as e:
         st.error(f"Erreur: {str(e)}")
 
@@ -333,102 +323,72 @@ def show_conflicts_section():
         return
     
     try:
-        conn = get_connection()
-        cursor = conn.cursor(dictionary=True)
+        # Salles : chevauchements d'horaires ; étudiants et surveillants : graphe de conflits des sessions
+        result = load_conflicts()
+        if result is None:
+            st.error("❌ Impossible de se connecter à la base de données")
+            return
         
-        # Détecter les conflits de salle
-        st.subheader("🏫 Conflits de Salle")
+        conflits, capacites, examens = result
         
-        cursor.execute("""
-            SELECT 
-                e1.id as examen1_id,
-                e1.date_examen,
-                e1.heure_debut,
-                e1.salle_id,
-                s.nom as salle_nom,
-                m1.nom as module1,
-                m2.nom as module2,
-                e2.id as examen2_id
-            FROM examens e1
-            JOIN examens e2 ON e1.salle_id = e2.salle_id 
-                AND e1.id < e2.id
-                AND e1.date_examen = e2.date_examen
-                AND e1.heure_debut = e2.heure_debut
-            JOIN modules m1 ON e1.module_id = m1.id
-            JOIN modules m2 ON e2.module_id = m2.id
-            JOIN salles s ON e1.salle_id = s.id
-            WHERE e1.statut IN ('EN_ATTENTE', 'CONFIRME')
-            ORDER BY e1.date_examen, e1.heure_debut
-        """)
-        
-        conflits_salle = cursor.fetchall()
-        
-        if conflits_salle:
+        sections = [
+            (SALLE, "🏫 Conflits de Salle", "Salle", "✅ Aucun conflit de salle détecté"),
+            (GROUPE, "👨‍🎓 Conflits d'Étudiants", "Groupe", "✅ Aucun conflit d'étudiant détecté"),
+            (PROF, "👨‍🏫 Conflits de Professeurs", "Surveillant", "✅ Aucun conflit de surveillant détecté"),
+        ]
+        
+        for kind, titre, ressource, message_ok in sections:
+            st.subheader(titre)
+            
             conflit_data = []
-            for conflit in conflits_salle:
+            for conflit in conflits:
+                if conflit.kind != kind:
+                    continue
+                e1 = examens[conflit.exam_a]
+                e2 = examens[conflit.exam_b]
+                if kind == SALLE:
+                    nom_ressource = e1['salle_nom']
+                elif kind == GROUPE:
+                    nom_ressource = f"{e1['groupe_nom']} ({conflit.shared} étudiants)"
+                else:
+                    nom_ressource = f"{conflit.shared} surveillant(s) en commun"
+                
                 conflit_data.append({
-                    "Salle": conflit['salle_nom'],
-                    "Date": conflit['date_examen'].strftime("%d/%m/%Y"),
-                    "Heure": str(conflit['heure_debut'])[:5],
-                    "Module 1": conflit['module1'],
-                    "Module 2": conflit['module2'],
-                    "Type": "Salle double utilisation"
+                    ressource: nom_ressource,
+                    "Date": conflit.start.strftime("%d/%m/%Y"),
+                    "Chevauchement": f"{conflit.start:%H:%M} - {conflit.end:%H:%M}",
+                    "Module 1": e1['module_nom'],
+                    "Module 2": e2['module_nom'],
+                    "Type": LIBELLES[kind]
                 })
             
-            df_conflits = pd.DataFrame(conflit_data)
-            st.dataframe(df_conflits, hide_index=True)
-        else:
-            st.success("✅ Aucun conflit de salle détecté")
+            if conflit_data:
+                st.dataframe(pd.DataFrame(conflit_data), hide_index=True)
+            else:
+                st.success(message_ok)
         
         # Conflits de capacité
         st.subheader("👥 Conflits de Capacité")
         
-        cursor.execute("""
-            SELECT 
-                e.id,
-                m.nom as module_nom,
-                g.nom as groupe_nom,
-                g.effectif,
-                s.nom as salle_nom,
-                s.capacite,
-                CASE 
-                    WHEN g.effectif > s.capacite THEN 'Dépassement'
-                    WHEN g.effectif > s.capacite * 0.9 THEN 'Proche limite'
-                    ELSE 'OK'
-                END as etat
-            FROM examens e
-            JOIN modules m ON e.module_id = m.id
-            JOIN groupes g ON e.groupe_id = g.id
-            LEFT JOIN salles s ON e.salle_id = s.id
-            WHERE e.statut IN ('EN_ATTENTE', 'CONFIRME')
-            AND s.id IS NOT NULL
-            ORDER BY (g.effectif - s.capacite) DESC
-        """)
-        
-        capacites = cursor.fetchall()
-        
         if capacites:
             cap_data = []
             for cap in capacites:
-                if cap['effectif'] > cap['capacite']:
-                    cap_data.append({
-                        "Module": cap['module_nom'],
-                        "Groupe": cap['groupe_nom'],
-                        "Salle": cap['salle_nom'],
-                        "Effectif": cap['effectif'],
-                        "Capacité": cap['capacite'],
-                        "Déficit": cap['effectif'] - cap['capacite'],
-                        "État": "❌ Dépassement"
-                    })
+                examen = cap['examen']
+                cap_data.append({
+                    "Module": examen['module_nom'],
+                    "Groupe": examen['groupe_nom'],
+                    "Salle": ", ".join(cap['salles']),
+                    "Effectif": cap['effectif'],
+                    "Capacité": cap['capacite'],
+                    "Places": cap['places'],
+                    "Déficit": cap['deficit'],
+                    "État": "❌ Dépassement"
+                })
             
-            if cap_data:
-                df_cap = pd.DataFrame(cap_data)
-                st.dataframe(df_cap, hide_index=True)
-            else:
-                st.success("✅ Aucun problème de capacité détecté")
-        
-        cursor.close()
-        conn.close()
+            df_cap = pd.DataFrame(cap_data)
+            st.dataframe(df_cap, hide_index=True)
+        else:
+            st.success("✅ Aucun problème de capacité détecté")
         
     except Exception as e:
         st.error(f"Erreur: {str(e)}")
@@ -11,10 +11,12 @@ sys.path.append(backend_path)
 try:
     from backend.database import (
         get_connection,
+        RowCursor,
         hash_password,
         verify_password_strength,
         update_user_password
     )
+    from backend.snapshots import load_prof_timetable
     DB_AVAILABLE = True
 except ImportError as e:
     st.error(f"Erreur d'import backend : {e}")
@@ -32,7 +34,7 @@ def show_professor_dashboard():
         if DB_AVAILABLE:
             try:
                 conn = get_connection()
-                cursor = conn.cursor(dictionary=True)
+                cursor = conn.cursor(cursor_factory=RowCursor)
                 cursor.execute("""
                     SELECT p.specialite,
                            d.nom AS departement,
@@ -85,53 +87,69 @@ def show_surveillance(user):
         st.error("❌ Base de données non disponible")
         return
     
+    conn = None
     try:
-        conn = get_connection()
-        cursor = conn.cursor(dictionary=True)
-        
-        # Récupérer l'ID du professeur
-        cursor.execute("SELECT id FROM professeurs WHERE user_id = %s", (user['id'],))
-        prof_info = cursor.fetchone()
-        
-        if not prof_info:
-            st.error("❌ Profil professeur non trouvé")
-            return
-        
-        prof_id = prof_info['id']
-        
-        # Récupérer uniquement les surveillances pour les examens CONFIRMÉS
-        cursor.execute("""
-            SELECT 
-                s.id,
-                s.date_surveillance,
-                s.heure_debut,
-                e.duree_minutes,
-                e.statut as examen_statut,
-                m.nom as module_nom,
-                f.nom as formation_nom,
-                sa.nom as salle_nom,
-                g.nom as groupe_nom,
-                g.effectif,
-                se.nom as session_nom
-            FROM surveillances s
-            JOIN examens e ON s.examen_id = e.id
-            JOIN modules m ON e.module_id = m.id
-            JOIN formations f ON e.formation_id = f.id
-            LEFT JOIN salles sa ON e.salle_id = sa.id
-            LEFT JOIN groupes g ON e.groupe_id = g.id
-            LEFT JOIN sessions_examens se ON e.session_id = se.id
-            WHERE s.prof_id = %s
-            AND e.statut = 'CONFIRME'  -- UNIQUEMENT LES EXAMENS CONFIRMÉS
-            ORDER BY 
-                CASE 
-                    WHEN s.date_surveillance IS NULL THEN 1
-                    ELSE 0
-                END,
-                s.date_surveillance,
-                s.heure_debut
-        """, (prof_id,))
+        # Surveillances publiées (professeur connu depuis la connexion, une lecture par clé primaire) ;
+        # à défaut, surveillances des examens CONFIRMÉS
+        prof_id = user.get('profile_id')
+        snapshot = load_prof_timetable(prof_id)
+        if snapshot is not None:
+            surveillances = snapshot.rows
+            
+            # Calendrier généré à la publication, lu avec l'instantané
+            if snapshot.ics:
+                st.download_button(
+                    "📅 Ajouter à mon agenda (.ics)",
+                    data=snapshot.ics,
+                    file_name=f"surveillances_v{snapshot.version}.ics",
+                    mime="text/calendar"
+                )
+        else:
+            conn = get_connection()
+            cursor = conn.cursor(cursor_factory=RowCursor)
+            
+            # Récupérer l'ID du professeur
+            cursor.execute("SELECT id FROM professeurs WHERE user_id = %s", (user['id'],))
+            prof_info = cursor.fetchone()
+            
+            if not prof_info:
+                st.error("❌ Profil professeur non trouvé")
+                return
+            
+            prof_id = prof_info['id']
+            
+            cursor.execute("""
+                SELECT 
+                    s.id,
+                    s.date_surveillance,
+                    s.heure_debut,
+                    e.duree_minutes,
+                    e.statut as examen_statut,
+                    m.nom as module_nom,
+                    f.nom as formation_nom,
+                    sa.nom as salle_nom,
+                    g.nom as groupe_nom,
+                    g.effectif,
+                    se.nom as session_nom
+                FROM surveillances s
+                JOIN examens e ON s.examen_id = e.id
+                JOIN modules m ON e.module_id = m.id
+                JOIN formations f ON e.formation_id = f.id
+                LEFT JOIN salles sa ON e.salle_id = sa.id
+                LEFT JOIN groupes g ON e.groupe_id = g.id
+                LEFT JOIN sessions_examens se ON e.session_id = se.id
+                WHERE s.prof_id = %s
+                AND e.statut = 'CONFIRME'  -- UNIQUEMENT LES EXAMENS CONFIRMÉS
+                ORDER BY 
+                    CASE 
+                        WHEN s.date_surveillance IS NULL THEN 1
+                        ELSE 0
+                    END,
+                    s.date_surveillance,
+                    s.heure_debut
+            """, (prof_id,))
         
-        surveillances = cursor.fetchall()
+            surveillances = cursor.fetchall()
         
         if not surveillances:
             st.info("📭 Aucune surveillance confirmée pour le moment.")
@@ -317,11 +335,11 @@ def show_surveillance(user):
                 else:
                     st.info(f"**Dans {days_until} jours**")
         
-        cursor.close()
-        conn.close()
-        
     except Exception as e:
         st.error(f"Erreur lors du chargement des surveillances : {str(e)}")
+    finally:
+        if conn:
+            conn.close()
 
 
 def show_professor_profile(user):
@@ -335,7 +353,7 @@ def show_professor_profile(user):
 
     try:
         conn = get_connection()
-        cursor = conn.cursor(dictionary=True)
+        cursor = conn.cursor(cursor_factory=RowCursor)
 
         # Récupérer les informations du professeur
         cursor.execute("""
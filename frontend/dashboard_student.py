@@ -10,10 +10,12 @@ sys.path.append(backend_path)
 try:
     from backend.database import (
         get_connection,
+        RowCursor,
         hash_password,
         verify_password_strength,
         update_user_password
     )
+    from backend.snapshots import load_group_timetable
     DB_AVAILABLE = True
 except ImportError as e:
     st.error(f"Erreur d'import backend : {e}")
@@ -31,7 +33,7 @@ def show_student_dashboard():
         if DB_AVAILABLE:
             try:
                 conn = get_connection()
-                cursor = conn.cursor(dictionary=True)
+                cursor = conn.cursor(cursor_factory=RowCursor)
                 cursor.execute("""
                     SELECT g.nom AS groupe_nom,
                            f.nom AS formation,
@@ -85,64 +87,82 @@ def show_student_exams(user):
         st.error("❌ Base de données non disponible")
         return
     
+    conn = None
     try:
-        conn = get_connection()
-        cursor = conn.cursor(dictionary=True)
-        
-        # 1. Récupérer les informations de l'étudiant (groupe et formation)
-        cursor.execute("""
-            SELECT e.groupe_id, g.nom as groupe_nom, g.formation_id, 
-                   f.nom as formation_nom, d.nom as departement_nom
-            FROM etudiants e
-            JOIN groupes g ON e.groupe_id = g.id
-            JOIN formations f ON g.formation_id = f.id
-            JOIN departements d ON f.departement_id = d.id
-            WHERE e.user_id = %s
-        """, (user['id'],))
-        
-        student_info = cursor.fetchone()
-        
-        if not student_info:
-            st.warning("Informations étudiant non trouvées")
-            return
+        # 1. Emploi du temps publié du groupe (groupe connu depuis la connexion,
+        #    une lecture par clé primaire)
+        snapshot = load_group_timetable(user.get('groupe_id'))
+        if snapshot is not None:
+            exams = snapshot.rows
+            groupe_nom = exams[0]['groupe_nom']
+            formation_nom = exams[0]['formation_nom']
+            formation_id = None
+        else:
+            conn = get_connection()
+            cursor = conn.cursor(cursor_factory=RowCursor)
+            
+            # À défaut : informations de l'étudiant puis examens CONFIRMÉS de son groupe
+            cursor.execute("""
+                SELECT e.groupe_id, g.nom as groupe_nom, g.formation_id, 
+                       f.nom as formation_nom, d.nom as departement_nom
+                FROM etudiants e
+                JOIN groupes g ON e.groupe_id = g.id
+                JOIN formations f ON g.formation_id = f.id
+                JOIN departements d ON f.departement_id = d.id
+                WHERE e.user_id = %s
+            """, (user['id'],))
+            
+            student_info = cursor.fetchone()
+            
+            if not student_info:
+                st.warning("Informations étudiant non trouvées")
+                return
+            
+            groupe_id = student_info['groupe_id']
+            groupe_nom = student_info['groupe_nom']
+            formation_id = student_info['formation_id']
+            formation_nom = student_info['formation_nom']
+            
+            cursor.execute("""
+                SELECT e.*, 
+                       m.nom as module_nom,
+                       f.nom as formation_nom,
+                       s.nom as salle_nom,
+                       g.nom as groupe_nom,
+                       se.nom as session_nom,
+                       u.email as professeur_surveillant
+                FROM examens e
+                JOIN modules m ON e.module_id = m.id
+                JOIN formations f ON e.formation_id = f.id
+                JOIN groupes g ON e.groupe_id = g.id
+                JOIN sessions_examens se ON e.session_id = se.id
+                LEFT JOIN salles s ON e.salle_id = s.id
+                LEFT JOIN surveillances sv ON e.id = sv.examen_id
+                LEFT JOIN professeurs p ON sv.prof_id = p.id
+                LEFT JOIN users u ON p.user_id = u.id
+                WHERE e.groupe_id = %s 
+                AND e.statut = 'CONFIRME'  -- SEULEMENT LES EXAMENS CONFIRMÉS
+                ORDER BY 
+                    CASE 
+                        WHEN e.date_examen IS NULL THEN 1
+                        ELSE 0
+                    END,
+                    e.date_examen,
+                    e.heure_debut
+            """, (groupe_id,))
         
-        groupe_id = student_info['groupe_id']
-        groupe_nom = student_info['groupe_nom']
-        formation_id = student_info['formation_id']
-        formation_nom = student_info['formation_nom']
+            exams = cursor.fetchall()
         
         st.info(f"**Formation :** {formation_nom} | **Groupe :** {groupe_nom}")
         
-        # 2. Récupérer uniquement les examens CONFIRMÉS de son groupe
-        cursor.execute("""
-            SELECT e.*, 
-                   m.nom as module_nom,
-                   f.nom as formation_nom,
-                   s.nom as salle_nom,
-                   g.nom as groupe_nom,
-                   se.nom as session_nom,
-                   u.email as professeur_surveillant
-            FROM examens e
-            JOIN modules m ON e.module_id = m.id
-            JOIN formations f ON e.formation_id = f.id
-            JOIN groupes g ON e.groupe_id = g.id
-            JOIN sessions_examens se ON e.session_id = se.id
-            LEFT JOIN salles s ON e.salle_id = s.id
-            LEFT JOIN surveillances sv ON e.id = sv.examen_id
-            LEFT JOIN professeurs p ON sv.prof_id = p.id
-            LEFT JOIN users u ON p.user_id = u.id
-            WHERE e.groupe_id = %s 
-            AND e.statut = 'CONFIRME'  -- SEULEMENT LES EXAMENS CONFIRMÉS
-            ORDER BY 
-                CASE 
-                    WHEN e.date_examen IS NULL THEN 1
-                    ELSE 0
-                END,
-                e.date_examen,
-                e.heure_debut
-        """, (groupe_id,))
-        
-        exams = cursor.fetchall()
+        # 2. Calendrier généré à la publication, lu avec l'instantané
+        if snapshot is not None and snapshot.ics:
+            st.download_button(
+                "📅 Ajouter à mon agenda (.ics)",
+                data=snapshot.ics,
+                file_name=f"examens_{groupe_nom}_v{snapshot.version}.ics",
+                mime="text/calendar"
+            )
         
         if not exams:
             st.info("📭 Aucun examen confirmé pour votre groupe pour le moment.")
@@ -243,6 +263,9 @@ def show_student_exams(user):
       
     except Exception as e:
         st.error(f"Erreur lors du chargement des examens : {str(e)}")
+    finally:
+        if conn:
+            conn.close()
 
 
 def show_student_profile(user):
@@ -256,7 +279,7 @@ def show_student_profile(user):
 
     try:
         conn = get_connection()
-        cursor = conn.cursor(dictionary=True)
+        cursor = conn.cursor(cursor_factory=RowCursor)
 
         cursor.execute("""
             SELECT 
@@ -1,8 +1,17 @@
 
 import streamlit as st
-from backend.database import get_connection
+from backend.database import get_connection, RowCursor
+from backend.snapshots import safe_publish_snapshots
+from backend.stats import (
+    refresh_stats, fetch_totaux, fetch_stats_departements, fetch_stats_sessions
+)
+from backend.validation import (
+    fetch_validation_summary, fetch_validation_details, fetch_examens_par_statut
+)
 import pandas as pd
 
+STATUT_ICONS = {"EN_ATTENTE": "⏳", "CONFIRME": "✅", "REFUSE": "❌", "VALIDE": "🏆"}
+
 def show_vicedoyen_dashboard():
     """Dashboard spécifique au Vice-Doyen"""
     user = st.session_state.user
@@ -42,7 +51,7 @@ def show_final_validation_section(user):
         return
     
     try:
-        cursor = conn.cursor(dictionary=True)
+        cursor = conn.cursor(cursor_factory=RowCursor)
         
         # Récupérer toutes les sessions
         cursor.execute("""
@@ -104,53 +113,21 @@ def show_final_validation_section(user):
             show_exams = True
         
         if show_exams:
-            # Récupérer tous les examens de la session groupés par formation
-            cursor.execute("""
-                SELECT 
-                    f.nom as formation_nom,
-                    d.nom as departement_nom,
-                    g.nom as groupe_nom,
-                    g.effectif as groupe_effectif,
-                    m.nom as module_nom,
-                    e.date_examen,
-                    e.heure_debut,
-                    e.duree_minutes,
-                    s.nom as salle_nom,
-                    u.email as professeur_email,
-                    e.statut as examen_statut,
-                    COUNT(e.id) OVER(PARTITION BY f.id, g.id) as nb_examens_groupe,
-                    COUNT(e.id) OVER(PARTITION BY f.id) as nb_examens_formation
-                FROM examens e
-                JOIN modules m ON e.module_id = m.id
-                JOIN formations f ON e.formation_id = f.id
-                JOIN departements d ON f.departement_id = d.id
-                JOIN groupes g ON e.groupe_id = g.id
-                LEFT JOIN salles s ON e.salle_id = s.id
-                LEFT JOIN surveillances sv ON e.id = sv.examen_id
-                LEFT JOIN professeurs p ON sv.prof_id = p.id
-                LEFT JOIN users u ON p.user_id = u.id
-                WHERE e.session_id = %s
-                ORDER BY 
-                    d.nom,
-                    f.nom,
-                    g.nom,
-                    e.date_examen,
-                    e.heure_debut
-            """, (session_id,))
-            
-            examens = cursor.fetchall()
+            # Compteurs par département / formation / groupe (GROUP BY ROLLUP côté SQL)
+            summary = fetch_validation_summary(session_id)
             
-            if not examens:
+            if not summary:
                 st.info("📭 Aucun examen pour cette session")
                 cursor.close()
                 conn.close()
                 return
             
             # Statistiques globales
-            total_examens = len(examens)
-            examens_confirme = len([e for e in examens if e['examen_statut'] == 'CONFIRME'])
-            examens_attente = len([e for e in examens if e['examen_statut'] == 'EN_ATTENTE'])
-            examens_refuse = len([e for e in examens if e['examen_statut'] == 'REFUSE'])
+            totaux = summary["total"]
+            total_examens = totaux['nb_examens']
+            examens_confirme = totaux['nb_confirmes']
+            examens_attente = totaux['nb_en_attente']
+            examens_refuse = totaux['nb_refuses']
             
             col1, col2, col3, col4 = st.columns(4)
             with col1:
@@ -163,95 +140,68 @@ def show_final_validation_section(user):
             with col4:
                 st.metric("Refusés", examens_refuse)
             
-            # Afficher par département
-            departements = {}
-            for examen in examens:
-                dept = examen['departement_nom']
-                if dept not in departements:
-                    departements[dept] = []
-                departements[dept].append(examen)
+            # Vue d'ensemble des départements (lignes agrégées uniquement)
+            st.markdown("---")
+            departements = summary["departements"]
+            st.dataframe(
+                pd.DataFrame([dept["ligne"] for dept in departements])[
+                    ['departement_nom', 'nb_examens', 'nb_confirmes', 'nb_en_attente', 'nb_refuses', 'nb_valides']
+                ],
+                column_config={
+                    "departement_nom": "Département",
+                    "nb_examens": "Examens",
+                    "nb_confirmes": "✅ Confirmés",
+                    "nb_en_attente": "⏳ En attente",
+                    "nb_refuses": "❌ Refusés",
+                    "nb_valides": "🏆 Validés"
+                },
+                hide_index=True,
+                use_container_width=True
+            )
             
-            # Parcourir chaque département
-            for dept_nom, dept_examens in departements.items():
-                st.markdown("---")
-                st.subheader(f"🏛️ Département: {dept_nom}")
-                
-                # Regrouper par formation dans ce département
-                formations_dict = {}
-                for examen in dept_examens:
-                    formation = examen['formation_nom']
-                    if formation not in formations_dict:
-                        formations_dict[formation] = []
-                    formations_dict[formation].append(examen)
-                
-                # Parcourir chaque formation
-                for formation_nom, formation_examens in formations_dict.items():
-                    with st.expander(f"🎓 {formation_nom} ({len(formation_examens)} examens)", expanded=True):
-                        # Regrouper par groupe dans cette formation
-                        groupes_dict = {}
-                        for examen in formation_examens:
-                            groupe = examen['groupe_nom']
-                            if groupe not in groupes_dict:
-                                groupes_dict[groupe] = []
-                            groupes_dict[groupe].append(examen)
+            # Seul le département choisi est chargé et affiché en détail
+            dept_index = st.selectbox(
+                "Département à détailler:",
+                range(len(departements)),
+                format_func=lambda i: f"🏛️ {departements[i]['ligne']['departement_nom']} "
+                                      f"({departements[i]['ligne']['nb_examens']} examens)",
+                key=f"validation_dept_{session_id}"
+            )
+            dept = departements[dept_index]
+            
+            st.subheader(f"🏛️ Département: {dept['ligne']['departement_nom']}")
+            details = pd.DataFrame(fetch_validation_details(session_id, dept['ligne']['departement_id']))
+            if details.empty:
+                st.info("📭 Aucun examen pour ce département")
+                details = pd.DataFrame(columns=['formation_id', 'groupe_nom', 'statut'])
+            details['Statut'] = details['statut'].map(lambda statut: f"{STATUT_ICONS.get(statut, '')} {statut}")
+            details_par_groupe = {cle: groupe_examens for cle, groupe_examens in details.groupby(['formation_id', 'groupe_nom'], sort=False)}
+            
+            for formation in dept["formations"]:
+                ligne = formation["ligne"]
+                with st.expander(f"🎓 {ligne['formation_nom']} ({ligne['nb_examens']} examens)", expanded=False):
+                    for groupe in formation["groupes"]:
+                        effectif = f" ({groupe['groupe_effectif']} étudiants)" if groupe['groupe_effectif'] is not None else ""
+                        st.markdown(f"**Groupe: {groupe['groupe_nom']}**{effectif}")
                         
-                        # Afficher chaque groupe
-                        for groupe_nom, groupe_examens in groupes_dict.items():
-                            st.markdown(f"**Groupe: {groupe_nom}** ({groupe_examens[0]['groupe_effectif']} étudiants)")
-                            
-                            # Préparer les données pour le tableau
-                            table_data = []
-                            for examen in groupe_examens:
-                                # Formater la date
-                                date_formatted = ""
-                                if examen['date_examen']:
-                                    from datetime import datetime
-                                    if isinstance(examen['date_examen'], str):
-                                        try:
-                                            date_obj = datetime.strptime(examen['date_examen'], '%Y-%m-%d').date()
-                                        except:
-                                            date_obj = examen['date_examen']
-                                    else:
-                                        date_obj = examen['date_examen']
-                                    date_formatted = date_obj.strftime('%d/%m/%Y') if hasattr(date_obj, 'strftime') else str(date_obj)
-                                
-                                # Statut avec icône
-                                statut_icon = ""
-                                if examen['examen_statut'] == 'EN_ATTENTE':
-                                    statut_icon = "⏳"
-                                elif examen['examen_statut'] == 'CONFIRME':
-                                    statut_icon = "✅"
-                                elif examen['examen_statut'] == 'REFUSE':
-                                    statut_icon = "❌"
-                                elif examen['examen_statut'] == 'VALIDE':
-                                    statut_icon = "🏆"
-                                
-                                table_data.append({
-                                    "Module": examen['module_nom'],
-                                    "Date": date_formatted,
-                                    "Heure": examen['heure_debut'] if examen['heure_debut'] else "",
-                                    "Durée": f"{examen['duree_minutes']} min" if examen['duree_minutes'] else "N/A",
-                                    "Salle": examen['salle_nom'] or "Non assignée",
-                                    "Surveillant": examen['professeur_email'] or "Non assigné",
-                                    "Statut": f"{statut_icon} {examen['examen_statut']}"
-                                })
-                            
-                            # Afficher le tableau
-                            df_groupe = pd.DataFrame(table_data)
-                            st.dataframe(
-                                df_groupe,
-                                column_config={
-                                    "Module": st.column_config.TextColumn("Module", width="large"),
-                                    "Date": st.column_config.TextColumn("Date", width="small"),
-                                    "Heure": st.column_config.TextColumn("Heure", width="small"),
-                                    "Durée": st.column_config.TextColumn("Durée", width="small"),
-                                    "Salle": st.column_config.TextColumn("Salle", width="small"),
-                                    "Surveillant": st.column_config.TextColumn("Surveillant", width="medium"),
-                                    "Statut": st.column_config.TextColumn("Statut", width="small")
-                                },
-                                hide_index=True,
-                                use_container_width=True
-                            )
+                        groupe_examens = details_par_groupe.get((ligne['formation_id'], groupe['groupe_nom']))
+                        if groupe_examens is None:
+                            continue
+                        st.dataframe(
+                            groupe_examens[['module_nom', 'date_examen', 'heure_debut', 'duree',
+                                            'salle_nom', 'surveillants', 'Statut']],
+                            column_config={
+                                "module_nom": st.column_config.TextColumn("Module", width="large"),
+                                "date_examen": st.column_config.TextColumn("Date", width="small"),
+                                "heure_debut": st.column_config.TextColumn("Heure", width="small"),
+                                "duree": st.column_config.TextColumn("Durée", width="small"),
+                                "salle_nom": st.column_config.TextColumn("Salle", width="small"),
+                                "surveillants": st.column_config.TextColumn("Surveillant", width="medium"),
+                                "Statut": st.column_config.TextColumn("Statut", width="small")
+                            },
+                            hide_index=True,
+                            use_container_width=True
+                        )
             
             # Bouton de validation finale
             st.markdown("---")
@@ -271,35 +221,29 @@ def show_final_validation_section(user):
                     # Afficher les détails des problèmes
                     if examens_attente > 0:
                         with st.expander("📋 Voir les examens en attente"):
-                            attente_data = []
-                            for examen in examens:
-                                if examen['examen_statut'] == 'EN_ATTENTE':
-                                    attente_data.append({
-                                        "Département": examen['departement_nom'],
-                                        "Formation": examen['formation_nom'],
-                                        "Groupe": examen['groupe_nom'],
-                                        "Module": examen['module_nom']
-                                    })
-                            
-                            if attente_data:
-                                df_attente = pd.DataFrame(attente_data)
-                                st.dataframe(df_attente, hide_index=True)
+                            st.dataframe(
+                                pd.DataFrame(fetch_examens_par_statut(session_id, 'EN_ATTENTE')),
+                                column_config={
+                                    "departement_nom": "Département",
+                                    "formation_nom": "Formation",
+                                    "groupe_nom": "Groupe",
+                                    "module_nom": "Module"
+                                },
+                                hide_index=True
+                            )
                     
                     if examens_refuse > 0:
                         with st.expander("📋 Voir les examens refusés"):
-                            refuse_data = []
-                            for examen in examens:
-                                if examen['examen_statut'] == 'REFUSE':
-                                    refuse_data.append({
-                                        "Département": examen['departement_nom'],
-                                        "Formation": examen['formation_nom'],
-                                        "Groupe": examen['groupe_nom'],
-                                        "Module": examen['module_nom']
-                                    })
-                            
-                            if refuse_data:
-                                df_refuse = pd.DataFrame(refuse_data)
-                                st.dataframe(df_refuse, hide_index=True)
+                            st.dataframe(
+                                pd.DataFrame(fetch_examens_par_statut(session_id, 'REFUSE')),
+                                column_config={
+                                    "departement_nom": "Département",
+                                    "formation_nom": "Formation",
+                                    "groupe_nom": "Groupe",
+                                    "module_nom": "Module"
+                                },
+                                hide_index=True
+                            )
                 else:
                     # Tous les examens sont confirmés, permettre la validation finale
                     st.success(f"""
@@ -360,6 +304,7 @@ def show_final_validation_section(user):
                               f"Validation finale session {session_id}. Commentaire: {commentaire or 'Aucun'}"))
                         
                         conn.commit()
+                        refresh_stats()
                         
                         st.success(f"🏆 Session **{session_info['nom']}** validée finalement avec succès!")
                         st.balloons()
@@ -388,6 +333,9 @@ def show_final_validation_section(user):
                             WHERE id = %s
                         """, (session_id,))
                         
+                        # Emplois du temps des groupes et surveillants, calculés une fois
+                        safe_publish_snapshots(cursor, session_id)
+                        
                         conn.commit()
                         
                         st.success(f"📢 Session **{session_info['nom']}** publiée aux étudiants!")
@@ -403,70 +351,44 @@ def show_global_statistics_section(user):
     """Section de statistiques globales pour le vice-doyen"""
     st.header("📊 Statistiques Globales")
     
-    conn = get_connection()
-    if not conn:
+    # Lecture de la vue matérialisée des statistiques (pas d'agrégation sur examens)
+    totaux = fetch_totaux()
+    if not totaux:
         st.error("Impossible de se connecter à la base de données")
         return
     
     try:
-        cursor = conn.cursor(dictionary=True)
-        
         # Statistiques globales
         st.subheader("📈 Vue d'ensemble de l'établissement")
         
         col1, col2, col3, col4 = st.columns(4)
         
         with col1:
-            cursor.execute("SELECT COUNT(*) as total FROM departements")
-            total_departements = cursor.fetchone()['total']
-            st.metric("Départements", total_departements)
+            st.metric("Départements", totaux['departements'])
         
         with col2:
-            cursor.execute("SELECT COUNT(*) as total FROM formations")
-            total_formations = cursor.fetchone()['total']
-            st.metric("Formations", total_formations)
+            st.metric("Formations", totaux['formations'])
         
         with col3:
-            cursor.execute("SELECT COUNT(*) as total FROM groupes")
-            total_groupes = cursor.fetchone()['total']
-            st.metric("Groupes", total_groupes)
+            st.metric("Groupes", totaux['groupes'])
         
         with col4:
-            cursor.execute("SELECT COUNT(*) as total FROM examens")
-            total_examens = cursor.fetchone()['total']
-            st.metric("Examens totaux", total_examens)
+            st.metric("Examens totaux", totaux['examens'])
         
         # Statistiques par département
         st.subheader("🏛️ Examens par département")
         
-        cursor.execute("""
-            SELECT 
-                d.nom as departement,
-                COUNT(e.id) as total_examens,
-                SUM(CASE WHEN e.statut = 'VALIDE' THEN 1 ELSE 0 END) as valides,
-                SUM(CASE WHEN e.statut = 'CONFIRME' THEN 1 ELSE 0 END) as confirmes,
-                SUM(CASE WHEN e.statut = 'EN_ATTENTE' THEN 1 ELSE 0 END) as en_attente,
-                SUM(CASE WHEN e.statut = 'REFUSE' THEN 1 ELSE 0 END) as refuses
-            FROM departements d
-            LEFT JOIN formations f ON d.id = f.departement_id
-            LEFT JOIN examens e ON f.id = e.formation_id
-            GROUP BY d.id, d.nom
-            ORDER BY d.nom
-        """)
-        
-        stats_departements = cursor.fetchall()
+        stats_departements = fetch_stats_departements()
         
         if stats_departements:
             df_departements = pd.DataFrame(stats_departements)
             
             # Calculer les pourcentages
-            for idx, row in df_departements.iterrows():
-                total = row['total_examens']
-                if total > 0:
-                    df_departements.loc[idx, 'valide_pct'] = (row['valides'] / total * 100)
-                    df_departements.loc[idx, 'confirme_pct'] = (row['confirmes'] / total * 100)
-                    df_departements.loc[idx, 'attente_pct'] = (row['en_attente'] / total * 100)
-                    df_departements.loc[idx, 'refuse_pct'] = (row['refuses'] / total * 100)
+            total = df_departements['total_examens'].where(df_departements['total_examens'] > 0)
+            df_departements['valide_pct'] = df_departements['valides'] / total * 100
+            df_departements['confirme_pct'] = df_departements['confirmes'] / total * 100
+            df_departements['attente_pct'] = df_departements['en_attente'] / total * 100
+            df_departements['refuse_pct'] = df_departements['refuses'] / total * 100
             
             # Afficher le tableau
             st.dataframe(
@@ -485,23 +407,7 @@ def show_global_statistics_section(user):
         # Sessions en cours
         st.subheader("📅 Sessions d'examens")
         
-        cursor.execute("""
-            SELECT 
-                s.nom,
-                s.date_debut,
-                s.date_fin,
-                s.statut,
-                COUNT(e.id) as nb_examens,
-                SUM(CASE WHEN e.statut = 'VALIDE' THEN 1 ELSE 0 END) as valides,
-                SUM(CASE WHEN e.statut = 'CONFIRME' THEN 1 ELSE 0 END) as confirmes
-            FROM sessions_examens s
-            LEFT JOIN examens e ON s.id = e.session_id
-            GROUP BY s.id, s.nom, s.date_debut, s.date_fin, s.statut
-            ORDER BY s.date_debut DESC
-            LIMIT 10
-        """)
-        
-        sessions = cursor.fetchall()
+        sessions = fetch_stats_sessions(limit=10)
         
         if sessions:
             sessions_data = []
@@ -518,7 +424,7 @@ def show_global_statistics_section(user):
                     "Session": session['nom'],
                     "Période": f"{session['date_debut']} au {session['date_fin']}",
                     "Statut": f"{status_icon} {session['statut']}",
-                    "Examens": session['nb_examens'],
+                    "Examens": session['total_examens'],
                     "Validés": session['valides'],
                     "Confirmés": session['confirmes']
                 })
@@ -537,8 +443,5 @@ def show_global_statistics_section(user):
                 hide_index=True
             )
         
-        cursor.close()
-        conn.close()
-        
     except Exception as e:
         st.error(f"Erreur lors du chargement des statistiques: {str(e)}")
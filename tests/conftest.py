@@ -0,0 +1,6 @@
+# tests/conftest.py - CONFIGURATION DES TESTS
+import os
+import sys
+
+# Les tests importent backend.* depuis la racine du projet
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,69 @@
+# tests/test_bulk_insert.py - TESTS DE L'INSERTION DES EXAMENS PAR LOTS
+from datetime import date
+
+import pytest
+
+from backend import database
+from backend.database import EXAMEN_COLUMNS, _copy_value, bulk_insert_examens
+
+
+class FakeCursor:
+    def __init__(self):
+        self.copied = None
+
+    def copy_expert(self, sql, buffer):
+        self.copied = (sql, buffer.read())
+
+
+@pytest.fixture
+def values_calls(monkeypatch):
+    calls = []
+
+    def execute_values(cursor, query, rows, page_size=100, fetch=False):
+        calls.append((query, list(rows), page_size, fetch))
+        return [(i + 1,) for i in range(len(rows))] if fetch else None
+
+    monkeypatch.setattr(database, "execute_values", execute_values)
+    monkeypatch.setattr(database, "COPY_THRESHOLD", 3)
+    return calls
+
+
+def _rows(n):
+    return [(1, 2, date(2025, 1, 6), None, None, 120, None, 'EN_ATTENTE', 3, 4, None)] * n
+
+
+def test_small_batches_use_insert_values(values_calls):
+    cursor = FakeCursor()
+    assert bulk_insert_examens(cursor, _rows(2), page_size=500) == []
+    assert len(values_calls) == 1
+    assert values_calls[0][0].startswith(f"INSERT INTO examens ({', '.join(EXAMEN_COLUMNS)})")
+    assert values_calls[0][2] == 500
+    assert cursor.copied is None
+
+
+def test_large_batches_switch_to_copy(values_calls):
+    cursor = FakeCursor()
+    bulk_insert_examens(cursor, _rows(3))
+    assert values_calls == []
+    sql, data = cursor.copied
+    assert sql.startswith("COPY examens (")
+    assert data.count("\n") == 3
+    assert data.splitlines()[0].split("\t")[2] == "2025-01-06"
+
+
+def test_returning_forces_insert_values(values_calls):
+    assert bulk_insert_examens(FakeCursor(), _rows(5), returning=True) == [1, 2, 3, 4, 5]
+    assert values_calls[0][0].endswith("RETURNING id")
+    with pytest.raises(ValueError):
+        bulk_insert_examens(FakeCursor(), _rows(1), method="copy", returning=True)
+
+
+def test_no_rows_no_query(values_calls):
+    cursor = FakeCursor()
+    assert bulk_insert_examens(cursor, []) == []
+    assert values_calls == [] and cursor.copied is None
+
+
+def test_copy_values_are_escaped():
+    assert _copy_value(None) == "\\N"
+    assert _copy_value("a\tb\nc\\d") == "a\\tb\\nc\\\\d"
@@ -0,0 +1,78 @@
+# tests/test_cache.py - TESTS DU CACHE DES DONNÉES DE RÉFÉRENCE
+import pytest
+
+from backend import cache
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+def _counting_loader(value):
+    calls = []
+
+    def loader():
+        calls.append(1)
+        return value
+    return loader, calls
+
+
+def test_value_is_loaded_once_until_invalidated():
+    loader, calls = _counting_loader(["A"])
+    assert cache.get_or_load("formations", "k", loader) == ["A"]
+    assert cache.get_or_load("formations", "k", loader) == ["A"]
+    assert len(calls) == 1
+
+    cache.invalidate("formations")
+    cache.get_or_load("formations", "k", loader)
+    assert len(calls) == 2
+
+
+def test_invalidation_only_affects_its_namespace():
+    formations, formation_calls = _counting_loader(["F"])
+    salles, salle_calls = _counting_loader(["S"])
+    cache.get_or_load("formations", "k", formations)
+    cache.get_or_load("salles", "k", salles)
+
+    cache.invalidate("formations")
+    cache.get_or_load("formations", "k", formations)
+    cache.get_or_load("salles", "k", salles)
+    assert (len(formation_calls), len(salle_calls)) == (2, 1)
+
+
+def test_entry_expires_after_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache.time, "monotonic", lambda: now[0])
+    loader, calls = _counting_loader(["A"])
+    cache.get_or_load("salles", "k", loader, ttl=10)
+    now[0] += 9
+    cache.get_or_load("salles", "k", loader, ttl=10)
+    now[0] += 2
+    cache.get_or_load("salles", "k", loader, ttl=10)
+    assert len(calls) == 2
+
+
+def test_empty_results_are_not_cached():
+    loader, calls = _counting_loader([])
+    cache.get_or_load("salles", "k", loader)
+    cache.get_or_load("salles", "k", loader)
+    assert len(calls) == 2
+
+
+def test_decorator_keys_by_arguments_and_returns_copies():
+    calls = []
+
+    @cache.cached("groupes")
+    def fetch(formation_id):
+        calls.append(formation_id)
+        return [formation_id]
+
+    first = fetch(1)
+    first.append("modifié")
+    assert fetch(1) == [1]
+    assert fetch(2) == [2]
+    assert calls == [1, 2]
+    assert fetch.uncached(1) == [1]
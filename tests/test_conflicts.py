@@ -0,0 +1,53 @@
+# tests/test_conflicts.py - TESTS DU BALAYAGE DES INTERVALLES
+from datetime import date, time
+
+from backend.conflict_graph import build_conflict_graph
+from backend.conflicts import GROUPE, PROF, detect_graph_conflicts, find_overlaps
+
+
+def test_find_overlaps_reports_each_overlapping_pair_once():
+    overlaps = find_overlaps([
+        ("S1", 1, 0, 10),
+        ("S1", 2, 5, 15),
+        ("S1", 3, 8, 9),
+    ])
+    assert sorted(overlaps) == sorted([
+        ("S1", 1, 2, 5, 10),
+        ("S1", 1, 3, 8, 9),
+        ("S1", 2, 3, 8, 9),
+    ])
+
+
+def test_find_overlaps_ignores_touching_intervals():
+    assert find_overlaps([("S1", 1, 0, 10), ("S1", 2, 10, 20)]) == []
+
+
+def test_find_overlaps_keeps_resources_apart():
+    overlaps = find_overlaps([
+        ("S1", 1, 0, 10),
+        ("S2", 2, 0, 10),
+        ("S2", 3, 5, 6),
+    ])
+    assert overlaps == [("S2", 2, 3, 5, 6)]
+
+
+def _examen(id, module_id, groupe_id, heure):
+    return {'id': id, 'session_id': 1, 'module_id': module_id, 'groupe_id': groupe_id,
+            'date_examen': date(2025, 1, 6), 'heure_debut': time(heure), 'duree_minutes': 120}
+
+
+def test_detect_graph_conflicts_only_reports_simultaneous_neighbours():
+    examens = [
+        _examen(1, 10, 1, 8),
+        _examen(2, 11, 1, 9),    # même groupe, chevauche 1
+        _examen(3, 12, 2, 8),    # autre groupe, même surveillant que 1
+        _examen(4, 13, 1, 14),   # même groupe, plus tard
+        _examen(5, 10, 1, 8),    # même module réparti sur une autre salle
+    ]
+    graph = build_conflict_graph([e['id'] for e in examens], [e['groupe_id'] for e in examens],
+                                 {1: 30, 2: 25}, surveillances=[(1, 7), (3, 7)])
+
+    conflicts = detect_graph_conflicts(examens, {1: graph})
+
+    found = sorted((c.kind, c.exam_a, c.exam_b, c.shared) for c in conflicts)
+    assert found == [(GROUPE, 1, 2, 30), (GROUPE, 2, 5, 30), (PROF, 1, 3, 1)]
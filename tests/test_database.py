@@ -0,0 +1,30 @@
+# tests/test_database.py - TESTS DES LIGNES DE RowCursor
+import pytest
+
+from backend.database import _row_class
+
+
+def test_row_supports_name_attribute_and_position_access():
+    row = _row_class(("id", "nom"))._make((7, "Analyse"))
+    assert row["nom"] == "Analyse"
+    assert row.nom == "Analyse"
+    assert row[0] == 7
+    assert tuple(row) == (7, "Analyse")
+    assert row.get("absent", "-") == "-"
+    assert row.keys() == ["id", "nom"]
+
+
+def test_duplicate_column_name_returns_the_first_column():
+    row = _row_class(("id", "nom", "id"))._make((1, "A", 2))
+    assert row["id"] == 1
+    assert row[2] == 2
+
+
+def test_unknown_column_raises_key_error():
+    row = _row_class(("id",))._make((1,))
+    with pytest.raises(KeyError):
+        row["nom"]
+
+
+def test_row_class_is_shared_between_queries():
+    assert _row_class(("id", "nom")) is _row_class(("id", "nom"))
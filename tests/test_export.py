@@ -0,0 +1,69 @@
+# tests/test_export.py - TESTS DE L'EXPORT DES SESSIONS
+import os
+
+import pytest
+
+from backend import export
+
+ROWS = [(1, "L3 Info", "G1", "Analyse", None, None, None, 120, "A1", "CONFIRME")]
+
+
+@pytest.fixture
+def session(monkeypatch, tmp_path):
+    state = {"version": 1, "reads": 0}
+
+    def chunks(session_id):
+        state["reads"] += 1
+        yield ROWS
+
+    monkeypatch.setattr(export, "EXPORT_DIR", str(tmp_path))
+    monkeypatch.setattr(export, "session_version", lambda session_id: state["version"])
+    monkeypatch.setattr(export, "iter_session_chunks", chunks)
+    return state
+
+
+def test_csv_export_is_written_once_per_version(session, tmp_path):
+    first = export.export_session(3, "csv")
+    assert first["success"]
+    assert os.path.basename(first["path"]) == "session_3_v1.csv"
+    with open(first["path"], encoding="utf-8-sig") as f:
+        assert f.readline().strip() == ",".join(export.COLUMNS)
+
+    assert export.export_session(3, "csv")["path"] == first["path"]
+    assert session["reads"] == 1
+
+
+def test_new_version_replaces_the_old_file(session, tmp_path):
+    export.export_session(3, "csv")
+    session["version"] = 2
+    result = export.export_session(3, "csv")
+    assert sorted(os.listdir(tmp_path)) == ["session_3_v2.csv"]
+    assert result["version"] == 2
+
+
+def test_database_error_leaves_no_partial_file(session, monkeypatch, tmp_path):
+    def failing(chunks, path):
+        with open(path, "w") as f:
+            f.write("partiel")
+        raise OSError("disque plein")
+    monkeypatch.setitem(export._WRITERS, "csv", failing)
+
+    result = export.export_session(3, "csv")
+    assert not result["success"]
+    assert os.listdir(tmp_path) == []
+
+
+def test_unexpected_error_is_raised_after_cleanup(session, monkeypatch, tmp_path):
+    def interrupted(chunks, path):
+        raise KeyboardInterrupt
+    monkeypatch.setitem(export._WRITERS, "csv", interrupted)
+
+    with pytest.raises(KeyboardInterrupt):
+        export.export_session(3, "csv")
+    assert os.listdir(tmp_path) == []
+
+
+def test_unknown_format_and_session(session):
+    assert not export.export_session(3, "pdf")["success"]
+    session["version"] = None
+    assert export.export_session(3, "csv")["message"] == "Session non trouvée"
@@ -0,0 +1,27 @@
+# tests/test_ics.py - TESTS DU PLIAGE DES LIGNES ICS
+from backend.ics import _fold
+
+
+def _unfold(text):
+    return text.replace("\r\n ", "")
+
+
+def test_short_line_is_unchanged():
+    assert _fold("SUMMARY:Analyse") == "SUMMARY:Analyse"
+
+
+def test_long_line_is_folded_at_75_bytes():
+    line = "DESCRIPTION:" + "x" * 200
+    folded = _fold(line)
+    parts = folded.split("\r\n")
+    assert all(len(part.encode("utf-8")) <= 75 for part in parts)
+    assert all(part.startswith(" ") for part in parts[1:])
+    assert _unfold(folded) == line
+
+
+def test_multibyte_characters_are_never_cut():
+    line = "SUMMARY:" + "é" * 80
+    folded = _fold(line)
+    for part in folded.split("\r\n"):
+        assert len(part.encode("utf-8")) <= 75
+    assert _unfold(folded) == line
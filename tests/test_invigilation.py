@@ -0,0 +1,67 @@
+# tests/test_invigilation.py - TESTS DE L'AFFECTATION DES SURVEILLANTS
+from datetime import datetime
+
+from backend.invigilation import Duty, InvigilationPlanner, Invigilator, surveillants_requis
+
+
+def _duty(key, jour, heure, departement_id=1, duree=2):
+    start = datetime(2025, 1, jour, heure)
+    return Duty(key, 100 + key, departement_id, start, start.replace(hour=heure + duree))
+
+
+def _prof_intervals(plan, duties):
+    by_key = {duty.key: duty for duty in duties}
+    intervals = {}
+    for key, prof_id in plan.prof_of.items():
+        intervals.setdefault(prof_id, []).append((by_key[key].start, by_key[key].end))
+    return intervals
+
+
+def test_no_invigilator_has_two_overlapping_duties():
+    duties = [_duty(k, 6, 8) for k in range(3)] + [_duty(3 + k, 6, 9) for k in range(2)]
+    plan = InvigilationPlanner(duties, [Invigilator(p, 1) for p in range(1, 6)]).solve(0.1)
+
+    assert plan.unassigned == []
+    for intervals in _prof_intervals(plan, duties).values():
+        intervals.sort()
+        for (_, end), (start, _) in zip(intervals, intervals[1:]):
+            assert end <= start
+
+
+def test_busy_unavailable_and_daily_limit_are_respected():
+    duties = [_duty(0, 6, 8), _duty(1, 6, 11), _duty(2, 6, 14)]
+    profs = [Invigilator(1, 1, max_par_jour=1), Invigilator(2, 1), Invigilator(3, 1)]
+    busy = [(2, datetime(2025, 1, 6, 8), datetime(2025, 1, 6, 10))]
+    unavailable = [(3, datetime(2025, 1, 6, 0), datetime(2025, 1, 7, 0))]
+
+    plan = InvigilationPlanner(duties, profs, busy, unavailable).solve(0.1)
+
+    assert plan.prof_of[0] == 1
+    assert plan.prof_of[1] == plan.prof_of[2] == 2
+    assert 3 not in plan.prof_of.values()
+
+
+def test_duty_without_eligible_invigilator_stays_unassigned():
+    duties = [_duty(0, 6, 8), _duty(1, 6, 8)]
+    plan = InvigilationPlanner(duties, [Invigilator(1, 1)]).solve(0.1)
+
+    assert len(plan.prof_of) == 1
+    assert len(plan.unassigned) == 1
+    assert plan.statistics["unassigned_duties"] == 1
+
+
+def test_load_is_balanced_and_own_department_preferred():
+    duties = [_duty(k, 6 + k, 8) for k in range(4)]
+    profs = [Invigilator(1, 1), Invigilator(2, 1), Invigilator(3, 2)]
+
+    plan = InvigilationPlanner(duties, profs).solve(0.1)
+
+    counts = [list(plan.prof_of.values()).count(p) for p in (1, 2)]
+    assert sorted(counts) == [2, 2]
+    assert plan.statistics["same_department"] == 4
+
+
+def test_one_invigilator_per_started_block_of_students():
+    assert surveillants_requis(None) == 1
+    assert surveillants_requis(60) == 1
+    assert surveillants_requis(61) == 2
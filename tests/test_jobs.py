@@ -0,0 +1,62 @@
+# tests/test_jobs.py - TESTS DES TÂCHES DE FOND
+import threading
+import time
+
+from backend import jobs
+
+
+def _wait(job_id, timeout=2.0):
+    limite = time.monotonic() + timeout
+    while time.monotonic() < limite:
+        state = jobs.get_job(job_id)
+        if state["status"] != jobs.EN_COURS:
+            return state
+        time.sleep(0.01)
+    raise AssertionError("tâche toujours en cours")
+
+
+def test_progress_is_published_and_result_kept():
+    def work(n, progress, stop_event):
+        progress({"phase": "calcul", "fait": n})
+        return n * 2
+
+    job_id = jobs.start_job("double", work, 21)
+    state = _wait(job_id)
+
+    assert state["status"] == jobs.TERMINE
+    assert state["result"] == 42
+    assert state["progress"] == {"phase": "calcul", "fait": 21}
+
+
+def test_stop_request_ends_the_job_as_stopped():
+    started = threading.Event()
+
+    def work(progress, stop_event):
+        started.set()
+        stop_event.wait(2)
+        return "meilleur résultat"
+
+    job_id = jobs.start_job("long", work)
+    assert started.wait(1)
+    assert jobs.stop_job(job_id)
+    state = _wait(job_id)
+
+    assert state["status"] == jobs.ARRETE
+    assert state["stop_requested"]
+    assert state["result"] == "meilleur résultat"
+    assert not jobs.stop_job(job_id)
+
+
+def test_error_is_reported():
+    def work(progress, stop_event):
+        raise ValueError("données invalides")
+
+    state = _wait(jobs.start_job("erreur", work))
+
+    assert state["status"] == jobs.ERREUR
+    assert state["error"] == "données invalides"
+
+
+def test_unknown_job():
+    assert jobs.get_job("inconnu") is None
+    assert not jobs.stop_job("inconnu")
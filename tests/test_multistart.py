@@ -0,0 +1,42 @@
+# tests/test_multistart.py - TESTS DE LA PLANIFICATION MULTI-DÉPART
+import threading
+from datetime import date
+
+from backend import multistart
+from backend.multistart import solve_multistart
+from backend.scheduler import ExamRequest, Room, build_slots
+
+EXAMS = [ExamRequest(k, k, 1, k % 3, 20) for k in range(6)]
+ROOMS = [Room(1, "A", 40), Room(2, "B", 40)]
+SLOTS = build_slots(date(2025, 1, 6), date(2025, 1, 7))
+
+
+def test_sequential_runs_keep_the_cheapest_schedule():
+    best = solve_multistart(EXAMS, ROOMS, SLOTS, runs=3, workers=1, time_budget=0.6, seed=1)
+
+    assert best.statistics["parallel_workers"] == 1
+    assert best.statistics["runs_completed"] >= 1
+    assert best.cost == min(best.statistics["run_costs"])
+    assert best.statistics["unscheduled_exams"] == 0
+
+
+def test_falls_back_to_sequential_when_processes_fail(monkeypatch):
+    def no_processes(*args, **kwargs):
+        raise OSError("fork impossible")
+    monkeypatch.setattr(multistart, "_solve_parallel", no_processes)
+
+    best = solve_multistart(EXAMS, ROOMS, SLOTS, runs=2, workers=2, time_budget=0.4, seed=2)
+
+    assert best.statistics["parallel_workers"] == 1
+    assert best.statistics["runs_completed"] >= 1
+
+
+def test_stop_request_keeps_the_first_result():
+    stop_event = threading.Event()
+    stop_event.set()
+
+    best = solve_multistart(EXAMS, ROOMS, SLOTS, runs=4, workers=1, time_budget=2.0,
+                            seed=3, stop_event=stop_event)
+
+    assert best.statistics["runs_completed"] == 1
+    assert best.statistics["stopped_early"]
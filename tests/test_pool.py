@@ -0,0 +1,104 @@
+# tests/test_pool.py - TESTS DU POOL DE CONNEXIONS
+import pytest
+from psycopg2 import extensions
+from psycopg2.pool import PoolError
+
+from backend import pool as pool_module
+from backend.pool import ConnectionPool
+
+
+class FakeConnection:
+    """Connexion psycopg2 minimale : compte les commit / rollback / close"""
+
+    def __init__(self):
+        self.closed = 0
+        self.autocommit = False
+        self.commits = self.rollbacks = 0
+        self.info = self
+        self.transaction_status = extensions.TRANSACTION_STATUS_IDLE
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        self.rollbacks += 1
+        self.transaction_status = extensions.TRANSACTION_STATUS_IDLE
+
+    def close(self):
+        self.closed = 1
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    opened = []
+
+    def connect(dsn, **kwargs):
+        opened.append(FakeConnection())
+        return opened[-1]
+
+    monkeypatch.setattr(pool_module.psycopg2, "connect", connect)
+    pool = ConnectionPool("dbname=test", minconn=0, maxconn=2, timeout=0.05)
+    pool.opened = opened
+    return pool
+
+
+def test_released_connection_is_reused(pool):
+    conn = pool.getconn()
+    raw = conn.raw
+    conn.close()
+    assert pool.stats()["idle"] == 1
+
+    again = pool.getconn()
+    assert again.raw is raw
+    assert len(pool.opened) == 1
+    again.close()
+
+
+def test_closing_twice_returns_the_connection_once(pool):
+    conn = pool.getconn()
+    conn.close()
+    conn.close()
+    assert pool.stats() == {"size": 1, "idle": 1, "in_use": 0, "maxconn": 2}
+    assert conn.closed
+
+
+def test_open_transaction_is_rolled_back_on_release(pool):
+    conn = pool.getconn()
+    conn.raw.transaction_status = extensions.TRANSACTION_STATUS_INTRANS
+    raw = conn.raw
+    conn.close()
+    assert raw.rollbacks == 1
+
+
+def test_pool_blocks_then_fails_when_exhausted(pool):
+    first, second = pool.getconn(), pool.getconn()
+    with pytest.raises(PoolError):
+        pool.getconn()
+    first.close()
+    third = pool.getconn()
+    assert third.raw is not second.raw
+    second.close()
+    third.close()
+
+
+def test_context_manager_commits_and_returns_the_connection(pool):
+    with pool.getconn() as conn:
+        raw = conn.raw
+    assert raw.commits == 1
+    assert pool.stats()["in_use"] == 0
+
+
+def test_context_manager_rolls_back_on_error(pool):
+    with pytest.raises(RuntimeError):
+        with pool.getconn() as conn:
+            raw = conn.raw
+            raise RuntimeError("échec")
+    assert raw.commits == 0
+    assert raw.rollbacks == 1
+    assert pool.stats()["in_use"] == 0
+
+
+def test_closed_pool_refuses_new_connections(pool):
+    pool.closeall()
+    with pytest.raises(PoolError):
+        pool.getconn()
@@ -0,0 +1,48 @@
+# tests/test_rooms.py - TESTS DE L'AFFECTATION DES SALLES
+from types import SimpleNamespace
+
+from backend.rooms import AMPHI, SALLE, allocate_rooms
+
+
+def _exam(key, effectif):
+    return SimpleNamespace(key=key, effectif=effectif)
+
+
+def _room(id, capacite, type=SALLE):
+    return SimpleNamespace(id=id, capacite=capacite, type=type)
+
+
+def _rooms_of(allocation, key):
+    return [(placement.room.id, placement.places) for placement in allocation.rooms_of[key]]
+
+
+def test_best_fit_takes_the_smallest_room_that_holds_the_group():
+    allocation = allocate_rooms([_exam(0, 25)], [_room(1, 100), _room(2, 20), _room(3, 30)])
+    assert _rooms_of(allocation, 0) == [(3, 25)]
+    assert allocation.overflows == 0
+
+
+def test_best_fit_prefers_a_room_to_an_amphitheatre_of_equal_capacity():
+    allocation = allocate_rooms([_exam(0, 50)], [_room(1, 50, AMPHI), _room(2, 50, SALLE)])
+    assert _rooms_of(allocation, 0) == [(2, 50)]
+
+
+def test_large_group_is_split_and_each_part_keeps_its_head_count():
+    allocation = allocate_rooms([_exam(0, 70)], [_room(1, 30), _room(2, 30), _room(3, 20)])
+    assert sorted(_rooms_of(allocation, 0)) == [(1, 30), (2, 30), (3, 10)]
+    assert allocation.split_exams == 1
+    assert allocation.missing_seats == 0
+
+
+def test_split_keeps_one_room_for_each_remaining_exam():
+    allocation = allocate_rooms([_exam(0, 100), _exam(1, 10)], [_room(1, 30), _room(2, 30), _room(3, 30)])
+    assert len(allocation.rooms_of[0]) == 2
+    assert len(allocation.rooms_of[1]) == 1
+    assert allocation.overflows == 1
+    assert allocation.missing_seats == 40
+
+
+def test_without_split_the_largest_room_is_used_and_the_rest_overflows():
+    allocation = allocate_rooms([_exam(0, 70)], [_room(1, 30), _room(2, 40)], allow_split=False)
+    assert _rooms_of(allocation, 0) == [(2, 40)]
+    assert allocation.missing_seats == 30
@@ -0,0 +1,60 @@
+# tests/test_scheduler.py - TESTS DU MOTEUR DE PLANIFICATION
+from collections import Counter
+from datetime import date
+
+from backend.scheduler import ExamRequest, ExamScheduler, Room, build_group_adjacency, build_slots
+
+
+def _exams(nb_groupes, nb_modules, effectif=30):
+    """nb_modules examens par groupe, clés 0..n-1"""
+    exams = []
+    for groupe_id in range(1, nb_groupes + 1):
+        for module in range(nb_modules):
+            exams.append(ExamRequest(len(exams), groupe_id * 100 + module, 1, groupe_id, effectif))
+    return exams
+
+
+def test_solve_never_puts_conflicting_exams_in_the_same_slot():
+    exams = _exams(4, 3)
+    adjacency = build_group_adjacency(exams)
+    # Étudiants partagés entre deux groupes différents
+    adjacency[0].add(3)
+    adjacency[3].add(0)
+    rooms = [Room(i, f"S{i}", 40) for i in range(3)]
+    slots = build_slots(date(2025, 1, 6), date(2025, 1, 8))
+
+    schedule = ExamScheduler(exams, rooms, slots, adjacency).solve(seed=1, time_budget=0.2)
+
+    assert schedule.statistics["unscheduled_exams"] == 0
+    for key, neighbours in enumerate(adjacency):
+        for other in neighbours:
+            assert schedule.slot_of[key] != schedule.slot_of[other]
+
+
+def test_solve_respects_room_and_seat_capacity_of_each_slot():
+    exams = _exams(10, 1, effectif=35)
+    rooms = [Room(1, "A", 40), Room(2, "B", 40)]
+    slots = build_slots(date(2025, 1, 6), date(2025, 1, 8))
+
+    schedule = ExamScheduler(exams, rooms, slots).solve(seed=2, time_budget=0.2)
+
+    assert schedule.statistics["unscheduled_exams"] == 0
+    per_slot = Counter(schedule.slot_of)
+    assert max(per_slot.values()) <= len(rooms)
+    for slot_index in per_slot:
+        seats = sum(exam.effectif for exam in exams if schedule.slot_of[exam.key] == slot_index)
+        assert seats <= sum(room.capacite for room in rooms)
+    assert schedule.statistics["capacity_overflows"] == 0
+    assert schedule.statistics["exams_without_room"] == 0
+
+
+def test_solve_leaves_exams_unscheduled_when_slots_run_out():
+    exams = _exams(1, 6)
+    rooms = [Room(1, "A", 40)]
+    slots = build_slots(date(2025, 1, 6), date(2025, 1, 6))   # 4 créneaux
+
+    schedule = ExamScheduler(exams, rooms, slots).solve(seed=3, time_budget=0.1)
+
+    assert schedule.statistics["unscheduled_exams"] == 2
+    placed = [s for s in schedule.slot_of if s >= 0]
+    assert len(placed) == len(set(placed))
@@ -0,0 +1,65 @@
+# tests/test_stats.py - TESTS DU RAFRAÎCHISSEMENT DES STATISTIQUES
+import threading
+import time
+
+from backend import stats
+
+
+class FakeConnection:
+    def __init__(self):
+        self.autocommit = False
+        self.closed = False
+        self.executed = []
+
+    def cursor(self):
+        return self
+
+    def execute(self, sql):
+        self.executed.append(sql)
+
+    def close(self):
+        self.closed = True
+
+
+def test_refresh_stats_refreshes_the_view_concurrently(monkeypatch):
+    conn = FakeConnection()
+    monkeypatch.setattr(stats, "ensure_ready", lambda: True)
+    monkeypatch.setattr(stats, "get_connection", lambda: conn)
+
+    assert stats.refresh_stats()
+    assert conn.autocommit
+    assert conn.executed == [f"REFRESH MATERIALIZED VIEW CONCURRENTLY {stats.VIEW_NAME}"]
+    assert conn.closed
+
+
+def _wait_idle(timeout=2.0):
+    limite = time.monotonic() + timeout
+    while stats._refresh_thread is not None and time.monotonic() < limite:
+        time.sleep(0.01)
+
+
+def test_close_requests_are_coalesced_into_one_refresh(monkeypatch):
+    calls = []
+    monkeypatch.setattr(stats, "refresh_stats", lambda: calls.append(1))
+
+    for _ in range(5):
+        stats.request_refresh(delay=0.05)
+    _wait_idle()
+    assert len(calls) == 1
+
+
+def test_request_during_a_refresh_triggers_another_one(monkeypatch):
+    calls = []
+    started = threading.Event()
+
+    def slow_refresh():
+        calls.append(1)
+        started.set()
+        time.sleep(0.1)
+    monkeypatch.setattr(stats, "refresh_stats", slow_refresh)
+
+    stats.request_refresh(delay=0.01)
+    assert started.wait(1)
+    stats.request_refresh(delay=0.01)
+    _wait_idle()
+    assert len(calls) == 2
@@ -0,0 +1,43 @@
+# tests/test_timetable_api.py - TESTS DES ETAGS ET DES RÉPONSES PUBLIQUES
+import asyncio
+
+from backend import snapshots
+from backend.snapshots import public_items
+from backend.timetable_api import TimetableService, etag_matches, make_etag
+
+ETAG = make_etag("GROUPE", 3, 12, "json")
+
+
+def test_missing_header_never_matches():
+    assert not etag_matches(None, ETAG)
+    assert not etag_matches("", ETAG)
+
+
+def test_star_matches_any_etag():
+    assert etag_matches(" * ", ETAG)
+
+
+def test_weak_etag_in_a_list_matches():
+    assert etag_matches(f'"autre", W/{ETAG}', ETAG)
+
+
+def test_other_version_does_not_match():
+    assert not etag_matches(make_etag("GROUPE", 3, 11, "json"), ETAG)
+
+
+def test_public_items_drop_invigilator_emails():
+    items = [{"examen": "Analyse", "professeur_surveillant": "prof@example.org"}]
+    assert public_items(items) == [{"examen": "Analyse"}]
+
+
+def test_version_cache_is_bounded_like_the_body_cache(monkeypatch):
+    monkeypatch.setattr(snapshots, "snapshot_version", lambda owner_type, owner_id: owner_id)
+    service = TimetableService(max_workers=1, cache_size=3)
+    try:
+        async def lookups():
+            for owner_id in range(10):
+                assert await service.version(snapshots.GROUPE, owner_id) == owner_id
+        asyncio.run(lookups())
+    finally:
+        service.executor.shutdown()
+    assert list(service._versions) == [(snapshots.GROUPE, owner_id) for owner_id in (7, 8, 9)]
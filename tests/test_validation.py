@@ -0,0 +1,40 @@
+# tests/test_validation.py - TESTS DE L'ARBRE DE LA VALIDATION FINALE
+from backend import database
+from backend.validation import (
+    NIVEAU_DEPARTEMENT, NIVEAU_FORMATION, NIVEAU_GROUPE, NIVEAU_TOTAL, fetch_validation_summary,
+)
+
+
+def _ligne(niveau, nb_examens, **colonnes):
+    return {"niveau": niveau, "nb_examens": nb_examens, **colonnes}
+
+
+def test_rollup_rows_become_a_tree(monkeypatch):
+    rows = [
+        _ligne(NIVEAU_TOTAL, 5),
+        _ligne(NIVEAU_DEPARTEMENT, 5, departement_nom="Informatique"),
+        _ligne(NIVEAU_FORMATION, 3, formation_nom="L3"),
+        _ligne(NIVEAU_GROUPE, 2, groupe_nom="G1"),
+        _ligne(NIVEAU_GROUPE, 1, groupe_nom="G2"),
+        _ligne(NIVEAU_FORMATION, 2, formation_nom="M1"),
+        _ligne(NIVEAU_GROUPE, 2, groupe_nom="G1"),
+    ]
+    monkeypatch.setattr(database, "_fetch_all", lambda query, params=None: rows)
+
+    summary = fetch_validation_summary(1)
+
+    assert summary["total"]["nb_examens"] == 5
+    [departement] = summary["departements"]
+    assert departement["ligne"]["departement_nom"] == "Informatique"
+    assert [f["ligne"]["formation_nom"] for f in departement["formations"]] == ["L3", "M1"]
+    assert [g["groupe_nom"] for g in departement["formations"][0]["groupes"]] == ["G1", "G2"]
+    assert len(departement["formations"][1]["groupes"]) == 1
+
+
+def test_session_without_exams_has_no_summary(monkeypatch):
+    # ROLLUP renvoie la ligne de total même sans aucun examen
+    monkeypatch.setattr(database, "_fetch_all", lambda query, params=None: [_ligne(NIVEAU_TOTAL, 0)])
+    assert fetch_validation_summary(1) is None
+    monkeypatch.setattr(database, "_fetch_all", lambda query, params=None: [])
+    assert fetch_validation_summary(1) is None
+